@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark clean_text() in scripts/extract-content.py against the original
+split/join + `while '\\n\\n\\n' in text` implementation.
+
+Generates a synthetic corpus shaped like PPTX/PDF exports (short lines,
+indentation, long runs of blank lines) and checks that both versions give
+identical output on it before timing them.
+
+Usage:
+    python scripts/benchmark-clean-text.py [--size-mb 50] [--repeat 3]
+"""
+
+import sys
+import time
+import random
+import argparse
+import importlib.util
+from pathlib import Path
+
+
+def legacy_clean_text(text):
+    """clean_text as it was before the single-pass normalizer"""
+    text = '\n'.join([line.strip() for line in text.split('\n')])
+    while '\n\n\n' in text:
+        text = text.replace('\n\n\n', '\n\n')
+    return text.strip()
+
+
+def load_extractor():
+    path = Path(__file__).with_name('extract-content.py')
+    spec = importlib.util.spec_from_file_location('extract_content', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_corpus(size, seed=0):
+    """ASCII text with slide-like lines and blank-line runs of varying length"""
+    rng = random.Random(seed)
+    words = ['ClaimCenter', 'policy', 'Gosu', 'entity', 'typelist', 'rule', 'exposure',
+             'the', 'and', 'configuration', 'PCF', 'plugin', 'integration', 'a', 'of']
+    parts = []
+    total = 0
+    while total < size:
+        kind = rng.random()
+        if kind < 0.70:
+            part = ' ' * rng.randint(0, 6) + ' '.join(rng.choice(words) for _ in range(rng.randint(1, 14))) \
+                + ' \t'[rng.randint(0, 1)] * rng.randint(0, 3) + '\n'
+        elif kind < 0.95:
+            part = '\n' * rng.randint(1, 8)
+        else:
+            part = ('   \n' if rng.random() < 0.5 else '\n') * rng.randint(20, 400)  # exported blank runs
+        parts.append(part)
+        total += len(part)
+    return ''.join(parts)
+
+
+def best_time(fn, text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clean_text implementations")
+    parser.add_argument('--size-mb', type=float, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    extractor = load_extractor()
+    print(f"🧪 Generating {args.size_mb:g} MB synthetic corpus...")
+    text = synthetic_corpus(int(args.size_mb * 1024 * 1024))
+
+    cases = [
+        ('corpus', text),
+        ('blank run', 'a' + '\n' * (len(text) // 4) + 'b'),
+        ('space run', 'a' + ' ' * (len(text) // 4) + 'b\n\n\nc'),
+    ]
+    print(f"\n  {'case':<12}{'legacy (s)':>12}{'linear (s)':>12}{'speedup':>10}  identical")
+    for name, sample in cases:
+        legacy_time, legacy_result = best_time(legacy_clean_text, sample, args.repeat)
+        new_time, new_result = best_time(extractor.clean_text, sample, args.repeat)
+        same = legacy_result == new_result
+        print(f"  {name:<12}{legacy_time:>12.3f}{new_time:>12.3f}{legacy_time / new_time:>9.1f}x  {'✓' if same else '✗'}")
+        if not same:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
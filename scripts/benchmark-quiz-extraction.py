@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark quiz extraction in scripts/extract-quizzes-from-ppts.py against
+the original per-call implementation (slide text rebuilt and regexes looked
+up every time a slide is classified).
+
+Generates a synthetic corpus of decks in the cached slide representation
+(see scripts/pptx_cache.py): content slides, a "Lesson objectives review"
+slide (missing in some decks) and question/answer pairs in the formats the
+parser understands. Both versions must extract identical quizzes before
+they are timed.
+
+Usage:
+    python scripts/benchmark-quiz-extraction.py [--decks 300] [--repeat 20]
+"""
+
+import gc
+import re
+import sys
+import time
+import random
+import argparse
+import importlib.util
+from pathlib import Path
+
+
+def load_extractor():
+    path = Path(__file__).with_name('extract-quizzes-from-ppts.py')
+    spec = importlib.util.spec_from_file_location('extract_quizzes', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# --- extract_quiz_from_ppt as it was before the pre-pass ---------------------
+
+def legacy_slide_text(slide):
+    return "\n".join(slide['texts'])
+
+
+def legacy_is_review(slide_text):
+    normalized = slide_text.lower().strip()
+    return ("lesson objectives review" in normalized or
+            "lesson objective review" in normalized or
+            "objectives review" in normalized)
+
+
+def legacy_is_question(slide_text):
+    text = slide_text.strip()
+    if re.match(r'^question\s*\d*', text, re.IGNORECASE):
+        return True
+    if re.search(r'[A-D]\)', text):
+        return True
+    return False
+
+
+def legacy_is_answer(slide_text):
+    text = slide_text.lower().strip()
+    return text.startswith('answer') or 'correct answer' in text
+
+
+def legacy_parse_question(slide_text):
+    lines = [line.strip() for line in slide_text.split('\n') if line.strip()]
+    question_text = ''
+    options = {}
+    question_started = False
+    for line in lines:
+        if re.match(r'^question\s*\d*', line, re.IGNORECASE):
+            question_started = True
+            continue
+        if not question_started:
+            continue
+        option_match = re.match(r'([A-D])\)\s*(.+)', line, re.IGNORECASE)
+        if option_match:
+            letter, text = option_match.groups()
+            options[letter.upper()] = text.strip()
+        elif not options and question_text:
+            question_text += ' ' + line
+        elif not options:
+            question_text = line
+    return {'question': question_text.strip(), 'options': options}
+
+
+def legacy_parse_answer(slide_text):
+    text = slide_text.strip()
+    match = re.search(r'answer[:\s]*([A-D])\)?', text, re.IGNORECASE)
+    if match:
+        return match.group(1).upper()
+    match = re.search(r'^([A-D])\)?$', text, re.MULTILINE | re.IGNORECASE)
+    if match:
+        return match.group(1).upper()
+    for letter in ['A', 'B', 'C', 'D']:
+        if f'{letter})' in text or f'{letter} )' in text:
+            return letter
+    return None
+
+
+def legacy_extract(ppt_name, slides):
+    review_slide_idx = None
+    for idx, slide in enumerate(slides):
+        if legacy_is_review(legacy_slide_text(slide)):
+            review_slide_idx = idx
+            break
+    if review_slide_idx is None:
+        return None
+    quiz_slides = slides[review_slide_idx + 1:]
+    if not quiz_slides:
+        return None
+    questions = []
+    i = 0
+    while i < len(quiz_slides):
+        slide_text = legacy_slide_text(quiz_slides[i])
+        if legacy_is_question(slide_text):
+            question_data = legacy_parse_question(slide_text)
+            correct_answer = None
+            if i + 1 < len(quiz_slides):
+                answer_text = legacy_slide_text(quiz_slides[i + 1])
+                if legacy_is_answer(answer_text):
+                    correct_answer = legacy_parse_answer(answer_text)
+                    i += 1
+            if question_data['question'] and question_data['options'] and correct_answer:
+                questions.append({'question': question_data['question'],
+                                  'options': question_data['options'],
+                                  'correct_answer': correct_answer})
+        i += 1
+    return {'ppt_name': ppt_name, 'questions': questions} if questions else None
+
+
+# --- synthetic corpus --------------------------------------------------------
+
+WORDS = ['ClaimCenter', 'policy', 'Gosu', 'entity', 'typelist', 'rule', 'exposure',
+         'the', 'and', 'configuration', 'PCF', 'plugin', 'integration', 'a', 'of']
+
+
+def sentence(rng, lo=4, hi=14):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(lo, hi)))
+
+
+def content_slide(rng):
+    texts = [sentence(rng, 2, 6)]
+    texts += ['\n'.join('- ' + sentence(rng) for _ in range(rng.randint(2, 6)))
+              for _ in range(rng.randint(1, 4))]
+    texts += [''] * rng.randint(0, 2)  # empty placeholders
+    return {'title': texts[0], 'texts': texts, 'background': None}
+
+
+def question_slides(rng, number):
+    letters = 'ABCD'[:rng.randint(2, 4)]
+    question = [sentence(rng) + '?'] if rng.random() < 0.7 else [sentence(rng), sentence(rng) + '?']
+    texts = [f"Question {number}", '\n'.join(question),
+             '\n'.join(f"{letter}) {sentence(rng, 2, 8)}" for letter in letters)]
+    answer = rng.choice(letters)
+    answer_text = rng.choice([f"Answer: {answer}", f"Correct answer: {answer})",
+                              f"Answer\n{answer})"])
+    return [{'title': texts[0], 'texts': texts, 'background': None},
+            {'title': None, 'texts': [answer_text], 'background': [255, 255, 255]}]
+
+
+def synthetic_deck(rng):
+    slides = [content_slide(rng) for _ in range(rng.randint(15, 60))]
+    if rng.random() < 0.9:
+        slides.append({'title': 'Lesson objectives review',
+                       'texts': ['Lesson objectives review', sentence(rng)], 'background': None})
+        for number in range(1, rng.randint(3, 12)):
+            slides += question_slides(rng, number)
+            if rng.random() < 0.2:
+                slides.append(content_slide(rng))
+    return slides
+
+
+def best_time(fn, decks, repeat):
+    best = None
+    gc.disable()  # the corpus is small; keep collector pauses out of the timings
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = [fn(name, slides) for name, slides in decks]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quiz extraction implementations")
+    parser.add_argument('--decks', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    extractor = load_extractor()
+    rng = random.Random(0)
+    decks = [(f"Deck_{n:03d}", synthetic_deck(rng)) for n in range(args.decks)]
+    slide_count = sum(len(slides) for _, slides in decks)
+    print(f"🧪 {len(decks)} synthetic decks, {slide_count} slides")
+
+    def current(name, slides):
+        return extractor.extract_quiz_from_slides(name, slides, log=lambda message: None)
+
+    legacy_time, legacy_result = best_time(legacy_extract, decks, args.repeat)
+    new_time, new_result = best_time(current, decks, args.repeat)
+    same = legacy_result == new_result
+    quizzes = sum(1 for quiz in new_result if quiz)
+    print(f"\n  {'legacy (s)':>12}{'pre-pass (s)':>14}{'speedup':>10}  quizzes  identical")
+    print(f"  {legacy_time:>12.3f}{new_time:>14.3f}{legacy_time / new_time:>9.1f}x"
+          f"  {quizzes:>7}  {'✓' if same else '✗'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Benchmark scan_current_structure() in scripts/reorganize-content.py
+against the original Path.iterdir() implementation, counting the
+filesystem syscalls each one makes.
+
+Builds a synthetic data/ tree in a temporary directory. It has every
+layout the scanner handles: lessons directly in a chapter, lesson
+folders, single-subfolder nesting to drill down, folders that hold only a
+README next to the one subfolder, sub-lessons, and hidden files. Both
+versions must produce the same structure before they are measured.
+
+Syscalls are counted at the os module boundary:
+- one per os.listdir()/os.scandir() directory listing. Each of these is
+  really openat + getdents64 + close, and getdents64 repeats for large
+  directories.
+- one per os.stat()/os.lstat(), which is what Path.is_dir()/is_file()
+  call
+- one per first DirEntry.stat()
+DirEntry.is_dir()/is_file() answer from the listing itself and are not
+syscalls. Pass --latency-ms to add a delay per counted call and see what
+the difference means on a network mount.
+
+Usage:
+    python scripts/benchmark-reorganize-scan.py [--chapters 8] [--lessons 40] [--latency-ms 0]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import importlib.util
+from pathlib import Path
+
+
+def load_reorganizer():
+    sys.path.insert(0, str(Path(__file__).parent))
+    path = Path(__file__).with_name('reorganize-content.py')
+    spec = importlib.util.spec_from_file_location('reorganize_content', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# --- scan_current_structure as it was before the cached scanner --------------
+
+def legacy_drill_down(folder):
+    subfolders = [f for f in folder.iterdir() if f.is_dir() and not f.name.startswith('.')]
+    files = [f for f in folder.iterdir() if f.is_file() and not f.name.startswith('.')]
+    if len(subfolders) == 1 and len(files) == 0:
+        return legacy_drill_down(subfolders[0])
+    elif len(subfolders) == 1 and all(f.suffix.lower() not in ['.pptx', '.pdf', '.mp4', '.mkv', '.docx', '.xlsx'] for f in files):
+        return legacy_drill_down(subfolders[0])
+    return folder
+
+
+def legacy_process_lesson(rc, lesson_dir, product, module, structure):
+    structure.setdefault(product, {}).setdefault(module, [])
+    files = {'slides': [], 'demos': [], 'assignments': [], 'other': []}
+    for file in lesson_dir.iterdir():
+        if file.name.startswith('.') or not file.is_file():
+            continue
+        ext = file.suffix.lower()
+        if ext in ['.pptx', '.pdf'] and 'assignment' not in file.name.lower():
+            files['slides'].append(file)
+        elif ext in ['.mp4', '.mkv']:
+            files['demos'].append(file)
+        elif ext in ['.pdf', '.docx', '.xlsx'] and any(x in file.name.lower() for x in ['assignment', 'exercise', 'solution']):
+            files['assignments'].append(file)
+        else:
+            files['other'].append(file)
+    for category in files:
+        files[category].sort()
+    if any(files.values()):
+        structure[product][module].append({
+            'original_path': lesson_dir,
+            'original_name': lesson_dir.name,
+            'clean_name': rc.clean_topic_name(lesson_dir.name),
+            'files': files,
+            'title': rc.get_topic_title_from_pptx(files['slides'][0]) if files['slides'] else lesson_dir.name
+        })
+
+
+def legacy_scan(rc):
+    structure = {}
+    for chapter_dir in rc.CURRENT_DATA_DIR.iterdir():
+        if not chapter_dir.is_dir() or chapter_dir.name.startswith('.'):
+            continue
+        if chapter_dir.name not in rc.CHAPTER_TO_PRODUCT:
+            continue
+        product, module = rc.CHAPTER_TO_PRODUCT[chapter_dir.name]
+        structure.setdefault(product, {}).setdefault(module, [])
+        has_subfolders = any(item.is_dir() and not item.name.startswith('.') for item in chapter_dir.iterdir())
+        if has_subfolders:
+            lesson_folders = [item for item in chapter_dir.iterdir()
+                              if item.is_dir() and not item.name.startswith('.')]
+            lesson_folders.sort()
+            for lesson_dir in lesson_folders:
+                actual = legacy_drill_down(lesson_dir)
+                sub_lessons = [f for f in actual.iterdir() if f.is_dir() and not f.name.startswith('.')]
+                if sub_lessons:
+                    for sub_lesson in sub_lessons:
+                        legacy_process_lesson(rc, sub_lesson, product, module, structure)
+                else:
+                    legacy_process_lesson(rc, actual, product, module, structure)
+        else:
+            legacy_process_lesson(rc, chapter_dir, product, module, structure)
+    return structure
+
+
+# --- synthetic tree ----------------------------------------------------------
+
+def touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x')
+
+
+def lesson_files(rng, folder, number):
+    touch(folder / f"PC_Intro_{number:02d}_Topic_{number}.pptx")
+    for demo in range(rng.randint(0, 3)):
+        touch(folder / f"demo{demo}.mp4")
+    if rng.random() < 0.3:
+        touch(folder / f"Assignment_{number}.docx")
+    if rng.random() < 0.2:
+        touch(folder / ".DS_Store")
+
+
+def synthetic_tree(root, chapters, lessons, seed=0):
+    rng = random.Random(seed)
+    names = list(load_reorganizer().CHAPTER_TO_PRODUCT)[:chapters]
+    for c, chapter in enumerate(names):
+        chapter_dir = root / chapter
+        if c == 0:
+            lesson_files(rng, chapter_dir, 1)  # lesson files directly in the chapter
+            continue
+        for number in range(1, lessons + 1):
+            lesson = chapter_dir / f"{number:02d} Lesson {number}"
+            kind = rng.random()
+            if kind < 0.5:
+                lesson_files(rng, lesson, number)
+            elif kind < 0.75:  # nested single subfolders
+                nested = lesson
+                for depth in range(rng.randint(1, 3)):
+                    nested = nested / f"{number:02d} Lesson {number} ({depth})"
+                lesson_files(rng, nested, number)
+            elif kind < 0.9:  # README next to the one subfolder
+                touch(lesson / "README.txt")
+                lesson_files(rng, lesson / "content", number)
+            else:  # sub-lessons
+                for sub in range(2):
+                    lesson_files(rng, lesson / f"part {sub + 1}", number)
+        touch(chapter_dir / ".hidden" / "ignored.pptx")
+
+
+# --- syscall counting ---------------------------------------------------------
+
+class CountingEntry:
+    """DirEntry proxy that counts the first stat() call"""
+
+    def __init__(self, entry, counter):
+        self._entry = entry
+        self._counter = counter
+        self._stat = None
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_dir(self, *, follow_symlinks=True):
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, *, follow_symlinks=True):
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_symlink(self):
+        return self._entry.is_symlink()
+
+    def stat(self, *, follow_symlinks=True):
+        if self._stat is None:
+            self._counter.hit('stat')
+            self._stat = self._entry.stat(follow_symlinks=follow_symlinks)
+        return self._stat
+
+
+class CountingScandir:
+    def __init__(self, iterator, counter):
+        self._iterator = iterator
+        self._counter = counter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._iterator.close()
+
+    def __iter__(self):
+        return (CountingEntry(entry, self._counter) for entry in self._iterator)
+
+
+class SyscallCounter:
+    """Patch os.listdir/os.scandir/os.stat/os.lstat to count (and delay) calls"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.counts = {'listdir': 0, 'stat': 0}
+
+    def hit(self, kind):
+        self.counts[kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def __enter__(self):
+        self._saved = os.listdir, os.scandir, os.stat, os.lstat
+        listdir, scandir, stat, lstat = self._saved
+
+        def counted(kind, fn):
+            def wrapper(*args, **kwargs):
+                self.hit(kind)
+                return fn(*args, **kwargs)
+            return wrapper
+
+        os.listdir = counted('listdir', listdir)
+        os.stat = counted('stat', stat)
+        os.lstat = counted('stat', lstat)
+        os.scandir = lambda *args: CountingScandir(counted('listdir', scandir)(*args), self)
+        return self
+
+    def __exit__(self, *exc):
+        os.listdir, os.scandir, os.stat, os.lstat = self._saved
+
+
+def normalized(structure):
+    """Structure with paths as strings, for comparing the two scanners"""
+    return {product: {module: [{**topic, 'original_path': str(topic['original_path']),
+                                'files': {k: [str(f) for f in v] for k, v in topic['files'].items()}}
+                               for topic in topics]
+                      for module, topics in modules.items()}
+            for product, modules in structure.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count scan syscalls of the legacy and cached scanners")
+    parser.add_argument('--chapters', type=int, default=8)
+    parser.add_argument('--lessons', type=int, default=40)
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help="Delay per counted syscall, to simulate a network mount")
+    args = parser.parse_args()
+
+    rc = load_reorganizer()
+    tmp = Path(tempfile.mkdtemp(prefix='scan-bench-'))
+    try:
+        rc.CURRENT_DATA_DIR = tmp / 'data'
+        synthetic_tree(rc.CURRENT_DATA_DIR, args.chapters, args.lessons)
+        entries = sum(len(dirs) + len(files) for _, dirs, files in os.walk(rc.CURRENT_DATA_DIR))
+        print(f"🧪 Synthetic data/ tree: {entries} entries")
+
+        results = {}
+        for name, scan in (('legacy', lambda: legacy_scan(rc)),
+                           ('cached', lambda: rc.scan_current_structure())):
+            with SyscallCounter(args.latency_ms / 1000) as counter:
+                start = time.perf_counter()
+                structure = scan()
+                elapsed = time.perf_counter() - start
+            results[name] = (counter.counts, elapsed, normalized(structure))
+
+        same = results['legacy'][2] == results['cached'][2]
+        print(f"\n  {'scanner':<10}{'listings':>10}{'stats':>8}{'total':>8}{'time (s)':>11}")
+        for name, (counts, elapsed, _) in results.items():
+            total = counts['listdir'] + counts['stat']
+            print(f"  {name:<10}{counts['listdir']:>10}{counts['stat']:>8}{total:>8}{elapsed:>11.3f}")
+        legacy_total = sum(results['legacy'][0].values())
+        cached_total = max(1, sum(results['cached'][0].values()))
+        print(f"\n  {legacy_total / cached_total:.1f}x fewer syscalls, identical structure: {'✓' if same else '✗'}")
+        if not same:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+GUIDEWIRE GURU - BM25 KEYWORD INDEX
+===================================
+Lexical retrieval over the output of scripts/extract-content.py, for the
+lookups embeddings handle badly: entity names, Gosu class names and
+typelist codes (ABContact, gw.api.util.DateUtil, TC_AUTO, ...).
+
+The index is a set of immutable segments plus a manifest:
+    seg-NNNNNN.bin    postings, sorted by doc number, (doc delta, tf) as varints
+    seg-NNNNNN.json   term dictionary (term -> offset, length, df) and doc table
+    manifest.json     live segments and per-segment deletions (tombstones)
+
+Adding a document whose file_path is already indexed replaces it; unchanged
+documents (same content hash) are skipped. Deleted documents stay in their
+segment until `compact` rewrites the index.
+
+Usage:
+    python scripts/build-bm25-index.py sync <index_dir> <extracted_dir>
+    python scripts/build-bm25-index.py add <index_dir> <extracted_dir>
+    python scripts/build-bm25-index.py delete <index_dir> <file_path> [<file_path> ...]
+    python scripts/build-bm25-index.py query <index_dir> "ClaimContact.Exposure" [--k 10]
+    python scripts/build-bm25-index.py compact <index_dir>
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import gzip
+import math
+import time
+import mmap
+import heapq
+import hashlib
+import argparse
+
+
+TOKEN_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*|\d+')
+CAMEL_RE = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+SEGMENT_DOCS = 5000  # flush a segment every N documents to bound memory
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    """Yield index terms for text.
+
+    Identifiers are kept whole (lower-cased) and additionally split on dots,
+    underscores and camelCase, so `gw.api.util.DateUtil` matches queries for
+    the full name as well as `DateUtil` or `date`.
+    """
+    for match in TOKEN_RE.finditer(text):
+        token = match.group(0)
+        yield token.lower()
+        if '.' in token or '_' in token or not (token.islower() or token.isupper()):
+            parts = [p for p in re.split(r'[._]', token) if p]
+            for part in parts:
+                if len(parts) > 1:
+                    yield part.lower()
+                sub = CAMEL_RE.findall(part)
+                if len(sub) > 1:
+                    for s in sub:
+                        yield s.lower()
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_postings(buf, offset, length):
+    """Yield (doc, tf) pairs from a delta/varint encoded postings list"""
+    end = offset + length
+    pos = offset
+    doc = 0
+    values = []
+    while pos < end:
+        value = 0
+        shift = 0
+        while True:
+            byte = buf[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append(value)
+        if len(values) == 2:
+            doc += values[0]
+            yield doc, values[1]
+            values = []
+
+
+def content_hash(record):
+    return hashlib.sha1(record['content'].encode('utf-8')).hexdigest()
+
+
+def iter_records(extracted_dir):
+    """Yield extracted records (JSONL corpus shards, else per-document JSON)"""
+    shards = sorted(glob.glob(os.path.join(extracted_dir, 'corpus-*.jsonl')) +
+                    glob.glob(os.path.join(extracted_dir, 'corpus-*.jsonl.gz')))
+    for shard in shards:
+        with (gzip.open(shard, 'rt', encoding='utf-8') if shard.endswith('.gz')
+              else open(shard, 'r', encoding='utf-8')) as f:
+            for line in f:
+                yield json.loads(line)
+    if shards:
+        return
+    for path in sorted(glob.glob(os.path.join(extracted_dir, '*.json'))):
+        if os.path.basename(path).startswith('.'):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            yield json.load(f)
+
+
+class Segment:
+    """One immutable segment: term dictionary, doc table and postings bytes"""
+
+    def __init__(self, index_dir, name):
+        self.name = name
+        with open(os.path.join(index_dir, f"{name}.json"), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.terms = data['terms']
+        self.docs = data['docs']
+        # Postings are memory-mapped; a query only touches its terms' bytes
+        with open(os.path.join(index_dir, f"{name}.bin"), 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self.postings = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.postings = b''
+
+    def close(self):
+        if isinstance(self.postings, mmap.mmap):
+            self.postings.close()
+
+    def iter_postings(self, term):
+        entry = self.terms.get(term)
+        if entry is None:
+            return iter(())
+        offset, length, _ = entry
+        return decode_postings(self.postings, offset, length)
+
+
+def write_segment(index_dir, name, docs, postings):
+    """Write a segment from {term: [(doc, tf), ...]} with docs numbered 0..n-1"""
+    buf = bytearray()
+    terms = {}
+    for term in sorted(postings):
+        offset = len(buf)
+        prev = 0
+        for doc, tf in postings[term]:  # appended in doc order
+            encode_varint(doc - prev, buf)
+            encode_varint(tf, buf)
+            prev = doc
+        terms[term] = [offset, len(buf) - offset, len(postings[term])]
+    with open(os.path.join(index_dir, f"{name}.bin"), 'wb') as f:
+        f.write(buf)
+    tmp_path = os.path.join(index_dir, f"{name}.json.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'docs': docs, 'terms': terms}, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(index_dir, f"{name}.json"))
+
+
+class BM25Index:
+    """Segmented BM25 index with incremental add/delete keyed on file_path"""
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        os.makedirs(index_dir, exist_ok=True)
+        manifest_path = os.path.join(index_dir, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'next_segment': 1, 'segments': [], 'deleted': {}}
+        self.segments = [Segment(index_dir, name) for name in self.manifest['segments']]
+        self.deleted = {name: set(ids) for name, ids in self.manifest['deleted'].items()}
+        # file_path -> (segment name, local doc number, content hash)
+        self.live = {}
+        for segment in self.segments:
+            dead = self.deleted.get(segment.name, set())
+            for doc_num, doc in enumerate(segment.docs):
+                if doc_num not in dead:
+                    self.live[doc['file_path']] = (segment.name, doc_num, doc['sha1'])
+        self._pending_docs = []
+        self._pending_postings = {}
+        self._avgdl = None
+
+    def save(self):
+        self.flush()
+        self.manifest['segments'] = [s.name for s in self.segments]
+        self.manifest['deleted'] = {name: sorted(ids) for name, ids in self.deleted.items() if ids}
+        tmp_path = os.path.join(self.index_dir, 'manifest.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.index_dir, 'manifest.json'))
+
+    def delete(self, file_path):
+        """Tombstone a document; returns False if it was not indexed"""
+        entry = self.live.pop(file_path, None)
+        if entry is None:
+            return False
+        self._avgdl = None
+        segment_name, doc_num, _ = entry
+        if segment_name is None:
+            # Still buffered in the unflushed segment: drop its postings
+            for term, plist in self._pending_postings.items():
+                self._pending_postings[term] = [p for p in plist if p[0] != doc_num]
+            self._pending_docs[doc_num] = None
+        else:
+            self.deleted.setdefault(segment_name, set()).add(doc_num)
+        return True
+
+    def add(self, record):
+        """Index a record, replacing any previous version; returns 'added', 'updated' or 'unchanged'"""
+        digest = content_hash(record)
+        previous = self.live.get(record['file_path'])
+        if previous is not None and previous[2] == digest:
+            return 'unchanged'
+        if previous is not None:
+            self.delete(record['file_path'])
+
+        doc_num = len(self._pending_docs)
+        counts = {}
+        length = 0
+        for term in tokenize(record['content']):
+            counts[term] = counts.get(term, 0) + 1
+            length += 1
+        for term, tf in counts.items():
+            self._pending_postings.setdefault(term, []).append((doc_num, tf))
+        self._pending_docs.append({
+            'file_path': record['file_path'],
+            'file_name': record['file_name'],
+            'product': record.get('product'),
+            'source_type': record.get('source_type'),
+            'length': length,
+            'sha1': digest,
+        })
+        self.live[record['file_path']] = (None, doc_num, digest)
+        self._avgdl = None
+        if len(self._pending_docs) >= SEGMENT_DOCS:
+            self.flush()
+        return 'updated' if previous is not None else 'added'
+
+    def flush(self):
+        """Write buffered documents out as a new segment"""
+        if not self._pending_docs:
+            return
+        # Renumber around documents deleted while still buffered
+        renumber = {}
+        docs = []
+        for doc_num, doc in enumerate(self._pending_docs):
+            if doc is not None:
+                renumber[doc_num] = len(docs)
+                docs.append(doc)
+        postings = {}
+        for term, plist in self._pending_postings.items():
+            plist = [(renumber[d], tf) for d, tf in plist if d in renumber]
+            if plist:
+                postings[term] = plist
+        self._pending_docs = []
+        self._pending_postings = {}
+        if not docs:
+            return
+
+        name = f"seg-{self.manifest['next_segment']:06d}"
+        self.manifest['next_segment'] += 1
+        write_segment(self.index_dir, name, docs, postings)
+        self.segments.append(Segment(self.index_dir, name))
+        for doc_num, doc in enumerate(docs):
+            self.live[doc['file_path']] = (name, doc_num, doc['sha1'])
+
+    def compact(self):
+        """Merge all segments into one, purging deleted documents"""
+        self.flush()
+        docs = []
+        postings = {}
+        for segment in self.segments:
+            dead = self.deleted.get(segment.name, set())
+            renumber = {}
+            for doc_num, doc in enumerate(segment.docs):
+                if doc_num not in dead:
+                    renumber[doc_num] = len(docs)
+                    docs.append(doc)
+            for term in segment.terms:
+                for doc, tf in segment.iter_postings(term):
+                    if doc in renumber:
+                        postings.setdefault(term, []).append((renumber[doc], tf))
+        old = [s.name for s in self.segments]
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+        self.deleted = {}
+        self.live = {}
+        if docs:
+            name = f"seg-{self.manifest['next_segment']:06d}"
+            self.manifest['next_segment'] += 1
+            write_segment(self.index_dir, name, docs, postings)
+            self.segments.append(Segment(self.index_dir, name))
+            for doc_num, doc in enumerate(docs):
+                self.live[doc['file_path']] = (name, doc_num, doc['sha1'])
+        self.save()
+        for name in old:
+            for ext in ('.bin', '.json'):
+                os.remove(os.path.join(self.index_dir, name + ext))
+
+    def search(self, query, k=10):
+        """BM25 top-k; returns [(score, doc dict)]"""
+        self.flush()
+        terms = list(dict.fromkeys(tokenize(query)))
+        n_docs = len(self.live)
+        if not terms or n_docs == 0:
+            return []
+        if self._avgdl is None:
+            total_length = 0
+            for segment in self.segments:
+                dead = self.deleted.get(segment.name, set())
+                total_length += sum(d['length'] for i, d in enumerate(segment.docs) if i not in dead)
+            self._avgdl = total_length / n_docs or 1.0
+        avgdl = self._avgdl
+
+        # Document frequencies include tombstoned docs until the next compact
+        df = {t: sum(s.terms[t][2] for s in self.segments if t in s.terms) for t in terms}
+        scores = {}
+        for segment in self.segments:
+            dead = self.deleted.get(segment.name, set())
+            for term in terms:
+                if not df[term]:
+                    continue
+                idf = math.log(1 + (n_docs - df[term] + 0.5) / (df[term] + 0.5))
+                for doc, tf in segment.iter_postings(term):
+                    if doc in dead:
+                        continue
+                    length = segment.docs[doc]['length']
+                    score = idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avgdl))
+                    key = (segment.name, doc)
+                    scores[key] = scores.get(key, 0.0) + score
+        by_name = {s.name: s for s in self.segments}
+        top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
+        return [(score, by_name[name].docs[doc]) for (name, doc), score in top]
+
+
+def add_records(index, extracted_dir, prune=False):
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    seen = set()
+    for record in iter_records(extracted_dir):
+        seen.add(record['file_path'])
+        stats[index.add(record)] += 1
+    if prune:
+        for file_path in [fp for fp in index.live if fp not in seen]:
+            index.delete(file_path)
+            stats['deleted'] += 1
+    index.save()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 keyword index over extracted content")
+    sub = parser.add_subparsers(dest='command', required=True)
+    for command, help_text in (('add', "Add or replace documents"),
+                               ('sync', "Add/replace documents and delete ones no longer present")):
+        p = sub.add_parser(command, help=help_text)
+        p.add_argument('index_dir')
+        p.add_argument('extracted_dir')
+    p = sub.add_parser('delete', help="Delete documents by file_path")
+    p.add_argument('index_dir')
+    p.add_argument('file_paths', nargs='+')
+    p = sub.add_parser('query', help="BM25 top-k search")
+    p.add_argument('index_dir')
+    p.add_argument('text')
+    p.add_argument('--k', type=int, default=10)
+    p = sub.add_parser('compact', help="Merge segments and purge deleted documents")
+    p.add_argument('index_dir')
+    args = parser.parse_args()
+
+    if args.command in ('add', 'sync'):
+        if not os.path.isdir(args.extracted_dir):
+            print(f"❌ Error: Directory '{args.extracted_dir}' does not exist")
+            sys.exit(1)
+        index = BM25Index(args.index_dir)
+        stats = add_records(index, args.extracted_dir, prune=args.command == 'sync')
+        print(f"✅ Added: {stats['added']}  Updated: {stats['updated']}  "
+              f"Unchanged: {stats['unchanged']}  Deleted: {stats['deleted']}")
+        print(f"   Live documents: {len(index.live)} in {len(index.segments)} segment(s)")
+    elif args.command == 'delete':
+        index = BM25Index(args.index_dir)
+        for file_path in args.file_paths:
+            if index.delete(file_path):
+                print(f"  ✓ Deleted {file_path}")
+            else:
+                print(f"  ⚠️  Not indexed: {file_path}")
+        index.save()
+    elif args.command == 'compact':
+        index = BM25Index(args.index_dir)
+        index.compact()
+        print(f"✅ Compacted to {len(index.segments)} segment(s), {len(index.live)} documents")
+    else:
+        index = BM25Index(args.index_dir)
+        start = time.perf_counter()
+        results = index.search(args.text, args.k)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n🔎 BM25 top-{args.k} for: {args.text!r} ({elapsed:.1f} ms)\n")
+        for rank, (score, doc) in enumerate(results, 1):
+            print(f"  {rank:2d}. {score:7.3f}  {doc['file_name']}  [{doc['product']} / {doc['source_type']}]")
+            print(f"             {doc['file_path']}")
+        if not results:
+            print("  (no matches)")
+
+
+if __name__ == "__main__":
+    main()
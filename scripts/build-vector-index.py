@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+GUIDEWIRE GURU - LOCAL VECTOR INDEX
+===================================
+Builds and queries an offline vector index over the output of
+scripts/extract-content.py. No network access is needed: the default
+embedder is a deterministic feature-hashing TF-IDF-style embedder.
+
+Passages are read from chunks-NNNNN.jsonl shards (extract-content.py
+--chunks); when there are none, each extracted document is one passage.
+
+The index directory holds:
+    vectors.npy      float32 matrix, opened memory-mapped at query time
+    metadata.jsonl   one line per row (id, product, source_type, ...)
+    ivf.npz          k-means centroids and inverted lists for IVF search
+    index.json       embedder name/dimension and row count
+
+Usage:
+    python scripts/build-vector-index.py build <extracted_dir> <index_dir> [--dim 512]
+    python scripts/build-vector-index.py query <index_dir> "claim assignment rules" [--k 5]
+        [--product ClaimCenter] [--source-type guidewire_doc] [--nprobe 8] [--exact]
+    python scripts/build-vector-index.py bench <index_dir> [--queries 200] [--k 10]
+
+Custom embedders:
+    --embedder my_module:MyEmbedder
+    The class is constructed with the dimension and must expose .dim and
+    .embed(texts) -> float32 ndarray of unit vectors; optional fit(texts),
+    state() and from_state(dim, state) let it persist corpus statistics.
+
+Requirements:
+    pip install numpy
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import gzip
+import math
+import time
+import zlib
+import argparse
+import importlib
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Error: numpy not installed")
+    print("   Run: pip install numpy")
+    sys.exit(1)
+
+
+TOKEN_RE = re.compile(r'[a-z0-9_]+')
+BATCH_SIZE = 1024
+
+
+class HashingEmbedder:
+    """Deterministic feature-hashing embedder.
+
+    Unigrams and bigrams are hashed (crc32) into `dim` signed buckets with
+    sublinear term frequency, then L2-normalized. When built with document
+    frequencies (see fit), each term is also weighted by its IDF.
+    """
+
+    name = 'hashing'
+
+    def __init__(self, dim=512, idf=None):
+        self.dim = dim
+        self.idf = idf  # per-bucket IDF weights, or None
+
+    def _features(self, text):
+        tokens = TOKEN_RE.findall(text.lower())
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for a, b in zip(tokens, tokens[1:]):
+            bigram = a + ' ' + b
+            counts[bigram] = counts.get(bigram, 0) + 1
+        return counts
+
+    def fit(self, texts):
+        """Collect per-bucket document frequencies into IDF weights"""
+        df = np.zeros(self.dim, dtype=np.float64)
+        n = 0
+        for text in texts:
+            buckets = {zlib.crc32(f.encode('utf-8')) % self.dim for f in self._features(text)}
+            df[list(buckets)] += 1
+            n += 1
+        self.idf = np.log((1 + n) / (1 + df)).astype(np.float32) + 1.0
+        return self
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self._features(text).items():
+                h = zlib.crc32(feature.encode('utf-8'))
+                sign = 1.0 if (h >> 31) & 1 else -1.0
+                vectors[row, h % self.dim] += sign * (1.0 + math.log(count))
+        if self.idf is not None:
+            vectors *= self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def state(self):
+        return {'idf': self.idf.tolist() if self.idf is not None else None}
+
+    @classmethod
+    def from_state(cls, dim, state):
+        idf = state.get('idf')
+        return cls(dim, np.asarray(idf, dtype=np.float32) if idf is not None else None)
+
+
+EMBEDDERS = {
+    'hashing': HashingEmbedder,
+}
+
+
+def load_embedder_class(spec):
+    """Resolve a built-in embedder name or a module:Class path"""
+    if spec in EMBEDDERS:
+        return EMBEDDERS[spec]
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise ValueError(f"Unknown embedder '{spec}' (use one of {sorted(EMBEDDERS)} or module:Class)")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def iter_jsonl(path):
+    """Yield records from a plain or gzipped JSONL file"""
+    with (gzip.open(path, 'rt', encoding='utf-8') if path.endswith('.gz')
+          else open(path, 'r', encoding='utf-8')) as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_passages(extracted_dir):
+    """Yield passages (chunks, or whole documents as a fallback)"""
+    shards = sorted(glob.glob(os.path.join(extracted_dir, 'chunks-*.jsonl')) +
+                    glob.glob(os.path.join(extracted_dir, 'chunks-*.jsonl.gz')))
+    if shards:
+        for shard in shards:
+            yield from iter_jsonl(shard)
+        return
+
+    corpus = sorted(glob.glob(os.path.join(extracted_dir, 'corpus-*.jsonl')) +
+                    glob.glob(os.path.join(extracted_dir, 'corpus-*.jsonl.gz')))
+    if corpus:
+        records = (record for shard in corpus for record in iter_jsonl(shard))
+    else:
+        records = (load_json(path)
+                   for path in sorted(glob.glob(os.path.join(extracted_dir, '*.json'))))
+    for record in records:
+        yield {
+            'id': record.get('id') or record['file_path'],
+            'document_id': record.get('id') or record['file_path'],
+            'file_name': record['file_name'],
+            'section_type': None,
+            'section_start': None,
+            'section_end': None,
+            'source_type': record['source_type'],
+            'product': record['product'],
+            'difficulty': record['difficulty'],
+            'content': record['content'],
+        }
+
+
+def iter_batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def kmeans(vectors, k, iterations=10, seed=0):
+    """Spherical k-means on unit vectors; returns (centroids, assignment)"""
+    rng = np.random.default_rng(seed)
+    centroids = np.array(vectors[rng.choice(len(vectors), size=k, replace=False)])
+    assignment = np.zeros(len(vectors), dtype=np.int32)
+    for _ in range(iterations):
+        sums = np.zeros_like(centroids, dtype=np.float64)
+        for start in range(0, len(vectors), BATCH_SIZE * 8):
+            block = np.asarray(vectors[start:start + BATCH_SIZE * 8])
+            labels = np.argmax(block @ centroids.T, axis=1)
+            assignment[start:start + len(block)] = labels
+            order = np.argsort(labels, kind='stable')
+            clusters, starts = np.unique(labels[order], return_index=True)
+            sums[clusters] += np.add.reduceat(block[order], starts, axis=0)
+        for c in np.flatnonzero(np.bincount(assignment, minlength=k) == 0):
+            sums[c] = vectors[rng.integers(len(vectors))]  # reseed empty cluster
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids.astype(np.float32), assignment
+
+
+def build_index(extracted_dir, index_dir, embedder_spec='hashing', dim=512, nlist=None):
+    """Embed every passage into a memory-mapped matrix plus metadata sidecar"""
+    os.makedirs(index_dir, exist_ok=True)
+
+    print(f"\n🚀 Building vector index from: {extracted_dir}")
+    count = sum(1 for _ in iter_passages(extracted_dir))
+    if count == 0:
+        print("❌ No passages found - run extract-content.py first")
+        sys.exit(1)
+
+    embedder_class = load_embedder_class(embedder_spec)
+    embedder = embedder_class(dim)
+    if hasattr(embedder, 'fit'):
+        print("📊 Fitting embedder...")
+        embedder.fit(p['content'] for p in iter_passages(extracted_dir))
+
+    vectors_path = os.path.join(index_dir, 'vectors.npy')
+    vectors = np.lib.format.open_memmap(vectors_path, mode='w+', dtype=np.float32,
+                                        shape=(count, embedder.dim))
+    row = 0
+    with open(os.path.join(index_dir, 'metadata.jsonl'), 'w', encoding='utf-8') as meta:
+        for batch in iter_batches(iter_passages(extracted_dir), BATCH_SIZE):
+            vectors[row:row + len(batch)] = embedder.embed([p['content'] for p in batch])
+            for passage in batch:
+                meta.write(json.dumps({k: v for k, v in passage.items() if k != 'content'},
+                                      ensure_ascii=False) + '\n')
+            row += len(batch)
+            print(f"  ✓ Embedded {row}/{count}", end='\r')
+    vectors.flush()
+    print()
+
+    # IVF: ~sqrt(n) lists, rows stored grouped by list
+    nlist = nlist or max(1, int(math.sqrt(count)))
+    nlist = min(nlist, count)
+    print(f"🧭 Training IVF with {nlist} lists...")
+    centroids, assignment = kmeans(vectors, nlist)
+    order = np.argsort(assignment, kind='stable').astype(np.int64)
+    offsets = np.searchsorted(assignment[order], np.arange(nlist + 1)).astype(np.int64)
+    np.savez(os.path.join(index_dir, 'ivf.npz'), centroids=centroids, order=order, offsets=offsets)
+
+    info = {
+        'embedder': embedder_spec,
+        'dim': embedder.dim,
+        'count': count,
+        'nlist': nlist,
+        'embedder_state': embedder.state() if hasattr(embedder, 'state') else {},
+    }
+    with open(os.path.join(index_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+
+    print(f"✅ Indexed {count} passages into {index_dir}")
+
+
+class VectorIndex:
+    """Read-only view over an index directory (vectors are memory-mapped)"""
+
+    def __init__(self, index_dir):
+        self.info = load_json(os.path.join(index_dir, 'index.json'))
+        embedder_class = load_embedder_class(self.info['embedder'])
+        if hasattr(embedder_class, 'from_state'):
+            self.embedder = embedder_class.from_state(self.info['dim'], self.info['embedder_state'])
+        else:
+            self.embedder = embedder_class(self.info['dim'])
+        self.vectors = np.load(os.path.join(index_dir, 'vectors.npy'), mmap_mode='r')
+        with open(os.path.join(index_dir, 'metadata.jsonl'), 'r', encoding='utf-8') as f:
+            self.metadata = [json.loads(line) for line in f]
+        ivf = np.load(os.path.join(index_dir, 'ivf.npz'))
+        self.centroids = ivf['centroids']
+        self.order = ivf['order']
+        self.offsets = ivf['offsets']
+        self._columns = {}
+
+    def _column(self, field):
+        if field not in self._columns:
+            self._columns[field] = np.array([m.get(field) or '' for m in self.metadata])
+        return self._columns[field]
+
+    def filter_mask(self, product=None, source_type=None):
+        """Boolean row mask for the metadata filters, or None if unfiltered"""
+        mask = None
+        for field, value in (('product', product), ('source_type', source_type)):
+            if value:
+                column = self._column(field) == value
+                mask = column if mask is None else mask & column
+        return mask
+
+    def _top_k(self, rows, scores, k):
+        if len(scores) > k:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def search_exact(self, query_vector, k=5, mask=None):
+        """Brute-force cosine top-k over all (filtered) rows"""
+        rows = np.flatnonzero(mask) if mask is not None else np.arange(len(self.vectors))
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), BATCH_SIZE * 8):
+            block = rows[start:start + BATCH_SIZE * 8]
+            scores[start:start + len(block)] = self.vectors[block] @ query_vector
+        return self._top_k(rows, scores, k)
+
+    def search_ivf(self, query_vector, k=5, nprobe=8, mask=None):
+        """Approximate top-k: score only the nprobe closest inverted lists"""
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query_vector), nprobe - 1)[:nprobe]
+        rows = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+        if mask is not None:
+            rows = rows[mask[rows]]
+        if len(rows) == 0:
+            return []
+        rows.sort()  # sequential access into the memory map
+        return self._top_k(rows, self.vectors[rows] @ query_vector, k)
+
+    def embed_query(self, text):
+        return self.embedder.embed([text])[0]
+
+
+def query_index(index_dir, text, k=5, product=None, source_type=None, nprobe=8, exact=False):
+    index = VectorIndex(index_dir)
+    mask = index.filter_mask(product, source_type)
+    query_vector = index.embed_query(text)
+
+    start = time.perf_counter()
+    if exact:
+        results = index.search_exact(query_vector, k, mask)
+    else:
+        results = index.search_ivf(query_vector, k, nprobe, mask)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"\n🔎 {'Exact' if exact else f'IVF (nprobe={nprobe})'} top-{k} for: {text!r} ({elapsed:.1f} ms)\n")
+    for rank, (row, score) in enumerate(results, 1):
+        meta = index.metadata[row]
+        section = ''
+        if meta.get('section_type'):
+            section = f" {meta['section_type']} {meta['section_start']}-{meta['section_end']}"
+        print(f"  {rank:2d}. {score:.4f}  {meta['file_name']}{section}  "
+              f"[{meta['product']} / {meta['source_type']}]")
+    if not results:
+        print("  (no matches)")
+
+
+def benchmark_index(index_dir, queries=200, k=10, seed=0):
+    """Recall@k vs. latency for IVF at several nprobe values (exact search is ground truth)"""
+    index = VectorIndex(index_dir)
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(index.vectors), size=min(queries, len(index.vectors)), replace=False)
+    # Queries are existing passages with a little noise, so they are not trivially self-matches
+    query_vectors = np.asarray(index.vectors[np.sort(rows)])
+    query_vectors = query_vectors + rng.normal(0, 0.02, query_vectors.shape).astype(np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+
+    def run(search):
+        results, start = [], time.perf_counter()
+        for q in query_vectors:
+            results.append({row for row, _ in search(q)})
+        return results, (time.perf_counter() - start) * 1000 / len(query_vectors)
+
+    truth, exact_ms = run(lambda q: index.search_exact(q, k))
+
+    print(f"\n📊 Benchmark: {len(query_vectors)} queries, k={k}, "
+          f"{len(index.vectors)} rows, {len(index.centroids)} lists\n")
+    print(f"  {'mode':<16}{'recall@k':>10}{'ms/query':>12}")
+    print(f"  {'exact':<16}{1.0:>10.3f}{exact_ms:>12.3f}")
+    nprobe = 1
+    while nprobe <= len(index.centroids):
+        approx, ms = run(lambda q: index.search_ivf(q, k, nprobe))
+        recall = np.mean([len(a & t) / max(1, len(t)) for a, t in zip(approx, truth)])
+        print(f"  {f'ivf nprobe={nprobe}':<16}{recall:>10.3f}{ms:>12.3f}")
+        nprobe *= 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query a local vector index")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help="Embed extracted passages into an index")
+    build.add_argument('extracted_dir')
+    build.add_argument('index_dir')
+    build.add_argument('--embedder', default='hashing', help="Embedder name or module:Class")
+    build.add_argument('--dim', type=int, default=512, help="Embedding dimension (default: 512)")
+    build.add_argument('--nlist', type=int, default=None, help="IVF lists (default: sqrt(rows))")
+
+    query = sub.add_parser('query', help="Top-k search")
+    query.add_argument('index_dir')
+    query.add_argument('text')
+    query.add_argument('--k', type=int, default=5)
+    query.add_argument('--product')
+    query.add_argument('--source-type')
+    query.add_argument('--nprobe', type=int, default=8)
+    query.add_argument('--exact', action='store_true', help="Brute-force instead of IVF")
+
+    bench = sub.add_parser('bench', help="Recall vs. latency for IVF search")
+    bench.add_argument('index_dir')
+    bench.add_argument('--queries', type=int, default=200)
+    bench.add_argument('--k', type=int, default=10)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if not os.path.isdir(args.extracted_dir):
+            print(f"❌ Error: Directory '{args.extracted_dir}' does not exist")
+            sys.exit(1)
+        build_index(args.extracted_dir, args.index_dir, args.embedder, args.dim, args.nlist)
+    elif args.command == 'query':
+        query_index(args.index_dir, args.text, args.k, args.product, args.source_type,
+                    args.nprobe, args.exact)
+    else:
+        benchmark_index(args.index_dir, args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Check the JSON output names of scripts/extract-content.py.
+
+A source is written as <stem>.json unless another extractable source has
+the same stem, in which case each of them gets <stem>-<document id>.json.
+Files the extractor skips (the recording next to a deck) must not count:
+Lesson1.pptx next to Lesson1.mp4 is still Lesson1.json.
+
+Checks json_output_names() directly, then runs process_directory() on a
+small lesson folder in a temp directory:
+1. Lesson1.md with Lesson1.mp4 and Lesson1.srt next to it -> Lesson1.json
+2. add notes/lesson1.txt (same stem, extractable) -> both renamed, and the
+   old Lesson1.json is removed
+3. remove it again -> back to Lesson1.json
+Exits 1 on the first failure.
+
+Usage:
+    python scripts/check-output-names.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import contextlib
+import importlib.util
+from pathlib import Path
+
+LESSON_TEXT = ("Lesson 1 covers the ClaimCenter claim lifecycle, from first notice of loss "
+               "through exposures, reserves and payments.\n")
+
+
+def load_extractor():
+    path = Path(__file__).with_name('extract-content.py')
+    spec = importlib.util.spec_from_file_location('extract_content', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def check(condition, message):
+    if not condition:
+        print(f"❌ {message}")
+        sys.exit(1)
+    print(f"   ✓ {message}")
+
+
+def outputs(output_dir):
+    return sorted(name for name in os.listdir(output_dir)
+                  if name.endswith('.json') and not name.startswith('.'))
+
+
+def main():
+    extractor = load_extractor()
+
+    print("📋 json_output_names()")
+    names = extractor.json_output_names(['lessons/Lesson1.docx', 'lessons/Lesson1.mp4', 'lessons/Lesson1.srt'])
+    check(names['lessons/Lesson1.docx'] == 'Lesson1.json',
+          "a video and subtitles with the same stem leave Lesson1.json unchanged")
+    names = extractor.json_output_names(['a/Lesson1.md', 'b/lesson1.pdf', 'b/lesson1.mp4'])
+    check(names['a/Lesson1.md'] != names['b/lesson1.pdf'] and names['a/Lesson1.md'].startswith('Lesson1-'),
+          "two extractable sources with the same stem get distinct names")
+
+    print("📁 process_directory()")
+    work_dir = tempfile.mkdtemp(prefix='output-names-')
+    try:
+        input_dir = os.path.join(work_dir, 'data')
+        output_dir = os.path.join(work_dir, 'out')
+        lessons = os.path.join(input_dir, 'lessons')
+        os.makedirs(lessons)
+        Path(lessons, 'Lesson1.md').write_text(LESSON_TEXT, encoding='utf-8')
+        Path(lessons, 'Lesson1.mp4').write_bytes(b'\x00\x00\x00\x18ftypmp42' + bytes(64))
+        Path(lessons, 'Lesson1.srt').write_text("1\n00:00:01,000 --> 00:00:04,000\nWelcome\n", encoding='utf-8')
+
+        def run():
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                extractor.process_directory(input_dir, output_dir)
+            return outputs(output_dir)
+
+        check(run() == ['Lesson1.json'], "Lesson1.md next to Lesson1.mp4 and Lesson1.srt -> Lesson1.json")
+
+        notes = os.path.join(input_dir, 'notes')
+        os.makedirs(notes)
+        Path(notes, 'lesson1.txt').write_text(LESSON_TEXT, encoding='utf-8')
+        written = run()
+        check(len(written) == 2 and 'Lesson1.json' not in written
+              and all(name.lower().startswith('lesson1-') for name in written),
+              f"an extractable notes/lesson1.txt renames both ({', '.join(written)})")
+
+        shutil.rmtree(notes)
+        check(run() == ['Lesson1.json'], "removing it restores Lesson1.json")
+    finally:
+        shutil.rmtree(work_dir)
+
+    print("✅ Output names are stable")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Check that extracting a large PDF with scripts/extract-content.py keeps peak
+memory proportional to one page, not to the document.
+
+Generates a PDF with many text-heavy pages, then runs extract_record() and
+write_record() on it under tracemalloc. The peak may not exceed the spool
+threshold:
+
+    TREE_SLACK x page tree + PAGE_FACTOR x largest page + SPOOL_FACTOR x SPOOL_PIECE_SIZE
+
+The page tree is what PyPDF2 itself holds for the document's page objects
+(measured by opening the same file without extracting anything), with slack
+for the reference cycles its parser leaves until a full collection; everything
+above it must fit in a few pages of text and spool read-back pieces. A
+pipeline that joins the pages, or a reader that keeps every content stream it
+parsed, goes well over it. Exits 1 when the threshold is exceeded.
+
+Usage:
+    python scripts/check-pdf-memory.py [--pages 400] [--lines 120] [--keep]
+"""
+
+import os
+import sys
+import random
+import argparse
+import tempfile
+import tracemalloc
+import importlib.util
+from pathlib import Path
+
+PAGE_FACTOR = 16   # parsed content stream, extracted text and its cleaned copy, with headroom
+SPOOL_FACTOR = 4   # read-back piece, its JSON-escaped copy and the write buffer
+TREE_SLACK = 1.25  # PyPDF2 parser garbage, freed only by a full gc pass
+
+
+def load_extractor():
+    path = Path(__file__).with_name('extract-content.py')
+    spec = importlib.util.spec_from_file_location('extract_content', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def pdf_string(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_synthetic_pdf(path, pages, lines, seed=0):
+    """Write a PDF of `pages` pages with `lines` lines of Helvetica text each.
+
+    Returns the size of the largest page's text in bytes.
+    """
+    rng = random.Random(seed)
+    words = ['ClaimCenter', 'policy', 'Gosu', 'entity', 'typelist', 'rule', 'exposure',
+             'the', 'and', 'configuration', 'PCF', 'plugin', 'integration', 'a', 'of']
+    offsets = []
+    largest = 0
+
+    with open(path, 'wb') as f:
+        def write_object(body):
+            offsets.append(f.tell())
+            f.write(b'%d 0 obj\n' % len(offsets) + body + b'\nendobj\n')
+
+        f.write(b'%PDF-1.4\n')
+        # 1: catalog, 2: page tree, 3: font, then a page and its content stream per page
+        write_object(b'<< /Type /Catalog /Pages 2 0 R >>')
+        kids = b' '.join(b'%d 0 R' % (4 + 2 * i) for i in range(pages))
+        write_object(b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % pages)
+        write_object(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+        for i in range(pages):
+            text = [' '.join(rng.choice(words) for _ in range(rng.randint(6, 14))) for _ in range(lines)]
+            largest = max(largest, sum(len(line) + 1 for line in text))
+            stream = ('BT /F1 9 Tf 11 TL 40 800 Td\n'
+                      + ''.join(f"({pdf_string(line)}) Tj T*\n" for line in text)
+                      + 'ET').encode('latin-1')
+            write_object(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                         b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (5 + 2 * i))
+            write_object(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+
+        xref = f.tell()
+        f.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(offsets) + 1))
+        for offset in offsets:
+            f.write(b'%010d 00000 n \n' % offset)
+        f.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                % (len(offsets) + 1, xref))
+    return largest
+
+
+def traced_peak(fn):
+    """Run fn() under tracemalloc; returns (result, peak bytes)"""
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the peak memory of extracting a large PDF')
+    parser.add_argument('--pages', type=int, default=400, help='Pages in the generated PDF (default: 400)')
+    parser.add_argument('--lines', type=int, default=120, help='Lines of text per page (default: 120)')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated PDF and JSON')
+    args = parser.parse_args()
+
+    extractor = load_extractor()
+    extractor.get_classifier()  # load the rules before measuring
+
+    work_dir = tempfile.mkdtemp(prefix='pdf-memory-')
+    pdf_path = os.path.join(work_dir, 'synthetic-manual.pdf')
+    largest_page = write_synthetic_pdf(pdf_path, args.pages, args.lines)
+    print(f"📄 {args.pages} pages, {os.path.getsize(pdf_path) / 1024 / 1024:.1f} MB PDF "
+          f"(largest page {largest_page / 1024:.1f} KB of text)")
+
+    def open_page_tree():
+        with open(pdf_path, 'rb') as f:
+            return len(extractor.PyPDF2.PdfReader(f).pages)
+
+    def extract_and_write():
+        record = extractor.extract_record(pdf_path)
+        try:
+            length = record['content'].length
+            output_file = extractor.write_record(record, work_dir)
+        finally:
+            extractor.discard_content(record)
+        return length, os.path.getsize(output_file)
+
+    _, page_tree = traced_peak(open_page_tree)
+    (content_length, json_size), peak = traced_peak(extract_and_write)
+
+    budget = PAGE_FACTOR * largest_page + SPOOL_FACTOR * extractor.SPOOL_PIECE_SIZE
+    threshold = int(TREE_SLACK * page_tree) + budget
+    print(f"   Content:     {content_length / 1024 / 1024:.1f} MB ({json_size / 1024 / 1024:.1f} MB of JSON)")
+    print(f"   Page tree:   {page_tree / 1024:.0f} KB")
+    print(f"   Peak:        {peak / 1024:.0f} KB")
+    print(f"   Threshold:   {threshold / 1024:.0f} KB")
+
+    if not args.keep:
+        for name in os.listdir(work_dir):
+            os.unlink(os.path.join(work_dir, name))
+        os.rmdir(work_dir)
+    else:
+        print(f"   Kept in {work_dir}")
+
+    if content_length < 4 * budget:
+        print("❌ Document too small to tell a streaming pipeline from one that buffers it: "
+              "raise --pages or --lines")
+        sys.exit(1)
+    if peak > threshold:
+        print(f"❌ Peak memory exceeds the spool threshold by {(peak - threshold) / 1024:.0f} KB")
+        sys.exit(1)
+    print("✅ Peak memory stays within the spool threshold")
+
+
+if __name__ == '__main__':
+    main()
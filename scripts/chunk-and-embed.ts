@@ -277,7 +277,7 @@ async function processDirectory(extractedDir: string) {
   
   // Get all JSON files
   const files = await fs.readdir(extractedDir);
-  const jsonFiles = files.filter(f => f.endsWith('.json'));
+  const jsonFiles = files.filter(f => f.endsWith('.json') && !f.startsWith('.'));
   
   if (jsonFiles.length === 0) {
     console.error('❌ No JSON files found in directory');
@@ -0,0 +1,329 @@
+"""
+Parallel, resumable file copier used by reorganize-content.py --execute.
+
+copy_files() copies (source, dest) mappings on a thread pool. Copies are
+I/O bound, so threads overlap the waits; size the pool for the storage
+(1-2 for a single spinning disk, 8-16 for SSDs or network mounts).
+
+A mapping is skipped when its destination is already up to date:
+- the journal records the same mapping, made in the same link_mode, from a
+  source with the current size and mtime, and the destination still has
+  that size, or
+- the destination's size and mtime (to the second) match the source's;
+  copies keep the source mtime, like shutil.copy2.
+A hardlink is up to date only if it is the source's inode, and a symlink
+only if it points at the source, so switching link_mode redoes the files.
+
+The journal (JSON lines, one per completed copy) is appended as copies
+finish and compacted at the start of each run, so a run that stops
+midway resumes where it left off. Each file is copied to a temporary
+name and renamed into place, so an interrupted copy never leaves a
+truncated destination behind.
+
+Progress is printed every few seconds in bytes per second.
+
+link_mode decides how a destination is created:
+- copy      copies the data in the kernel: copy_file_range(), then
+            sendfile(), then a buffered read/write loop, each taking over
+            when the one before is unsupported (e.g. across filesystems)
+- hardlink  links the destination to the source's inode (no extra space;
+            editing either file changes both)
+- reflink   clones the source's extents (copy-on-write, Btrfs/XFS/...)
+- symlink   a relative symlink to the source
+A hardlink or reflink that is not possible, e.g. because the source and
+destination are on different filesystems, falls back to a copy. Each
+fallback is counted in the summary.
+"""
+
+import os
+import json
+import stat
+import time
+import errno
+import shutil
+import threading
+from collections import Counter
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflinks
+    fcntl = None
+
+COPY_CHUNK = 8 * 1024 * 1024
+LINK_MODES = ('copy', 'hardlink', 'reflink', 'symlink')
+
+# ioctl(dest_fd, FICLONE, src_fd) clones a whole file on Linux
+FICLONE = 0x40049409
+
+# Errors meaning "this way of copying is not supported here", as opposed
+# to a real I/O error
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                      errno.ENOTSUP, errno.ENOTTY, errno.ENOTSOCK, errno.EPERM}
+
+
+def format_bytes(n):
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+class CopyJournal:
+    """Completed copies, keyed by destination"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._fh = None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted run
+                    self.entries[entry['dest']] = entry
+        except OSError:
+            pass
+
+    def open(self):
+        """Compact the journal to its live entries and open it for appending"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, sort_keys=True) + '\n')
+        os.replace(tmp_path, self.path)
+        self._fh = open(self.path, 'a', encoding='utf-8')
+
+    def is_done(self, source, dest, src_stat, dest_stat, link_mode):
+        entry = self.entries.get(str(dest))
+        return (entry is not None and entry['source'] == str(source)
+                and entry.get('mode', 'copy') == link_mode
+                and entry['size'] == src_stat.st_size and entry['mtime'] == int(src_stat.st_mtime)
+                and dest_stat.st_size == src_stat.st_size)
+
+    def record(self, source, dest, src_stat, link_mode):
+        entry = {'source': str(source), 'dest': str(dest), 'mode': link_mode,
+                 'size': src_stat.st_size, 'mtime': int(src_stat.st_mtime)}
+        with self._lock:
+            self.entries[entry['dest']] = entry
+            self._fh.write(json.dumps(entry, sort_keys=True) + '\n')
+            self._fh.flush()
+
+    def forget(self, dest):
+        """Drop the entry of a destination that was deleted"""
+        with self._lock:
+            self.entries.pop(str(dest), None)
+
+    def move(self, old_dest, new_dest, source):
+        """Re-key the entry of a destination that was renamed"""
+        with self._lock:
+            entry = self.entries.pop(str(old_dest), None)
+            if entry is not None:
+                self.entries[str(new_dest)] = {**entry, 'dest': str(new_dest), 'source': str(source)}
+
+    def close(self):
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+
+class CopyStats:
+    """Counters shared by the copy threads and the progress reporter"""
+
+    def __init__(self, total_files):
+        self.total_files = total_files
+        self.copied = 0
+        self.skipped = 0
+        self.failed = []
+        self.bytes_copied = 0
+        self.methods = Counter()    # how each destination was created
+        self.fallbacks = Counter()  # "hardlink (EXDEV)" -> count
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def count(self, counter, key):
+        with self._lock:
+            counter[key] += 1
+
+    def fail(self, source, error):
+        with self._lock:
+            self.failed.append((source, error))
+
+    def rate(self):
+        return self.bytes_copied / max(time.monotonic() - self.started, 1e-6)
+
+    def progress_line(self):
+        done = self.copied + self.skipped + len(self.failed)
+        return (f"   📊 {done}/{self.total_files} files, "
+                f"{format_bytes(self.bytes_copied)} copied at {format_bytes(self.rate())}/s")
+
+
+def _symlink_target(source, dest):
+    return os.path.relpath(os.path.abspath(source), os.path.abspath(dest.parent))
+
+
+def is_up_to_date(source, dest, src_stat, journal, link_mode):
+    """Whether dest already holds source as link_mode would create it"""
+    try:
+        dest_stat = os.lstat(dest)
+    except OSError:
+        return False
+    if stat.S_ISLNK(dest_stat.st_mode):
+        return link_mode == 'symlink' and os.readlink(dest) == _symlink_target(source, dest)
+    if link_mode == 'symlink':
+        return False
+    if os.path.samestat(src_stat, dest_stat):
+        return link_mode == 'hardlink'
+    if link_mode == 'hardlink' and dest_stat.st_dev == src_stat.st_dev:
+        return False  # a copy that can become a link and free its space
+    if journal.is_done(source, dest, src_stat, dest_stat, link_mode):
+        return True
+    return dest_stat.st_size == src_stat.st_size and int(dest_stat.st_mtime) == int(src_stat.st_mtime)
+
+
+def _kernel_copy(method, src_fd, dst_fd, offset, size, stats):
+    """Copy from offset with copy_file_range() or sendfile(); returns the new offset"""
+    if method == 'sendfile':
+        os.lseek(dst_fd, offset, os.SEEK_SET)  # sendfile writes at the current position
+    while offset < size:
+        count = min(COPY_CHUNK, size - offset)
+        if method == 'copy_file_range':
+            n = os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+        else:
+            n = os.sendfile(dst_fd, src_fd, offset, count)
+        if not n:
+            break
+        offset += n
+        stats.add(bytes_copied=n)
+    return offset
+
+
+def _copy_data(source, tmp_path, stats):
+    """Copy file contents in the kernel where possible; returns the method used.
+
+    Each method continues from where the previous one stopped, and the
+    buffered loop finishes whatever is left.
+    """
+    methods = [m for m in ('copy_file_range', 'sendfile') if hasattr(os, m)]
+    with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        for method in methods:
+            try:
+                offset = _kernel_copy(method, src.fileno(), dst.fileno(), offset, size, stats)
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+                stats.count(stats.fallbacks, f"{method} ({errno.errorcode.get(e.errno, e.errno)})")
+                continue
+            if offset >= size:
+                return method
+        src.seek(offset)
+        dst.seek(offset)
+        buffer = bytearray(COPY_CHUNK)
+        view = memoryview(buffer)
+        while True:
+            n = src.readinto(buffer)
+            if not n:
+                break
+            dst.write(view[:n])
+            stats.add(bytes_copied=n)
+        return 'buffered'
+
+
+def _reflink(source, tmp_path):
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _create(source, tmp_path, link_mode, stats):
+    """Create tmp_path from source in link_mode, falling back to a copy"""
+    if link_mode == 'symlink':
+        os.symlink(_symlink_target(source, tmp_path), tmp_path)
+        return 'symlink'
+    if link_mode in ('hardlink', 'reflink'):
+        try:
+            if link_mode == 'hardlink':
+                os.link(source, tmp_path)
+            else:
+                _reflink(source, tmp_path)
+            return link_mode
+        except OSError as e:
+            if e.errno not in UNSUPPORTED_ERRNOS:
+                raise
+            stats.count(stats.fallbacks, f"{link_mode} ({errno.errorcode.get(e.errno, e.errno)})")
+            if os.path.lexists(tmp_path):
+                os.unlink(tmp_path)
+    method = _copy_data(source, tmp_path, stats)
+    shutil.copystat(source, tmp_path)
+    return method
+
+
+def _copy_one(source, dest, journal, stats, link_mode, force):
+    try:
+        src_stat = source.stat()
+        if not force and is_up_to_date(source, dest, src_stat, journal, link_mode):
+            stats.add(skipped=1)
+            return
+        tmp_path = dest.with_name(f".{dest.name}.part")
+        if os.path.lexists(tmp_path):
+            os.unlink(tmp_path)  # left over from an interrupted run
+        try:
+            method = _create(source, tmp_path, link_mode, stats)
+            os.replace(tmp_path, dest)
+        finally:
+            if os.path.lexists(tmp_path):
+                os.unlink(tmp_path)
+        journal.record(source, dest, src_stat, link_mode)
+        stats.count(stats.methods, method)
+        stats.add(copied=1)
+    except OSError as e:
+        stats.fail(source, e)
+
+
+def copy_files(mappings, journal_path, workers=4, progress_interval=5.0, link_mode='copy',
+               force=False):
+    """Copy (source, dest) pairs in parallel, skipping up-to-date ones.
+
+    Destination directories must exist. Returns CopyStats; failed copies
+    are listed in stats.failed as (source, error) and are retried on the
+    next run. With force every pair is copied, for callers that already
+    know which destinations are stale (reorg_planner.py).
+    """
+    journal = CopyJournal(journal_path)
+    journal.open()
+    stats = CopyStats(len(mappings))
+    done = threading.Event()
+
+    def report():
+        while not done.wait(progress_interval):
+            print(stats.progress_line(), flush=True)
+
+    reporter = threading.Thread(target=report, daemon=True)
+    reporter.start()
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        futures = [executor.submit(_copy_one, Path(source), Path(dest), journal, stats, link_mode, force)
+                   for source, dest in mappings]
+        for future in futures:
+            future.result()
+    finally:
+        # On Ctrl-C, drop queued copies; finished ones are already journaled
+        executor.shutdown(cancel_futures=True)
+        done.set()
+        reporter.join()
+        journal.close()
+    return stats
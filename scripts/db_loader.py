@@ -0,0 +1,343 @@
+"""
+Direct database loader for the SQL-generating scripts (--load DSN).
+
+Instead of writing SQL to paste into the Supabase SQL editor,
+extract-quizzes-from-ppts.py, generate-quiz-sql.py and
+reorganize-content.py --sql can load their rows straight into Postgres:
+
+    python3 scripts/extract-quizzes-from-ppts.py --load "$DATABASE_URL"
+
+- Connections come from a small pool; batches are loaded in parallel on
+  separate connections, one transaction per batch.
+- Topic and product IDs are resolved up front with one query, not a
+  subquery per inserted row.
+- Every value is bound as a parameter (psycopg binds them server-side),
+  never formatted into the SQL text.
+- Re-running is idempotent. A quiz is identified by (topic, title): an
+  existing quiz is updated and its questions replaced. Topics are
+  upserted on their id.
+
+A DSN of sqlite:///path/to/file.db loads into SQLite instead, as a local
+stand-in for testing. Missing tables are created there (SQLITE_SCHEMA).
+
+Run as a script, it exports a code -> id snapshot of topics and products:
+
+    python3 scripts/db_loader.py "$DATABASE_URL" database/id-snapshot.json
+
+The SQL generators take it as --id-snapshot FILE and write the resolved
+IDs into their statements instead of a (SELECT id FROM topics WHERE
+code = '...') lookup per row. Re-export after topics are re-created; a
+stale ID fails the foreign key instead of loading into the wrong topic.
+
+Requirements:
+    pip install "psycopg[binary]"
+"""
+
+import sys
+import json
+import uuid
+import queue
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Largest IN (...) list per query (SQLite allows 999 parameters by default)
+MAX_IN_PARAMS = 500
+
+# Tables whose code -> id maps go into an ID snapshot
+ID_SNAPSHOT_TABLES = ('topics', 'products')
+
+# Tables used by the scripts, for the SQLite stand-in
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+  id TEXT PRIMARY KEY,
+  code TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS topics (
+  id TEXT PRIMARY KEY,
+  code TEXT UNIQUE,
+  product_id TEXT REFERENCES products(id),
+  position INTEGER,
+  title TEXT NOT NULL,
+  description TEXT,
+  duration_minutes INTEGER,
+  prerequisites TEXT,
+  content TEXT,
+  published BOOLEAN
+);
+CREATE TABLE IF NOT EXISTS quizzes (
+  id TEXT PRIMARY KEY,
+  topic_id TEXT REFERENCES topics(id),
+  title TEXT NOT NULL,
+  description TEXT,
+  passing_score INTEGER,
+  time_limit_minutes INTEGER,
+  published BOOLEAN
+);
+CREATE TABLE IF NOT EXISTS quiz_questions (
+  id TEXT PRIMARY KEY,
+  quiz_id TEXT NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+  position INTEGER,
+  question TEXT NOT NULL,
+  options TEXT,
+  correct_answer TEXT NOT NULL,
+  explanation TEXT,
+  points INTEGER
+);
+"""
+
+
+class _Cursor:
+    """Cursor wrapper so queries can always be written with %s placeholders"""
+
+    def __init__(self, cursor, placeholder):
+        self._cursor = cursor
+        self._placeholder = placeholder
+
+    def _sql(self, query):
+        return query if self._placeholder == '%s' else query.replace('%s', self._placeholder)
+
+    def execute(self, query, params=()):
+        self._cursor.execute(self._sql(query), params)
+        return self
+
+    def executemany(self, query, rows):
+        rows = list(rows)
+        if rows:
+            self._cursor.executemany(self._sql(query), rows)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+
+class ConnectionPool:
+    """A small pool of database connections, opened on first use.
+
+    Usage:
+        pool = ConnectionPool("postgresql://...", size=4)
+        with pool.transaction() as cur:
+            cur.execute("SELECT id FROM topics WHERE code = %s", (code,))
+        pool.close()
+    """
+
+    def __init__(self, dsn, size=4):
+        self.dsn = dsn
+        self.sqlite_path = dsn[len('sqlite:///'):] if dsn.startswith('sqlite:///') else None
+        # SQLite allows a single writer, so parallel batches would only wait on each other
+        self.size = 1 if self.sqlite_path is not None else max(1, size)
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.sqlite_path is not None:
+            conn = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.executescript(SQLITE_SCHEMA)
+            return conn
+        try:
+            import psycopg
+        except ImportError:
+            print("❌ psycopg not installed. Run: pip install 'psycopg[binary]'")
+            sys.exit(1)
+        return psycopg.connect(self.dsn)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.size:
+                conn = self._connect()
+                self._connections.append(conn)
+                return conn
+        return self._idle.get()
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection; commit when the block succeeds, else roll back"""
+        conn = self._acquire()
+        try:
+            yield _Cursor(conn.cursor(), '?' if self.sqlite_path is not None else '%s')
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _in_list(count):
+    return ', '.join(['%s'] * count)
+
+
+def resolve_ids(pool, table, codes):
+    """Map code -> id for the given codes (missing codes are left out)"""
+    ids = {}
+    with pool.transaction() as cur:
+        for chunk in _chunks(sorted(set(codes)), MAX_IN_PARAMS):
+            cur.execute(f"SELECT code, id FROM {table} WHERE code IN ({_in_list(len(chunk))})", chunk)
+            ids.update((code, str(row_id)) for code, row_id in cur.fetchall())
+    return ids
+
+
+def export_id_snapshot(pool, path):
+    """Write the code -> id maps of ID_SNAPSHOT_TABLES to a JSON file"""
+    snapshot = {}
+    with pool.transaction() as cur:
+        for table in ID_SNAPSHOT_TABLES:
+            cur.execute(f"SELECT code, id FROM {table} WHERE code IS NOT NULL")
+            snapshot[table] = {code: str(row_id) for code, row_id in cur.fetchall()}
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(snapshot, indent=2, sort_keys=True) + '\n')
+    return snapshot
+
+
+def read_id_snapshot(path):
+    """Return {table: {code: id}} from a snapshot written by export_id_snapshot()"""
+    snapshot = json.loads(Path(path).read_text())
+    return {table: snapshot.get(table, {}) for table in ID_SNAPSHOT_TABLES}
+
+
+def _run_batches(pool, batches, load_batch):
+    """Load batches in parallel, one connection and transaction each"""
+    if pool.size == 1 or len(batches) < 2:
+        return [load_batch(batch) for batch in batches]
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        return list(executor.map(load_batch, batches))
+
+
+def load_quizzes(pool, quizzes, batch_size=50):
+    """Insert or replace quizzes and their questions.
+
+    quizzes are dicts with topic_code, title, description, passing_score,
+    time_limit, published and questions (each with question, options,
+    correct_answer, explanation and points).
+
+    Returns (quizzes loaded, questions loaded, topic codes not found).
+    """
+    topic_ids = resolve_ids(pool, 'topics', (quiz['topic_code'] for quiz in quizzes))
+    missing = sorted({quiz['topic_code'] for quiz in quizzes} - set(topic_ids))
+
+    # One entry per (topic, title); a later duplicate replaces an earlier one
+    by_key = {}
+    for quiz in quizzes:
+        if quiz['topic_code'] in topic_ids:
+            by_key[(topic_ids[quiz['topic_code']], quiz['title'])] = quiz
+
+    def load_batch(batch):
+        with pool.transaction() as cur:
+            existing = {}
+            for chunk in _chunks(sorted({topic_id for (topic_id, _), _ in batch}), MAX_IN_PARAMS):
+                cur.execute(f"SELECT id, topic_id, title FROM quizzes WHERE topic_id IN ({_in_list(len(chunk))})",
+                            chunk)
+                existing.update(((str(topic_id), title), str(quiz_id))
+                                for quiz_id, topic_id, title in cur.fetchall())
+
+            new_quizzes, updated_quizzes, questions = [], [], []
+            for key, quiz in batch:
+                fields = (quiz['description'], quiz['passing_score'], quiz['time_limit'], quiz['published'])
+                quiz_id = existing.get(key)
+                if quiz_id:
+                    updated_quizzes.append(fields + (quiz_id,))
+                else:
+                    quiz_id = str(uuid.uuid4())
+                    new_quizzes.append((quiz_id,) + key + fields)
+                for position, q in enumerate(quiz['questions'], 1):
+                    questions.append((str(uuid.uuid4()), quiz_id, position, q['question'],
+                                      json.dumps(q['options']), q['correct_answer'],
+                                      q.get('explanation'), q.get('points', 1)))
+
+            cur.executemany(
+                "UPDATE quizzes SET description = %s, passing_score = %s, time_limit_minutes = %s, "
+                "published = %s WHERE id = %s",
+                updated_quizzes,
+            )
+            for chunk in _chunks((row[-1] for row in updated_quizzes), MAX_IN_PARAMS):
+                cur.execute(f"DELETE FROM quiz_questions WHERE quiz_id IN ({_in_list(len(chunk))})", chunk)
+            cur.executemany(
+                "INSERT INTO quizzes (id, topic_id, title, description, passing_score, "
+                "time_limit_minutes, published) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                new_quizzes,
+            )
+            cur.executemany(
+                "INSERT INTO quiz_questions (id, quiz_id, position, question, options, "
+                "correct_answer, explanation, points) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                questions,
+            )
+        return len(batch), len(questions)
+
+    batches = list(_chunks(by_key.items(), max(1, batch_size)))
+    results = _run_batches(pool, batches, load_batch)
+    return sum(n for n, _ in results), sum(n for _, n in results), missing
+
+
+def load_topics(pool, topics, batch_size=100):
+    """Upsert topics on their id.
+
+    topics are dicts with id, product_code, position, title, description,
+    duration_minutes and content (a JSON-serializable value).
+
+    Returns (topics loaded, product codes not found).
+    """
+    product_ids = resolve_ids(pool, 'products', (topic['product_code'] for topic in topics))
+    missing = sorted({topic['product_code'] for topic in topics} - set(product_ids))
+    rows = [
+        (topic['id'], product_ids[topic['product_code']], topic['position'], topic['title'],
+         topic['description'], topic['duration_minutes'], '[]', json.dumps(topic['content']), True)
+        for topic in topics
+        if topic['product_code'] in product_ids
+    ]
+
+    def load_batch(batch):
+        with pool.transaction() as cur:
+            cur.executemany(
+                "INSERT INTO topics (id, product_id, position, title, description, duration_minutes, "
+                "prerequisites, content, published) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) "
+                "ON CONFLICT (id) DO UPDATE SET title = EXCLUDED.title, "
+                "description = EXCLUDED.description, duration_minutes = EXCLUDED.duration_minutes, "
+                "content = EXCLUDED.content",
+                batch,
+            )
+        return len(batch)
+
+    return sum(_run_batches(pool, list(_chunks(rows, max(1, batch_size))), load_batch)), missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a topic/product code -> id snapshot "
+                                                 "for the SQL generators' --id-snapshot")
+    parser.add_argument('dsn', help="postgresql://... or sqlite:///file.db")
+    parser.add_argument('output', nargs='?', default='database/id-snapshot.json',
+                        help="Snapshot file (default: database/id-snapshot.json)")
+    args = parser.parse_args()
+
+    with ConnectionPool(args.dsn, size=1) as pool:
+        snapshot = export_id_snapshot(pool, args.output)
+    counts = ', '.join(f"{len(ids)} {table}" for table, ids in snapshot.items())
+    print(f"✅ Exported {counts} to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Cached directory tree used by reorganize-content.py to scan data/.
+
+Path.iterdir() costs a directory listing on every call, and each
+is_dir()/is_file() check on its results is another stat(). DirNode lists
+its directory once with os.scandir() and keeps the DirEntry objects:
+their file type comes from the listing itself (d_type on Linux/macOS),
+and their stat() result is cached by the entry after the first call. Every
+later query of the same directory costs no syscalls.
+
+Directories are listed on first access, so a scan only touches the
+directories it asks about, each one once:
+
+    root = DirNode(Path("data"))
+    for chapter in root.subdirs():
+        for lesson in chapter.subdirs():
+            print(lesson.path, lesson.files())
+"""
+
+import os
+from pathlib import Path
+
+
+class DirNode:
+    """One directory whose listing is read once and then cached"""
+
+    __slots__ = ('path', '_entries', '_subdirs')
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._entries = None
+        self._subdirs = None
+
+    @property
+    def name(self):
+        return self.path.name
+
+    def entries(self):
+        """All DirEntry objects, hidden ones included, in listing order"""
+        if self._entries is None:
+            with os.scandir(self.path) as it:
+                self._entries = list(it)
+        return self._entries
+
+    def subdirs(self, hidden=False):
+        """Child directories (following symlinks, like Path.is_dir()), in listing order"""
+        if self._subdirs is None:
+            self._subdirs = [DirNode(entry.path) for entry in self.entries() if entry.is_dir()]
+        return [node for node in self._subdirs if hidden or not node.name.startswith('.')]
+
+    def files(self, hidden=False):
+        """Paths of regular files (following symlinks, like Path.is_file()), in listing order"""
+        return [Path(entry.path) for entry in self.file_entries(hidden)]
+
+    def file_entries(self, hidden=False):
+        """DirEntry objects of regular files; entry.stat() is cached after the first call"""
+        return [entry for entry in self.entries()
+                if entry.is_file() and (hidden or not entry.name.startswith('.'))]
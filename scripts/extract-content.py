@@ -5,22 +5,81 @@ GUIDEWIRE GURU - CONTENT EXTRACTION SCRIPT
 Extracts text content from PDF, PPTX, DOCX, TXT, MD, and code files.
 Saves extracted content as JSON files for embedding pipeline.
 
+Runs are incremental: a manifest in the output directory records each
+source's size, mtime and content hash, so unchanged files are skipped,
+modified ones re-extracted and JSON for removed sources deleted.
+
+With --format jsonl, records are streamed into size-bounded (optionally
+gzipped) corpus-NNNNN.jsonl shards in relative-path order, each carrying
+a stable `id` derived from its relative path.
+
+With --chunks, the corpus is also split on its slide/page markers into
+embedding-ready passages (chunks-NNNNN.jsonl) whose IDs hash the chunk
+text, so only changed chunks need re-embedding.
+
 Usage:
-    python scripts/extract-content.py <input_dir> <output_dir>
+    python scripts/extract-content.py <input_dir> <output_dir> [--workers N] [--prefetch N] [--full]
+        [--timeout SECONDS] [--max-rss MB] [--retry-quarantined]
+        [--format json|jsonl] [--shard-size MB] [--gzip]
+        [--chunks] [--chunk-chars N] [--chunk-overlap N]
+        [--profile] [--profile-top N] [--cprofile PATH]
 
 Example:
     python scripts/extract-content.py ./guidewire-knowledge ./extracted-knowledge
+    python scripts/extract-content.py ./guidewire-knowledge ./extracted-knowledge --workers 8
+    python scripts/extract-content.py /mnt/share/knowledge ./extracted-knowledge --workers 8 --prefetch 32
+    python scripts/extract-content.py ./guidewire-knowledge ./corpus --format jsonl --gzip
+
+Source type, product and difficulty are assigned by keyword rules in
+scripts/classifier-rules.json (override with --rules); each record also
+carries a confidence score per category.
+
+--timeout and --max-rss guard each file's extraction. Files that hit a
+guard or crash a worker when re-run on their own are listed in
+.extract-quarantine.json and skipped until they change (or
+--retry-quarantined is given).
+
+Parsed decks are cached by content hash (scripts/pptx_cache.py), so a deck
+is parsed once per change across this script and the quiz extractor.
+
+With --profile, each file's parse/clean/classify/spool/hash/write stages
+are timed and a report (.extract-profile.json in the output directory,
+plus a summary table) gives percentiles by extension and the slowest files.
 
 Requirements:
     pip install python-pptx PyPDF2 python-docx
 """
 
 import os
+import io
+import re
 import json
 import sys
+import argparse
+import hashlib
+import glob
+import gzip
+import signal
+import tempfile
+import threading
+import _thread
+import asyncio
+import math
+import multiprocessing
+import time
+import cProfile
+from collections import Counter, deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import resource  # peak RSS for --profile (not available on Windows)
+except ImportError:
+    resource = None
+
 try:
     from pptx import Presentation
     import PyPDF2
@@ -30,19 +89,101 @@ except ImportError:
     print("Run: pip install python-pptx PyPDF2 python-docx")
     sys.exit(1)
 
+from pptx_cache import load_deck, default_cache_dir
 
-def extract_pptx(file_path):
-    """Extract text from PowerPoint files"""
+
+# Bump whenever extraction/cleaning/metadata logic changes so the
+# incremental manifest forces a re-extraction of every file
+EXTRACTOR_VERSION = 3
+MANIFEST_NAME = '.extract-manifest.json'
+QUARANTINE_NAME = '.extract-quarantine.json'
+# Errors that mark a source as pathological: skipped until it changes
+QUARANTINE_ERRORS = ('timed out', 'memory limit', 'worker process crashed')
+# Seconds past --timeout before a file run alone is killed from outside
+# (covers the watchdog's own grace period)
+ISOLATED_GRACE = 10.0
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'classifier-rules.json')
+SHARD_PREFIX = 'corpus-'
+CHUNK_PREFIX = 'chunks-'
+SPOOL_PIECE_SIZE = 64 * 1024  # how much of a spooled document is read back at once
+# Extensions extract_record() handles; every other file is skipped
+TEXT_EXTENSIONS = ('.txt', '.md', '.java', '.js', '.py', '.ts', '.jsx', '.tsx', '.gosu')
+EXTRACTABLE_EXTENSIONS = ('.pdf', '.pptx', '.docx') + TEXT_EXTENSIONS
+
+# Section markers written by extract_pptx/extract_pdf
+SECTION_MARKER = re.compile(r'^=== (Slide|Page) (\d+) ===$', re.MULTILINE)
+
+# clean_text: Unicode spaces become ' ', invisible characters (soft hyphen,
+# zero-width space, BOM) are dropped, ligatures are expanded and Unicode
+# line/paragraph separators become newlines
+NORMALIZE_TABLE = str.maketrans({
+    **{c: ' ' for c in '\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005'
+                      '\u2006\u2007\u2008\u2009\u200a\u202f\u205f\u3000'},
+    **{c: None for c in '\u00ad\u200b\u2060\ufeff'},
+    '\u2028': '\n', '\u2029': '\n',
+    '\ufb00': 'ff', '\ufb01': 'fi', '\ufb02': 'fl', '\ufb03': 'ffi',
+    '\ufb04': 'ffl', '\ufb05': 'st', '\ufb06': 'st',
+})
+BLANK_LINES_RE = re.compile(r'\n\n\n+')  # literal prefix lets re use a fast search
+# A word hyphenated across a line break ("exam-\nple")
+HYPHEN_BREAK_RE = re.compile(r'(?<=[^\W\d_])-\n(?=[^\W\d_])')
+PROFILE_NAME = '.extract-profile.json'
+PROFILE_STAGES = ['read', 'parse', 'clean', 'classify', 'spool', 'hash', 'write']
+
+# Stage timings (stage -> seconds) for the file being profiled; None when
+# --profile is off, which makes stage() a no-op
+_profiling = False
+_stage_times = None
+
+
+@contextmanager
+def stage(name):
+    """Add the time spent in the block to the current file's `name` stage"""
+    if _stage_times is None:
+        yield
+        return
+    start = time.perf_counter()
     try:
-        prs = Presentation(file_path)
+        yield
+    finally:
+        _stage_times[name] = _stage_times.get(name, 0.0) + time.perf_counter() - start
+
+
+def set_profiling(enabled):
+    """Turn per-file stage timing on or off for this process"""
+    global _profiling
+    _profiling = enabled
+
+
+def _take_stage_times():
+    """Return and reset the current file's timings (None when not profiling)"""
+    global _stage_times
+    timings, _stage_times = _stage_times, None
+    if timings is None:
+        return None
+    return {'stages': timings, 'peak_rss': peak_rss()}
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KiB
+
+
+def extract_pptx(file_path, data=None):
+    """Extract text from PowerPoint files (from data instead, if given)"""
+    try:
+        _, slides = load_deck(file_path, data, cache_dir=_pptx_cache_dir)
         slides_text = []
         
-        for slide_num, slide in enumerate(prs.slides, 1):
+        for slide_num, slide in enumerate(slides, 1):
             slide_content = f"=== Slide {slide_num} ===\n"
             
-            for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text.strip():
-                    slide_content += shape.text + "\n"
+            for text in slide['texts']:
+                if text.strip():
+                    slide_content += text + "\n"
             
             if slide_content.strip() != f"=== Slide {slide_num} ===":
                 slides_text.append(slide_content)
@@ -52,27 +193,132 @@ def extract_pptx(file_path):
         raise Exception(f"PPT extraction error: {str(e)}")
 
 
-def extract_pdf(file_path):
-    """Extract text from PDF files"""
+def _release_page(reader, page):
+    """Drop a page's content stream from PyPDF2's object cache once its text is out.
+
+    PdfReader keeps every object it resolves, so otherwise the raw content of
+    every page read so far stays in memory until the reader is closed.
+    """
+    cache = getattr(reader, 'resolved_objects', None)
+    contents = dict.get(page, '/Contents')  # the raw reference, without resolving it
+    if cache is None or contents is None:
+        return
+    for ref in (contents if isinstance(contents, list) else [contents]):
+        if hasattr(ref, 'idnum'):
+            cache.pop((ref.generation, ref.idnum), None)
+
+
+def iter_pdf_pages(file_path, data=None):
+    """Lazily yield cleaned `=== Page N ===` sections, one page at a time"""
     try:
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            pages_text = []
+        with (io.BytesIO(data) if data is not None else open(file_path, 'rb')) as file:
+            with stage('parse'):
+                reader = PyPDF2.PdfReader(file)
             
             for page_num, page in enumerate(reader.pages, 1):
-                text = page.extract_text()
+                with stage('parse'):
+                    text = page.extract_text()
+                    _release_page(reader, page)
                 if text.strip():
-                    pages_text.append(f"=== Page {page_num} ===\n{text}")
-            
-            return "\n\n".join(pages_text)
+                    with stage('clean'):
+                        text = clean_text(f"=== Page {page_num} ===\n{text}", dehyphenate=True)
+                    yield text
     except Exception as e:
         raise Exception(f"PDF extraction error: {str(e)}")
 
 
-def extract_docx(file_path):
+def extract_pdf(file_path):
+    """Extract text from PDF files"""
+    return "\n\n".join(iter_pdf_pages(file_path))
+
+
+class ContentSpool:
+    """Document text spooled to a temp file instead of held in memory.
+
+    Built page by page by spool_sections(); writers and the chunker read it
+    back in pieces, so peak memory stays proportional to one page. It only
+    carries a path, so it is cheap to return from pool workers.
+    """
+    
+    def __init__(self, path, length, word_count, hits):
+        self.path = path
+        self.length = length
+        self.word_count = word_count
+        self.hits = hits  # classifier keyword hits, see Classifier.count
+    
+    def iter_pieces(self, size=SPOOL_PIECE_SIZE):
+        with open(self.path, 'r', encoding='utf-8', newline='') as f:
+            for piece in iter(lambda: f.read(size), ''):
+                yield piece
+    
+    def iter_lines(self):
+        with open(self.path, 'r', encoding='utf-8', newline='\n') as f:
+            for line in f:
+                yield line.rstrip('\n')
+    
+    def read(self):
+        return ''.join(self.iter_pieces())
+    
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def spool_sections(sections):
+    """Write cleaned sections to a ContentSpool, computing metadata as they pass"""
+    fd, path = tempfile.mkstemp(prefix='extract-', suffix='.txt')
+    length = word_count = 0
+    classifier = get_classifier()
+    hits = {}
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            for section in sections:
+                with stage('spool'):
+                    if length:
+                        f.write('\n\n')
+                        length += 2
+                    f.write(section)
+                    length += len(section)
+                    word_count += len(section.split())
+                with stage('classify'):
+                    classifier.count(section, 'content', hits)
+    except BaseException:
+        os.remove(path)
+        raise
+    return ContentSpool(path, length, word_count, hits)
+
+
+def discard_content(record):
+    """Remove the temp file behind a spooled record, if any"""
+    if record is not None and isinstance(record['content'], ContentSpool):
+        record['content'].discard()
+
+
+def iter_record_json(record, **kwargs):
+    """Yield the JSON text of a record in pieces.
+
+    Output is identical to json.dumps(record, ensure_ascii=False, **kwargs);
+    a spooled `content` is escaped and emitted piece by piece.
+    """
+    content = record['content']
+    if isinstance(content, str):
+        yield json.dumps(record, ensure_ascii=False, **kwargs)
+        return
+    placeholder = '\x00content\x00'
+    text = json.dumps({**record, 'content': placeholder}, ensure_ascii=False, **kwargs)
+    head, tail = text.split(json.dumps(placeholder, ensure_ascii=False), 1)
+    yield head + '"'
+    for piece in content.iter_pieces():
+        yield json.dumps(piece, ensure_ascii=False)[1:-1]
+    yield '"' + tail
+
+
+def extract_docx(file_path, data=None):
     """Extract text from Word documents"""
     try:
-        doc = Document(file_path)
+        doc = Document(io.BytesIO(data) if data is not None else file_path)
         paragraphs = []
         
         for para in doc.paragraphs:
@@ -84,148 +330,1137 @@ def extract_docx(file_path):
         raise Exception(f"DOCX extraction error: {str(e)}")
 
 
-def extract_text(file_path):
+def extract_text(file_path, data=None):
     """Extract text from plain text files"""
     try:
+        if data is not None:
+            # TextIOWrapper keeps the universal-newline handling of open()
+            with io.TextIOWrapper(io.BytesIO(data), encoding='utf-8', errors='ignore') as f:
+                return f.read()
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             return f.read()
     except Exception as e:
         raise Exception(f"Text extraction error: {str(e)}")
 
 
+class Classifier:
+    """Keyword classifier for source type, product and difficulty.
+
+    Rules are data (classifier-rules.json): per category, an ordered list
+    of labels with keywords matched against the file path or the content.
+    All keywords for a field are compiled into one regex, so a document is
+    scanned once. The label with the most hits wins, ties go to the label
+    listed first, and its share of the category's hits is the confidence.
+    """
+    
+    def __init__(self, rules, path=None):
+        self.rules = rules
+        self.path = path
+        self.digest = hashlib.sha1(json.dumps(rules, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+        self._keywords = {}  # field -> {keyword: [(category, label), ...]}
+        for category, spec in rules.items():
+            for rule in spec['labels']:
+                for keyword in rule.get('keywords', []):
+                    self._keywords.setdefault(spec['field'], {}) \
+                        .setdefault(keyword.lower(), []).append((category, rule['label']))
+        # Longest keywords first, so a shorter one cannot shadow a longer match
+        self._patterns = {
+            field: re.compile('|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+            for field, keywords in self._keywords.items()
+        }
+    
+    @classmethod
+    def load(cls, path=RULES_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), path)
+    
+    def count(self, text, field='content', hits=None):
+        """Add keyword hits found in text to hits ({(category, label): count})"""
+        hits = {} if hits is None else hits
+        pattern = self._patterns.get(field)
+        if pattern is None:
+            return hits
+        for keyword, n in Counter(pattern.findall(text.lower())).items():
+            for key in self._keywords[field][keyword]:
+                hits[key] = hits.get(key, 0) + n
+        return hits
+    
+    def resolve(self, category, hits):
+        """Return (label, confidence) for a category from accumulated hits"""
+        spec = self.rules[category]
+        label, best, total = spec['default'], 0, 0
+        for rule in spec['labels']:
+            n = hits.get((category, rule['label']), 0)
+            total += n
+            if n > best:
+                label, best = rule['label'], n
+        return label, round(best / total, 3) if total else 0.0
+    
+    def classify(self, file_path, content=None, content_hits=None):
+        """Classify a document; returns {category: (label, confidence)}.
+
+        Pass either the content, or hits already counted over it (e.g. page
+        by page while streaming).
+        """
+        hits = self.count(file_path, 'path')
+        path_lower = file_path.lower()
+        for category, spec in self.rules.items():
+            for rule in spec['labels']:
+                if any(path_lower.endswith(ext) for ext in rule.get('extensions', [])):
+                    key = (category, rule['label'])
+                    hits[key] = hits.get(key, 0) + 1
+        if content_hits is not None:
+            for key, n in content_hits.items():
+                hits[key] = hits.get(key, 0) + n
+        elif content is not None:
+            self.count(content, 'content', hits)
+        return {category: self.resolve(category, hits) for category in self.rules}
+
+
+_classifier = None
+
+
+def get_classifier():
+    """The process-wide classifier (default rules unless set_classifier_rules ran)"""
+    global _classifier
+    if _classifier is None:
+        _classifier = Classifier.load(RULES_PATH)
+    return _classifier
+
+
+def set_classifier_rules(path):
+    """Load classifier rules from path (also used as the pool initializer)"""
+    global _classifier
+    _classifier = Classifier.load(path)
+
+
+def extractor_version():
+    """Version recorded in the manifest: code version plus rules digest,
+    so editing classifier-rules.json re-extracts everything"""
+    return f"{EXTRACTOR_VERSION}+{get_classifier().digest}"
+
+
 def detect_source_type(file_path):
     """Detect source type from file path"""
-    path_lower = file_path.lower()
-    
-    if 'resume' in path_lower or 'cv' in path_lower:
-        return 'resume'
-    elif 'code' in path_lower or 'example' in path_lower or any(path_lower.endswith(ext) for ext in ['.java', '.js', '.py', '.ts']):
-        return 'code'
-    elif 'interview' in path_lower or 'question' in path_lower:
-        return 'interview'
-    elif 'project' in path_lower or 'assignment' in path_lower:
-        return 'project'
-    else:
-        return 'guidewire_doc'
+    return get_classifier().classify(file_path)['source_type'][0]
 
 
 def detect_product(content):
     """Detect Guidewire product from content"""
-    content_lower = content.lower()
-    
-    # Check for specific products
-    if 'claimcenter' in content_lower or 'claim center' in content_lower:
-        return 'ClaimCenter'
-    elif 'policycenter' in content_lower or 'policy center' in content_lower:
-        return 'PolicyCenter'
-    elif 'billingcenter' in content_lower or 'billing center' in content_lower:
-        return 'BillingCenter'
-    elif 'producerengage' in content_lower or 'producer engage' in content_lower:
-        return 'ProducerEngage'
-    elif 'customerengage' in content_lower or 'customer engage' in content_lower:
-        return 'CustomerEngage'
-    elif 'guidewire' in content_lower:
-        return 'General'
-    else:
-        return 'General'
+    classifier = get_classifier()
+    return classifier.resolve('product', classifier.count(content))[0]
 
 
 def detect_difficulty(content):
     """Detect difficulty level from content"""
-    content_lower = content.lower()
-    
-    if 'beginner' in content_lower or 'introduction' in content_lower or 'basic' in content_lower:
-        return 'beginner'
-    elif 'advanced' in content_lower or 'expert' in content_lower or 'senior' in content_lower:
-        return 'advanced'
-    elif 'intermediate' in content_lower:
-        return 'intermediate'
-    else:
-        return None
+    classifier = get_classifier()
+    return classifier.resolve('difficulty', classifier.count(content))[0]
+
+
+def _join_hyphen_break(match):
+    # Re-join the word unless the next line starts with a capital (then
+    # the hyphen is probably real, e.g. "Claim-\nCenter")
+    return '' if match.string[match.end()].islower() else '-\n'
 
 
-def clean_text(text):
-    """Clean extracted text"""
-    # Remove excessive whitespace
+def clean_text(text, dehyphenate=False):
+    """Clean extracted text in linear time.
+
+    Strips every line and collapses runs of blank lines to one (one regex
+    pass instead of repeated replace() rescans), normalizes Unicode
+    whitespace, soft hyphens and ligatures, and with dehyphenate (PDF
+    pages) re-joins words hyphenated across lines.
+    """
+    if not text.isascii():
+        text = text.translate(NORMALIZE_TABLE)
     text = '\n'.join([line.strip() for line in text.split('\n')])
-    # Remove more than 2 consecutive newlines
-    while '\n\n\n' in text:
-        text = text.replace('\n\n\n', '\n\n')
+    if '\n\n\n' in text:
+        text = BLANK_LINES_RE.sub('\n\n', text)
+    if dehyphenate:
+        text = HYPHEN_BREAK_RE.sub(_join_hyphen_break, text)
     return text.strip()
 
 
-def process_file(file_path, output_dir):
-    """Process a single file and save as JSON"""
+def extract_record(file_path, data=None):
+    """Extract content and metadata for a single file.
+
+    Returns the output dict, or None for unsupported/too-short files.
+    Extraction errors are raised to the caller. `data` is the file's
+    bytes when the caller has already read it (see extract_async).
+    """
     file_name = os.path.basename(file_path)
     file_ext = os.path.splitext(file_name)[1].lower()
     
-    # Extract content based on file type
-    try:
-        if file_ext == '.pptx':
-            content = extract_pptx(file_path)
-        elif file_ext == '.pdf':
-            content = extract_pdf(file_path)
-        elif file_ext == '.docx':
-            content = extract_docx(file_path)
-        elif file_ext in ['.txt', '.md', '.java', '.js', '.py', '.ts', '.jsx', '.tsx', '.gosu']:
-            content = extract_text(file_path)
-        else:
-            return None  # Skip unsupported formats
-        
-        if not content or len(content.strip()) < 50:
+    # PDFs are streamed page by page into a spool, never held whole in memory
+    if file_ext == '.pdf':
+        content = spool_sections(iter_pdf_pages(file_path, data))
+        if content.length < 50:
+            content.discard()
             return None  # Skip empty or very short files
-        
-        # Clean content
-        content = clean_text(content)
-        
-        # Detect metadata
-        source_type = detect_source_type(file_path)
-        product = detect_product(content)
-        difficulty = detect_difficulty(content)
-        
-        # Create output object
-        output = {
+        labels = get_classifier().classify(file_path, content_hits=content.hits)
+        return {
             'file_name': file_name,
             'file_path': file_path,
-            'source_type': source_type,
-            'product': product,
-            'difficulty': difficulty,
+            'source_type': labels['source_type'][0],
+            'product': labels['product'][0],
+            'difficulty': labels['difficulty'][0],
+            'confidence': {category: conf for category, (_, conf) in labels.items()},
             'content': content,
-            'word_count': len(content.split()),
+            'word_count': content.word_count,
             'extracted_at': datetime.now().isoformat()
         }
-        
-        # Save as JSON
-        output_file = os.path.join(output_dir, f"{Path(file_name).stem}.json")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-        
-        return output_file
-        
+    
+    # Extract content based on file type
+    with stage('parse'):
+        if file_ext == '.pptx':
+            content = extract_pptx(file_path, data)
+        elif file_ext == '.docx':
+            content = extract_docx(file_path, data)
+        elif file_ext in TEXT_EXTENSIONS:
+            content = extract_text(file_path, data)
+        else:
+            return None  # Skip unsupported formats
+    
+    if not content or len(content.strip()) < 50:
+        return None  # Skip empty or very short files
+    
+    # Clean content
+    with stage('clean'):
+        content = clean_text(content)
+    
+    # Detect metadata (one pass over the content for all categories)
+    with stage('classify'):
+        labels = get_classifier().classify(file_path, content)
+    
+    # Create output object
+    return {
+        'file_name': file_name,
+        'file_path': file_path,
+        'source_type': labels['source_type'][0],
+        'product': labels['product'][0],
+        'difficulty': labels['difficulty'][0],
+        'confidence': {category: conf for category, (_, conf) in labels.items()},
+        'content': content,
+        'word_count': len(content.split()),
+        'extracted_at': datetime.now().isoformat()
+    }
+
+
+def write_record(output, output_dir, name=None):
+    """Save an extracted record as JSON (as `name`, default <stem>.json) and return the output path"""
+    output_file = os.path.join(output_dir, name or f"{Path(output['file_name']).stem}.json")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for piece in iter_record_json(output, indent=2):
+            f.write(piece)
+    return output_file
+
+
+def process_file(file_path, output_dir):
+    """Process a single file and save as JSON"""
+    output = None
+    try:
+        output = extract_record(file_path)
+        if output is None:
+            return None
+        return write_record(output, output_dir)
     except Exception as e:
-        print(f"  ✗ Error processing {file_name}: {str(e)}")
+        print(f"  ✗ Error processing {os.path.basename(file_path)}: {str(e)}")
         return None
+    finally:
+        discard_content(output)
+
+
+def document_id(rel_path):
+    """Stable document ID derived from the source path relative to input_dir"""
+    return hashlib.sha1(rel_path.encode('utf-8')).hexdigest()[:16]
+
+
+def json_output_names(rel_paths):
+    """Output file name per relative path for the JSON directory layout.
+
+    A source keeps the familiar <stem>.json unless another extractable
+    source has the same stem (a/Lesson1.md and b/Lesson1.pdf, compared
+    case-insensitively for macOS/Windows); then each of them gets
+    <stem>-<document id>.json, so no output overwrites another. Files that
+    are never extracted (the Lesson1.mp4 next to Lesson1.pptx) do not count.
+    """
+    stems = Counter(Path(rel_path).stem.lower() for rel_path in rel_paths
+                    if Path(rel_path).suffix.lower() in EXTRACTABLE_EXTENSIONS)
+    names = {}
+    for rel_path in rel_paths:
+        stem = Path(rel_path).stem
+        if stems[stem.lower()] == 1:
+            names[rel_path] = f"{stem}.json"
+        else:
+            names[rel_path] = f"{stem}-{document_id(rel_path)}.json"
+    return names
+
+
+def list_shards(output_dir, prefix=SHARD_PREFIX):
+    """Sorted JSONL shard paths (plain or gzipped) with the given prefix"""
+    return sorted(
+        glob.glob(os.path.join(output_dir, f"{prefix}*.jsonl")) +
+        glob.glob(os.path.join(output_dir, f"{prefix}*.jsonl.gz"))
+    )
+
+
+def iter_shard(shard):
+    """Yield records from one JSONL shard"""
+    with (gzip.open(shard, 'rt', encoding='utf-8') if shard.endswith('.gz')
+          else open(shard, 'r', encoding='utf-8')) as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def iter_corpus(output_dir):
+    """Yield extracted records from an output directory, one at a time.
 
+    Reads JSONL shards when present, otherwise the per-document JSON files.
+    """
+    shards = list_shards(output_dir)
+    if shards:
+        for shard in shards:
+            yield from iter_shard(shard)
+        return
+    for name in sorted(os.listdir(output_dir)):
+        if name.endswith('.json') and not name.startswith('.'):
+            with open(os.path.join(output_dir, name), 'r', encoding='utf-8') as f:
+                yield json.load(f)
 
-def process_directory(input_dir, output_dir):
-    """Process all files in directory recursively"""
+
+class JsonDirSink:
+    """One pretty-printed JSON file per document (the default layout)"""
+    
+    partial_ok = True  # every write is durable, so a partial manifest is valid
+    
+    def __init__(self, output_dir, names):
+        self.output_dir = output_dir
+        self.names = names  # relative path -> output file name, see json_output_names()
+        self.last_bytes = 0  # size of the last record written
+    
+    def output_name(self, rel_path):
+        return self.names[rel_path]
+    
+    def has_output(self, name):
+        return os.path.exists(os.path.join(self.output_dir, name))
+    
+    def keep(self, rel_path):
+        pass
+    
+    def write(self, record):
+        output_file = write_record(record, self.output_dir, self.names[record['relative_path']])
+        self.last_bytes = os.path.getsize(output_file)
+        return os.path.basename(output_file)
+    
+    def remove(self, name):
+        try:
+            os.remove(os.path.join(self.output_dir, name))
+        except FileNotFoundError:
+            pass
+    
+    def close(self):
+        pass
+    
+    def abort(self):
+        pass
+
+
+class JsonlShardSink:
+    """Stream records into size-bounded, optionally gzipped JSONL shards.
+
+    Records arrive in relative-path order. On incremental runs the previous
+    shards are merged in as new records stream past, so documents in
+    `carry` (unchanged sources) are copied over without re-extraction and
+    modified/removed ones are dropped. New shards are written under hidden
+    temp names and only swapped in by close().
+    """
+    
+    partial_ok = False
+    
+    def __init__(self, output_dir, carry, max_bytes=64 * 1024 * 1024, compress=False,
+                 prefix=SHARD_PREFIX):
+        self.output_dir = output_dir
+        self.carry = carry  # None: replace the old shards without merging
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.prefix = prefix
+        self.old_shards = list_shards(output_dir, prefix)
+        self.shards = []
+        self._old = None
+        self._next_old = None
+        self._fh = None
+        self._size = 0
+        self.last_bytes = 0  # uncompressed size of the last record written
+    
+    def output_name(self, rel_path):
+        return document_id(rel_path)
+    
+    def has_output(self, name):
+        return bool(self.old_shards)
+    
+    def keep(self, rel_path):
+        # Failed re-extraction: keep the previous record for this source
+        self.carry.add(rel_path)
+    
+    def _iter_old(self):
+        for shard in self.old_shards:
+            yield from iter_shard(shard)
+    
+    def _drain(self, until=None):
+        if self.carry is None:
+            return
+        if self._old is None:
+            self._old = self._iter_old()
+            self._next_old = next(self._old, None)
+        while self._next_old is not None and (
+                until is None or self._next_old['relative_path'] < until):
+            if self._next_old['relative_path'] in self.carry:
+                self._emit(self._next_old)
+            self._next_old = next(self._old, None)
+    
+    def _emit(self, record):
+        if isinstance(record['content'], str):
+            pieces = [''.join(iter_record_json(record, separators=(',', ':')))]
+            expected = len(pieces[0])
+        else:
+            # Spooled content is streamed; its length is a close size estimate
+            pieces = iter_record_json(record, separators=(',', ':'))
+            expected = record['content'].length
+        if self._fh is None or (self._size and self._size + expected > self.max_bytes):
+            self._rotate()
+        size = 1
+        for piece in pieces:
+            data = piece.encode('utf-8')
+            self._fh.write(data)
+            size += len(data)
+        self._fh.write(b'\n')
+        self._size += size
+        return size
+    
+    def _rotate(self):
+        if self._fh is not None:
+            self._fh.close()
+        name = f"{self.prefix}{len(self.shards):05d}.jsonl" + ('.gz' if self.compress else '')
+        tmp_path = os.path.join(self.output_dir, f".{name}.tmp")
+        self.shards.append((tmp_path, os.path.join(self.output_dir, name)))
+        self._fh = gzip.open(tmp_path, 'wb') if self.compress else open(tmp_path, 'wb')
+        self._size = 0
+    
+    def write(self, record):
+        if self.carry is not None:
+            self._drain(until=record['relative_path'])
+        self.last_bytes = self._emit(record)
+        return record['id']
+    
+    def remove(self, name):
+        pass  # dropped by the merge, since it is no longer in `carry`
+    
+    def close(self):
+        self._drain()
+        if self._fh is not None:
+            self._fh.close()
+        final_paths = set()
+        for tmp_path, final_path in self.shards:
+            os.replace(tmp_path, final_path)
+            final_paths.add(final_path)
+        for shard in self.old_shards:
+            if shard not in final_paths:
+                os.remove(shard)
+    
+    def abort(self):
+        if self._fh is not None:
+            self._fh.close()
+        for tmp_path, _ in self.shards:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def iter_sections(content):
+    """Yield (section_type, number, text) for each slide/page marker.
+
+    Text before the first marker (or a document without markers) is
+    yielded with section_type and number set to None. A ContentSpool is
+    read line by line, so only one section is in memory at a time.
+    """
+    if isinstance(content, ContentSpool):
+        yield from _iter_spool_sections(content)
+        return
+    prev = None
+    pos = 0
+    for match in SECTION_MARKER.finditer(content):
+        text = content[pos:match.start()].strip()
+        if text:
+            if prev is None:
+                yield None, None, text
+            else:
+                yield prev.group(1).lower(), int(prev.group(2)), text
+        prev = match
+        pos = match.end()
+    text = content[pos:].strip()
+    if text:
+        if prev is None:
+            yield None, None, text
+        else:
+            yield prev.group(1).lower(), int(prev.group(2)), text
+
+
+def _iter_spool_sections(spool):
+    section = (None, None)
+    lines = []
+    for line in spool.iter_lines():
+        match = SECTION_MARKER.match(line)
+        if match:
+            text = '\n'.join(lines).strip()
+            if text:
+                yield section[0], section[1], text
+            section = (match.group(1).lower(), int(match.group(2)))
+            lines = []
+        else:
+            lines.append(line)
+    text = '\n'.join(lines).strip()
+    if text:
+        yield section[0], section[1], text
+
+
+def split_text(text, max_chars, overlap):
+    """Split text into windows of at most max_chars, overlapping by overlap.
+
+    Window edges are moved back to the nearest whitespace where possible,
+    so words are not cut in half.
+    """
+    if len(text) <= max_chars:
+        yield text
+        return
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            cut = max(text.rfind('\n', start + max_chars // 2, end),
+                      text.rfind(' ', start + max_chars // 2, end))
+            if cut > start:
+                end = cut
+        piece = text[start:end].strip()
+        if piece:
+            yield piece
+        if end >= len(text):
+            break
+        next_start = max(end - overlap, start + 1)
+        # Start the overlap on a word boundary
+        space = text.find(' ', next_start, end)
+        start = space + 1 if overlap and space != -1 else next_start
+
+
+def iter_chunks(record, max_chars=2000, overlap=200):
+    """Yield embedding-ready chunks for one extracted record.
+
+    Consecutive slides/pages are packed together up to max_chars (roughly
+    4 characters per token); a section longer than that is split into
+    overlapping windows. Chunk IDs hash the chunk text, so they stay stable
+    across runs and only changed chunks need re-embedding.
+    """
+    doc_id = record.get('id') or document_id(record['file_path'])
+    seen_ids = {}
+    index = 0
+    
+    def make_chunk(parts, section_type, section_start, section_end):
+        nonlocal index
+        text = '\n\n'.join(parts)
+        chunk_id = f"{doc_id}-{hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]}"
+        # Identical text twice in one document (repeated slides) still
+        # needs distinct, stable IDs
+        seen_ids[chunk_id] = seen_ids.get(chunk_id, 0) + 1
+        if seen_ids[chunk_id] > 1:
+            chunk_id = f"{chunk_id}-{seen_ids[chunk_id]}"
+        chunk = {
+            'id': chunk_id,
+            'document_id': doc_id,
+            'relative_path': record.get('relative_path'),
+            'file_name': record['file_name'],
+            'chunk_index': index,
+            'section_type': section_type,
+            'section_start': section_start,
+            'section_end': section_end,
+            'source_type': record['source_type'],
+            'product': record['product'],
+            'difficulty': record['difficulty'],
+            'content': text,
+            'char_count': len(text),
+        }
+        index += 1
+        return chunk
+    
+    parts = []
+    size = 0
+    span = (None, None, None)
+    for section_type, number, text in iter_sections(record['content']):
+        for piece in split_text(text, max_chars, overlap):
+            if parts and (size + len(piece) + 2 > max_chars or section_type != span[0]):
+                yield make_chunk(parts, *span)
+                parts, size = [], 0
+            if not parts:
+                span = (section_type, number, number)
+            parts.append(piece)
+            size += len(piece) + 2
+            span = (span[0], span[1], number)
+    if parts:
+        yield make_chunk(parts, *span)
+
+
+def write_chunks(output_dir, max_chars=2000, overlap=200,
+                 shard_size=64 * 1024 * 1024, compress=False):
+    """Stream chunks for the whole extracted corpus into chunks-NNNNN.jsonl shards"""
+    sink = JsonlShardSink(output_dir, None, max_bytes=shard_size, compress=compress,
+                          prefix=CHUNK_PREFIX)
+    count = 0
+    try:
+        for record in iter_corpus(output_dir):
+            for chunk in iter_chunks(record, max_chars, overlap):
+                sink.write(chunk)
+                count += 1
+        sink.close()
+    except BaseException:
+        sink.abort()
+        raise
+    return count
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """Hash a file with chunked reads"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def current_rss():
+    """Current resident set size of this process in bytes, or None if unknown"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Exit statuses of a worker the watchdog had to kill, so the parent can
+# tell a file stuck in C code from a crash
+TIMEOUT_EXIT = 70
+MEMORY_EXIT = 71
+
+
+def _guard_reason(exit_code, limits):
+    timeout, max_rss = limits
+    if exit_code == TIMEOUT_EXIT:
+        return f"timed out after {timeout:g}s"
+    return f"memory limit exceeded ({max_rss // (1024 * 1024)} MB RSS)"
+
+
+class Watchdog:
+    """Enforces --timeout/--max-rss on the extraction running in a worker.
+
+    A daemon thread polls the elapsed time and RSS of the current file. On
+    a violation it interrupts the main thread (KeyboardInterrupt, which
+    _extract_worker turns into an error); if the parser is stuck in C code
+    and does not notice within `grace` seconds, the worker process exits
+    with TIMEOUT_EXIT or MEMORY_EXIT.
+    """
+    
+    def __init__(self, timeout=None, max_rss=None, interval=0.05, grace=5.0):
+        self.timeout = timeout
+        self.max_rss = max_rss
+        self.interval = interval
+        self.grace = grace
+        self.reason = None
+        self._exit_code = None
+        self._started = None
+        self._fired = None
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, name='watchdog', daemon=True).start()
+    
+    def start(self):
+        with self._lock:
+            self.reason = None
+            self._fired = None
+            self._started = time.monotonic()
+    
+    def stop(self):
+        with self._lock:
+            self._started = None
+    
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if self._started is None:
+                    continue
+                now = time.monotonic()
+                if self._fired is not None:
+                    if now - self._fired > self.grace:
+                        os._exit(self._exit_code)
+                    continue
+                if self.timeout and now - self._started > self.timeout:
+                    self._exit_code = TIMEOUT_EXIT
+                elif self.max_rss and (current_rss() or 0) > self.max_rss:
+                    self._exit_code = MEMORY_EXIT
+                else:
+                    continue
+                self.reason = _guard_reason(self._exit_code, (self.timeout, self.max_rss))
+                self._fired = now
+                _thread.interrupt_main()
+
+
+# (timeout seconds, max RSS bytes) for pool workers; see set_limits()
+_limits = (None, None)
+_watchdog = None
+# Parsed-deck cache shared with extract-quizzes-from-ppts.py (None: disabled)
+_pptx_cache_dir = default_cache_dir()
+
+
+def set_limits(timeout=None, max_rss=None):
+    """Set the per-file guards that pool workers will enforce"""
+    global _limits
+    _limits = (timeout or None, max_rss or None)
+
+
+def set_pptx_cache(cache_dir):
+    """Use cache_dir for parsed decks (None disables the cache)"""
+    global _pptx_cache_dir
+    _pptx_cache_dir = cache_dir
+
+
+def _init_worker(rules_path, profiling, limits=(None, None), pptx_cache=None):
+    """Pool initializer: adopt the parent's rules, profiling mode, guards and cache"""
+    global _watchdog
+    set_classifier_rules(rules_path)
+    set_pptx_cache(pptx_cache)
+    set_profiling(profiling)
+    if any(limits):
+        # The watchdog interrupts via SIGINT; undo any handler inherited from
+        # the parent (asyncio.run installs one) so it raises KeyboardInterrupt
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        _watchdog = Watchdog(*limits)
+
+
+def _extract_worker(file_path, data=None):
+    """Pool entry point. Never raises, so one bad deck cannot break the pool.
+
+    Also hashes the source, so the manifest read happens in the worker too.
+    Returns (record, error, sha256, timings); timings is None unless profiling.
+    """
+    global _stage_times
+    _stage_times = {} if _profiling else None
+    record = None
+    if _watchdog is not None:
+        _watchdog.start()
+    try:
+        try:
+            record = extract_record(file_path, data)
+            with stage('hash'):
+                digest = hashlib.sha256(data).hexdigest() if data is not None else file_sha256(file_path)
+        finally:
+            if _watchdog is not None:
+                _watchdog.stop()
+        return record, None, digest, _take_stage_times()
+    except KeyboardInterrupt:
+        discard_content(record)
+        if _watchdog is None or _watchdog.reason is None:
+            raise  # a real Ctrl-C
+        return None, _watchdog.reason, None, _take_stage_times()
+    except Exception as e:
+        discard_content(record)
+        return None, str(e), None, _take_stage_times()
+
+
+def _pool_initargs():
+    return (get_classifier().path, _profiling, _limits, _pptx_cache_dir)
+
+
+def _isolated_main(conn, file_path, data, initargs):
+    _init_worker(*initargs)
+    conn.send(_extract_worker(file_path, data))
+    conn.close()
+
+
+def run_isolated(file_path, data=None):
+    """Extract one file alone in a fresh process; returns what _extract_worker does.
+
+    When a pool worker dies, every file in flight on the pool fails with
+    it, so the culprit is unknown; and a guard can trip on a file that
+    was only slow because it shared the machine. Run on its own, a
+    failure can only be this file's, so only these results are
+    quarantined. The watchdog's exit status tells a file stuck in C code
+    from a crash; if even the watchdog cannot run (the parser holds the
+    GIL), the process is killed once the timeout and grace have passed.
+    """
+    ctx = multiprocessing.get_context()
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_isolated_main, args=(sender, file_path, data, _pool_initargs()),
+                          daemon=True)
+    process.start()
+    sender.close()
+    timeout = _limits[0]
+    deadline = None if timeout is None else timeout + ISOLATED_GRACE
+    try:
+        try:
+            if receiver.poll(deadline):
+                result = receiver.recv()
+                process.join()
+                return result
+            # Still running past the deadline, with no result
+            process.kill()
+            process.join()
+            return None, f"{_guard_reason(TIMEOUT_EXIT, _limits)} (worker killed)", None, None
+        except EOFError:
+            pass  # the process died before sending a result
+        process.join()
+        if process.exitcode in (TIMEOUT_EXIT, MEMORY_EXIT):
+            return None, f"{_guard_reason(process.exitcode, _limits)} (worker killed)", None, None
+        return None, "worker process crashed", None, None
+    finally:
+        receiver.close()
+
+
+def _confirm_alone(file_path, result, data=None):
+    """Re-run a file that hit a guard inside the pool; only a failure alone counts"""
+    error = result[1]
+    if error is not None and error.startswith(QUARANTINE_ERRORS):
+        return run_isolated(file_path, data)
+    return result
+
+
+def iter_extracted(file_paths, workers=1):
+    """Yield (file_path, record, error, sha256, timings) in input order.
+
+    With workers > 1 (or per-file guards set, which need a separate
+    process to enforce) extraction is fanned out across a process pool;
+    results are still yielded (and therefore written) in input order,
+    so the output directory is identical to a serial run. If a worker
+    dies, the files in flight at the time are re-run one by one with
+    run_isolated(), so only the file that crashes is failed; a file that
+    hits a guard is likewise re-run alone before it is failed.
+    """
+    if workers <= 1 and not any(_limits):
+        for file_path in file_paths:
+            yield (file_path,) + _extract_worker(file_path)
+        return
+    
+    pending = deque(file_paths)
+    while pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=_pool_initargs()) as executor:
+            # Keep a bounded window in flight so finished-but-not-yet-yielded
+            # records do not pile up in memory behind one slow deck
+            in_flight = deque()
+            broken = False
+            while pending or in_flight:
+                try:
+                    while pending and len(in_flight) < workers * 4:
+                        in_flight.append((pending[0], executor.submit(_extract_worker, pending[0])))
+                        pending.popleft()
+                    result = in_flight[0][1].result()
+                except BrokenProcessPool:
+                    broken = True
+                    break
+                file_path, _ = in_flight.popleft()
+                yield (file_path,) + _confirm_alone(file_path, result)
+            if not broken:
+                return
+        # A worker died (segfault/OOM kill) and took the pool with it: any
+        # file in flight may be the cause, so run each alone, then carry on
+        # with a fresh pool
+        for file_path, _ in in_flight:
+            yield (file_path,) + run_isolated(file_path)
+
+
+def _read_source(file_path):
+    """Read a source file's bytes, timing the read for --profile"""
+    start = time.perf_counter()
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return data, time.perf_counter() - start
+
+
+async def extract_async(file_paths, handle, workers=1, prefetch=8):
+    """Asyncio front end: overlap source reads, parsing and output writes.
+
+    Up to `prefetch` upcoming files are read ahead by an I/O thread pool and
+    handed (as bytes) to the process pool, so workers never wait on the file
+    share. handle(file_path, record, error, sha256, timings) runs on a
+    single writer thread, in input order, fed by a bounded queue; a slow
+    writer therefore stalls the readers instead of buffering the corpus.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(prefetch)  # files read or parsing but not yet handled
+    queue = asyncio.Queue(maxsize=prefetch)
+    pool_args = dict(max_workers=workers, initializer=_init_worker, initargs=_pool_initargs())
+    pools = [ProcessPoolExecutor(**pool_args)]
+    
+    async def extract(file_path):
+        try:
+            data, read_seconds = await loop.run_in_executor(readers, _read_source, file_path)
+        except OSError as e:
+            return None, f"read error: {str(e)}", None, None
+        pool = pools[-1]
+        try:
+            result = await loop.run_in_executor(pool, _extract_worker, file_path, data)
+        except BrokenProcessPool:
+            # A worker died (segfault/OOM kill); everything in flight on
+            # that pool fails with it, so start a fresh pool for the rest
+            # and re-run this file alone to see whether it was the cause
+            if pools[-1] is pool:
+                pool.shutdown(wait=False)
+                pools.append(ProcessPoolExecutor(**pool_args))
+            result = None, "worker process crashed", None, None
+        if result[1] is not None and result[1].startswith(QUARANTINE_ERRORS):
+            result = await loop.run_in_executor(isolator, _confirm_alone, file_path, result, data)
+        record, error, digest, timings = result
+        if timings is not None:
+            timings['stages']['read'] = read_seconds
+        return result
+    
+    async def produce():
+        for file_path in file_paths:
+            await slots.acquire()
+            await queue.put((file_path, asyncio.ensure_future(extract(file_path))))
+        await queue.put(None)
+    
+    async def consume():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            file_path, task = item
+            result = await task
+            try:
+                await loop.run_in_executor(writer, handle, file_path, *result)
+            finally:
+                slots.release()
+    
+    readers = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix='read')
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='write')
+    # Files re-run alone go one at a time, so they do not compete with each other
+    isolator = ThreadPoolExecutor(max_workers=1, thread_name_prefix='isolate')
+    try:
+        await asyncio.gather(produce(), consume())
+    finally:
+        readers.shutdown()
+        writer.shutdown()
+        isolator.shutdown()
+        for pool in pools:
+            pool.shutdown()
+
+
+def load_manifest(manifest_path, output_format='json'):
+    """Load the incremental extraction manifest (relative path -> entry)"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('output_format', 'json') != output_format:
+        return {}  # switching layouts needs a full re-extraction
+    return manifest.get('files', {})
+
+
+def save_manifest(manifest_path, entries, output_format='json'):
+    """Atomically write the incremental extraction manifest"""
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'extractor_version': extractor_version(),
+                   'output_format': output_format,
+                   'files': entries},
+                  f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def load_quarantine(quarantine_path):
+    """Load the quarantine list (relative path -> size, mtime, reason)"""
+    try:
+        with open(quarantine_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_quarantine(quarantine_path, entries):
+    """Atomically write the quarantine list, or remove it when empty"""
+    if not entries:
+        if os.path.exists(quarantine_path):
+            os.remove(quarantine_path)
+        return
+    tmp_path = quarantine_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'files': entries}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, quarantine_path)
+
+
+def is_unchanged(entry, st, file_path, rel_path, sink):
+    """Check a manifest entry against the current source file.
+
+    size+mtime is the fast path; when only the mtime moved (touch, git
+    checkout, rsync) the content hash decides and the entry is refreshed.
+    An entry whose output is not where this run would write it (a new
+    name clash renamed it) is stale too.
+    """
+    if not entry or entry.get('extractor_version') != extractor_version():
+        return False
+    if entry.get('output') and entry['output'] != sink.output_name(rel_path):
+        return False
+    if entry.get('output') and not sink.has_output(entry['output']):
+        return False
+    if entry['size'] != st.st_size:
+        return False
+    if entry['mtime'] == st.st_mtime:
+        return True
+    if entry.get('sha256') and file_sha256(file_path) == entry['sha256']:
+        entry['mtime'] = st.st_mtime
+        return True
+    return False
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered), math.ceil(pct / 100 * len(ordered))) - 1)]
+
+
+class ExtractionProfile:
+    """Per-file stage timings for --profile, summarized into a JSON report.
+
+    Stages are timed where they run (parse/clean/classify/spool/hash in the
+    worker, write in the parent); peak RSS is the high-water mark of the
+    process that extracted the file at the time it finished.
+    """
+    
+    def __init__(self):
+        self.files = []
+        self.started = time.perf_counter()
+    
+    def add(self, rel_path, bytes_in, timings, write_seconds=0.0, bytes_out=0, error=None):
+        stages = dict(timings['stages']) if timings else {}
+        if write_seconds:
+            stages['write'] = write_seconds
+        self.files.append({
+            'relative_path': rel_path,
+            'extension': os.path.splitext(rel_path)[1].lower(),
+            'seconds': sum(stages.values()),
+            'stages': stages,
+            'bytes_in': bytes_in,
+            'bytes_out': bytes_out,
+            'peak_rss': timings['peak_rss'] if timings else None,
+            'error': error
+        })
+    
+    def report(self, top=10):
+        """Build the report dict: totals, per-extension percentiles, slowest files"""
+        def summarize(files):
+            seconds = [f['seconds'] for f in files]
+            bytes_in = sum(f['bytes_in'] for f in files)
+            total = sum(seconds)
+            return {
+                'files': len(files),
+                'bytes_in': bytes_in,
+                'bytes_out': sum(f['bytes_out'] for f in files),
+                'seconds': round(total, 6),
+                'p50': round(percentile(seconds, 50), 6),
+                'p90': round(percentile(seconds, 90), 6),
+                'p99': round(percentile(seconds, 99), 6),
+                'max': round(max(seconds), 6),
+                'mb_per_s': round(bytes_in / total / 1e6, 3) if total else None,
+                'stages': {name: round(sum(f['stages'].get(name, 0.0) for f in files), 6)
+                           for name in PROFILE_STAGES}
+            }
+        
+        by_extension = {}
+        for f in self.files:
+            by_extension.setdefault(f['extension'], []).append(f)
+        rss = [f['peak_rss'] for f in self.files if f['peak_rss']] + [peak_rss() or 0]
+        slowest = sorted(self.files, key=lambda f: f['seconds'], reverse=True)[:top]
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'wall_seconds': round(time.perf_counter() - self.started, 6),
+            'peak_rss': max(rss) or None,
+            'total': summarize(self.files) if self.files else None,
+            'by_extension': {ext: summarize(files) for ext, files in sorted(by_extension.items())},
+            'slowest': [{**f, 'seconds': round(f['seconds'], 6)} for f in slowest],
+            'files': self.files
+        }
+
+
+def print_profile(report):
+    """Print the per-extension stage table and the slowest files"""
+    print("\n" + "="*60)
+    print("⏱️  EXTRACTION PROFILE")
+    print("="*60)
+    print(f"Wall time: {report['wall_seconds']:.2f}s", end='')
+    if report['peak_rss']:
+        print(f"   Peak RSS: {report['peak_rss'] / 1024 / 1024:.1f} MB", end='')
+    print()
+    if not report['total']:
+        print("No files extracted.")
+        return
+    header = f"\n  {'ext':<8}{'files':>6}{'p50 s':>9}{'p90 s':>9}{'p99 s':>9}{'MB/s':>8}"
+    print(header + ''.join(f"{name:>10}" for name in PROFILE_STAGES))
+    rows = list(report['by_extension'].items()) + [('all', report['total'])]
+    for ext, row in rows:
+        line = (f"  {ext:<8}{row['files']:>6}{row['p50']:>9.3f}{row['p90']:>9.3f}{row['p99']:>9.3f}"
+                f"{row['mb_per_s'] if row['mb_per_s'] is not None else 0:>8.2f}")
+        print(line + ''.join(f"{row['stages'][name]:>10.3f}" for name in PROFILE_STAGES))
+    print(f"\nSlowest files:")
+    for f in report['slowest']:
+        top_stage = max(f['stages'], key=f['stages'].get) if f['stages'] else '-'
+        print(f"  {f['seconds']:8.3f}s  {top_stage:<9}{f['relative_path']}")
+
+
+def process_directory(input_dir, output_dir, workers=1, full=False,
+                      output_format='json', shard_size=64 * 1024 * 1024, compress=False,
+                      profile=False, profile_top=10, prefetch=0,
+                      timeout=None, max_rss=None, retry_quarantined=False):
+    """Process all files in directory recursively.
+
+    With prefetch > 0 extraction runs through extract_async, which reads
+    that many files ahead of the parser pool. timeout (seconds) and max_rss
+    (bytes) guard each file; sources that hit them or crash a worker when
+    run on their own are quarantined and skipped by later runs until they
+    change.
+    """
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
     print(f"\n🚀 Starting extraction from: {input_dir}")
-    print(f"📁 Output directory: {output_dir}\n")
+    print(f"📁 Output directory: {output_dir}")
+    if workers > 1:
+        print(f"⚙️  Workers: {workers}")
+    if prefetch > 0:
+        print(f"📥 Prefetch: {prefetch} files ahead")
+    print()
     
     stats = {
         'total': 0,
         'success': 0,
         'failed': 0,
         'skipped': 0,
-        'by_type': {}
+        'unchanged': 0,
+        'removed': 0,
+        'quarantined': 0,
+        'by_type': {},
+        'errors': []
     }
     
+    # Incremental mode: entries for unchanged sources are carried over as-is
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    old_manifest = {} if full else load_manifest(manifest_path, output_format)
+    manifest = {}
+    quarantine_path = os.path.join(output_dir, QUARANTINE_NAME)
+    old_quarantine = {} if retry_quarantined else load_quarantine(quarantine_path)
+    quarantine = {}
+    stats_by_path = {}
+    rel_paths = {}
+    
     # Walk through all files
+    file_paths = []
     for root, dirs, files in os.walk(input_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
+        dirs.sort()
+        for file in sorted(files):
             file_ext = os.path.splitext(file)[1].lower()
             
             # Track by type
@@ -239,17 +1474,132 @@ def process_directory(input_dir, output_dir):
                 stats['skipped'] += 1
                 continue
             
-            # Process file
-            print(f"Processing: {file}...", end=' ')
-            result = process_file(file_path, output_dir)
-            
-            if result:
-                stats['success'] += 1
-                stats['by_type'][file_ext] += 1
-                print("✓")
-            else:
-                stats['failed'] += 1
-                print("✗ (skipped)")
+            file_path = os.path.join(root, file)
+            rel_paths[file_path] = Path(os.path.relpath(file_path, input_dir)).as_posix()
+            stats_by_path[file_path] = os.stat(file_path)
+            file_paths.append(file_path)
+    
+    # Sort by relative path, so runs are reproducible and JSONL shards
+    # come out in a stable order that later runs can merge against
+    file_paths.sort(key=rel_paths.get)
+    
+    if output_format == 'jsonl':
+        sink = JsonlShardSink(output_dir, set(), max_bytes=shard_size, compress=compress)
+    else:
+        sink = JsonDirSink(output_dir, json_output_names([rel_paths[fp] for fp in file_paths]))
+    
+    # Incremental mode: skip sources whose manifest entry still matches,
+    # and quarantined sources that have not changed since they were caught
+    changed_paths = []
+    for file_path in file_paths:
+        rel_path = rel_paths[file_path]
+        entry = old_manifest.get(rel_path)
+        st = stats_by_path[file_path]
+        quarantined = old_quarantine.get(rel_path)
+        if is_unchanged(entry, st, file_path, rel_path, sink):
+            manifest[rel_path] = entry
+            sink.keep(rel_path)
+            stats['unchanged'] += 1
+        elif quarantined and (quarantined['size'], quarantined['mtime']) == (st.st_size, st.st_mtime):
+            quarantine[rel_path] = quarantined
+            if entry:
+                manifest[rel_path] = entry
+                sink.keep(rel_path)
+            stats['quarantined'] += 1
+            stats['errors'].append((file_path, f"quarantined: {quarantined['reason']}"))
+        else:
+            changed_paths.append(file_path)
+    
+    # Process new and modified files
+    profiler = ExtractionProfile() if profile else None
+    set_profiling(profile)
+    set_limits(timeout, max_rss)
+    
+    def handle(file_path, record, error, digest, timings):
+        file = os.path.basename(file_path)
+        rel_path = rel_paths[file_path]
+        print(f"Processing: {file}...", end=' ')
+        
+        output_name = None
+        write_seconds = 0.0
+        if error is None and record is not None:
+            record = {'id': document_id(rel_path), 'relative_path': rel_path, **record}
+            start = time.perf_counter()
+            try:
+                output_name = sink.write(record)
+            except Exception as e:
+                error = f"write error: {str(e)}"
+            finally:
+                discard_content(record)
+            write_seconds = time.perf_counter() - start
+        
+        if profiler is not None:
+            profiler.add(rel_path, stats_by_path[file_path].st_size, timings, write_seconds,
+                         sink.last_bytes if output_name else 0, error)
+        
+        if error is not None:
+            stats['failed'] += 1
+            stats['errors'].append((file_path, error))
+            # Keep the previous entry (if any) so a later run retries it
+            # and a later deletion still cleans up its old output
+            if rel_path in old_manifest:
+                manifest[rel_path] = old_manifest[rel_path]
+                sink.keep(rel_path)
+            if error.startswith(QUARANTINE_ERRORS):
+                st = stats_by_path[file_path]
+                quarantine[rel_path] = {
+                    'size': st.st_size,
+                    'mtime': st.st_mtime,
+                    'reason': error,
+                    'quarantined_at': datetime.now().isoformat()
+                }
+                stats['quarantined'] += 1
+                error += " (quarantined)"
+            print(f"✗ {error}")
+            return
+        
+        st = stats_by_path[file_path]
+        manifest[rel_path] = {
+            'size': st.st_size,
+            'mtime': st.st_mtime,
+            'sha256': digest,
+            'extractor_version': extractor_version(),
+            'output': output_name
+        }
+        if record is not None:
+            stats['success'] += 1
+            stats['by_type'][os.path.splitext(file)[1].lower()] += 1
+            print("✓")
+        else:
+            stats['failed'] += 1
+            print("✗ (skipped)")
+    
+    completed = False
+    try:
+        if prefetch > 0:
+            asyncio.run(extract_async(changed_paths, handle, workers, prefetch))
+        else:
+            for result in iter_extracted(changed_paths, workers):
+                handle(*result)
+        
+        # Delete output for sources that no longer exist, and output left
+        # under an old name after a name clash renamed it
+        live_outputs = {e['output'] for e in manifest.values() if e.get('output')}
+        for rel_path, entry in old_manifest.items():
+            if rel_path not in manifest:
+                stats['removed'] += 1
+            output = entry.get('output')
+            if output and output not in live_outputs:
+                sink.remove(output)
+        
+        sink.close()
+        completed = True
+    finally:
+        if not completed:
+            sink.abort()
+        if completed or sink.partial_ok:
+            save_manifest(manifest_path, manifest, output_format)
+            save_quarantine(quarantine_path, quarantine)
     
     # Print summary
     print("\n" + "="*60)
@@ -257,29 +1607,121 @@ def process_directory(input_dir, output_dir):
     print("="*60)
     print(f"Total files found:     {stats['total']}")
     print(f"Successfully extracted: {stats['success']}")
+    print(f"Unchanged (skipped):   {stats['unchanged']}")
+    print(f"Removed sources:       {stats['removed']}")
+    print(f"Quarantined:           {stats['quarantined']}")
     print(f"Failed/Skipped:        {stats['failed'] + stats['skipped']}")
     print(f"\nBy file type:")
     for ext, count in sorted(stats['by_type'].items()):
         if count > 0:
             print(f"  {ext:10s}: {count}")
+    if stats['errors']:
+        print(f"\nErrors ({len(stats['errors'])}):")
+        for file_path, error in stats['errors']:
+            print(f"  ✗ {file_path}: {error}")
     print("="*60)
+    
+    if profiler is not None:
+        report = profiler.report(top=profile_top)
+        report_path = os.path.join(output_dir, PROFILE_NAME)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print_profile(report)
+        print(f"\n📈 Profile report saved to: {report_path}")
+    
     print(f"\n✅ Extracted files saved to: {output_dir}")
+    
+    return stats
 
 
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python extract-content.py <input_dir> <output_dir>")
-        print("Example: python extract-content.py ./guidewire-knowledge ./extracted-knowledge")
+    parser = argparse.ArgumentParser(
+        description="Extract text content from PDF, PPTX, DOCX, TXT, MD, and code files"
+    )
+    parser.add_argument('input_dir', help="Directory to scan recursively")
+    parser.add_argument('output_dir', help="Directory for extracted JSON files")
+    parser.add_argument('--rules', default=RULES_PATH,
+                        help="Classifier rules JSON (default: scripts/classifier-rules.json)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of parallel extraction processes (default: 1)")
+    parser.add_argument('--prefetch', type=int, default=0,
+                        help="Read up to N files ahead of the parser pool with an asyncio "
+                             "front end, for slow/network file shares (default: 0, off)")
+    parser.add_argument('--timeout', type=float, default=0,
+                        help="Abort a file's extraction after N seconds (default: 0, no limit)")
+    parser.add_argument('--max-rss', type=int, default=0,
+                        help="Abort a file's extraction when its worker exceeds N MB RSS "
+                             "(default: 0, no limit)")
+    parser.add_argument('--retry-quarantined', action='store_true',
+                        help="Retry quarantined files even if they have not changed")
+    parser.add_argument('--pptx-cache', default=default_cache_dir(),
+                        help="Parsed-deck cache shared with extract-quizzes-from-ppts.py "
+                             "(default: $PPTX_CACHE_DIR or ~/.cache/guidewire-guru/pptx)")
+    parser.add_argument('--no-pptx-cache', action='store_true',
+                        help="Parse every deck without reading or writing the cache")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignore the incremental manifest and re-extract everything")
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                        help="One JSON file per document, or sharded JSONL (default: json)")
+    parser.add_argument('--shard-size', type=int, default=64,
+                        help="Maximum uncompressed JSONL shard size in MB (default: 64)")
+    parser.add_argument('--gzip', action='store_true',
+                        help="gzip-compress JSONL shards")
+    parser.add_argument('--chunks', action='store_true',
+                        help="Also write embedding-ready chunks to chunks-NNNNN.jsonl shards")
+    parser.add_argument('--chunk-chars', type=int, default=2000,
+                        help="Maximum characters per chunk (default: 2000, ~500 tokens)")
+    parser.add_argument('--chunk-overlap', type=int, default=200,
+                        help="Characters of overlap when a slide/page is split (default: 200)")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"Time each stage per file and write {PROFILE_NAME} to the output directory")
+    parser.add_argument('--profile-top', type=int, default=10,
+                        help="Number of slowest files listed in the profile (default: 10)")
+    parser.add_argument('--cprofile', metavar='PATH',
+                        help="Dump cProfile stats for the run to PATH (view with python -m pstats)")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.input_dir):
+        print(f"❌ Error: Input directory '{args.input_dir}' does not exist")
         sys.exit(1)
     
-    input_dir = sys.argv[1]
-    output_dir = sys.argv[2]
+    set_classifier_rules(args.rules)
+    set_pptx_cache(None if args.no_pptx_cache else args.pptx_cache)
     
-    if not os.path.exists(input_dir):
-        print(f"❌ Error: Input directory '{input_dir}' does not exist")
-        sys.exit(1)
+    if args.max_rss > 0 and current_rss() is None:
+        print("⚠️  --max-rss needs /proc/self/statm (Linux); the memory limit will not be enforced")
+    
+    profiler = None
+    if args.cprofile:
+        if args.workers > 1:
+            print("⚠️  --cprofile only sees the main process; use --workers 1 to profile extraction")
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
+    process_directory(args.input_dir, args.output_dir,
+                      workers=max(1, args.workers), full=args.full,
+                      output_format=args.format,
+                      shard_size=max(1, args.shard_size) * 1024 * 1024,
+                      compress=args.gzip,
+                      profile=args.profile, profile_top=max(0, args.profile_top),
+                      prefetch=max(0, args.prefetch),
+                      timeout=args.timeout if args.timeout > 0 else None,
+                      max_rss=args.max_rss * 1024 * 1024 if args.max_rss > 0 else None,
+                      retry_quarantined=args.retry_quarantined)
+    
+    if args.chunks:
+        print("\n✂️  Chunking extracted content...")
+        count = write_chunks(args.output_dir,
+                             max_chars=args.chunk_chars,
+                             overlap=min(args.chunk_overlap, args.chunk_chars // 2),
+                             shard_size=max(1, args.shard_size) * 1024 * 1024,
+                             compress=args.gzip)
+        print(f"✅ Wrote {count} chunks to {args.output_dir}/{CHUNK_PREFIX}*.jsonl")
     
-    process_directory(input_dir, output_dir)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print(f"📈 cProfile stats saved to: {args.cprofile}")
 
 
 if __name__ == "__main__":
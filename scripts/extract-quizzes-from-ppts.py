@@ -10,19 +10,45 @@ This script:
 5. Generates SQL INSERT statements
 
 Usage:
-    python3 scripts/extract-quizzes-from-ppts.py
+    python3 scripts/extract-quizzes-from-ppts.py [--workers N] [--split-kb N]
+        [--mode statements|batch|copy] [--batch-size N]
+        [--load DSN [--pool-size N]] [--id-snapshot FILE]
+        [--pptx-cache DIR | --no-pptx-cache]
+
+Decks are processed in relative-path order, so the SQL is byte-stable
+between runs given the same SOURCE_DATE_EPOCH (used for the "Generated"
+timestamps when set).
+
+Decks are read through the parsed-deck cache shared with extract-content.py
+(scripts/pptx_cache.py), so a deck already parsed by either script is not
+opened with python-pptx again until it changes.
+
+With --load DSN the quizzes are loaded straight into the database
+(scripts/db_loader.py) instead of being written as SQL. Re-running updates
+the same quizzes rather than duplicating them.
+
+With --id-snapshot FILE (exported by scripts/db_loader.py) topic IDs are
+written into the SQL instead of being looked up by code in every quiz.
+Quizzes whose topic code is not in the snapshot are skipped.
 
 Requirements:
     pip install python-pptx
+    pip install "psycopg[binary]"  (only for --load)
 
 Output:
-    database/BULK-QUIZ-INSERTS.sql
+    database/BULK-QUIZ-INSERTS.sql (or BULK-QUIZ-INSERTS-001.sql, ... with --split-kb)
+    database/BULK-QUIZ-COPY.sql with --mode copy (a psql script)
 """
 
+import os
 import re
 import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import NamedTuple
 
 try:
     from pptx import Presentation
@@ -32,54 +58,87 @@ except ImportError:
     print("   Run: pip install python-pptx")
     exit(1)
 
+from pptx_cache import load_deck, default_cache_dir
+from sql_writer import SqlWriter, SqlExpr, sql_literal, insert_values, copy_from_stdin
+from db_loader import ConnectionPool, load_quizzes, read_id_snapshot
 
-def extract_slide_text(slide) -> str:
-    """Extract all text from a slide."""
-    text_parts = []
-    for shape in slide.shapes:
-        if hasattr(shape, "text"):
-            text_parts.append(shape.text)
-    return "\n".join(text_parts)
+QUESTION_COLUMNS = ['id', 'quiz_id', 'position', 'question', 'options', 'correct_answer', 'points']
 
 
-def get_slide_background_color(slide) -> tuple:
-    """Try to determine slide background color (RGB)."""
-    try:
-        if slide.background.fill.type == 1:  # Solid fill
-            color = slide.background.fill.fore_color
-            if hasattr(color, 'rgb'):
-                return (color.rgb[0], color.rgb[1], color.rgb[2])
-    except:
-        pass
-    return None
+def extract_slide_text(slide: dict) -> str:
+    """Extract all text from a (cached) slide."""
+    return "\n".join(slide['texts'])
+
+
+def get_slide_background_color(slide: dict) -> tuple:
+    """Slide background color (RGB) if it has a solid fill."""
+    background = slide.get('background')
+    return tuple(background) if background else None
+
+
+# Classification/parsing patterns, compiled once
+QUESTION_HEADER_RE = re.compile(r'question\s*\d*', re.IGNORECASE)
+OPTION_MARK_RE = re.compile(r'[A-D]\)')
+OPTION_LINE_RE = re.compile(r'([A-D])\)\s*(.+)', re.IGNORECASE)
+ANSWER_LABEL_RE = re.compile(r'answer[:\s]*([A-D])\)?', re.IGNORECASE)
+ANSWER_LETTER_RE = re.compile(r'^([A-D])\)?$', re.MULTILINE | re.IGNORECASE)
+
+
+class SlideInfo(NamedTuple):
+    """A quiz slide's text and detected roles, computed once per deck."""
+    text: str
+    is_question: bool
+    is_answer: bool
+
+
+def _is_review(normalized: str) -> bool:
+    # "lesson objectives review" contains "objectives review"
+    return "objectives review" in normalized or "lesson objective review" in normalized
+
+
+def _is_question(stripped: str) -> bool:
+    # Look for "Question" at start or numbered questions, or A) B) C) D) options
+    return bool(QUESTION_HEADER_RE.match(stripped) or OPTION_MARK_RE.search(stripped))
+
+
+def _is_answer(normalized: str) -> bool:
+    return normalized.startswith('answer') or 'correct answer' in normalized
 
 
 def is_lesson_review_slide(slide_text: str) -> bool:
     """Check if slide is 'Lesson objectives review'."""
-    normalized = slide_text.lower().strip()
-    return (
-        "lesson objectives review" in normalized or
-        "lesson objective review" in normalized or
-        "objectives review" in normalized
-    )
+    return _is_review(slide_text.lower().strip())
 
 
 def is_question_slide(slide_text: str) -> bool:
     """Heuristic: slide with 'Question' header or multiple choice options."""
-    text = slide_text.strip()
-    # Look for "Question" at start or numbered questions
-    if re.match(r'^question\s*\d*', text, re.IGNORECASE):
-        return True
-    # Look for A) B) C) D) pattern
-    if re.search(r'[A-D]\)', text):
-        return True
-    return False
+    return _is_question(slide_text.strip())
 
 
 def is_answer_slide(slide_text: str) -> bool:
     """Heuristic: slide with 'Answer' header."""
-    text = slide_text.lower().strip()
-    return text.startswith('answer') or 'correct answer' in text
+    return _is_answer(slide_text.lower().strip())
+
+
+def analyze_slides(slides: list) -> tuple:
+    """Single pre-pass over a deck, building each slide's text exactly once.
+
+    Returns (review_idx, quiz_slides): the index of the first "Lesson
+    objectives review" slide (None if there is none) and a SlideInfo with
+    the question/answer roles of every slide after it. Slides before the
+    review slide are only checked for being the review slide.
+    """
+    for idx, slide in enumerate(slides):
+        if _is_review("\n".join(slide['texts']).lower()):
+            break
+    else:
+        return None, []
+    quiz_slides = []
+    for slide in slides[idx + 1:]:
+        text = "\n".join(slide['texts'])
+        stripped = text.strip()
+        quiz_slides.append(SlideInfo(text, _is_question(stripped), _is_answer(stripped.lower())))
+    return idx, quiz_slides
 
 
 def parse_question_slide(slide_text: str) -> dict:
@@ -92,7 +151,7 @@ def parse_question_slide(slide_text: str) -> dict:
     
     question_started = False
     for line in lines:
-        if re.match(r'^question\s*\d*', line, re.IGNORECASE):
+        if QUESTION_HEADER_RE.match(line):
             question_started = True
             continue
         
@@ -100,7 +159,7 @@ def parse_question_slide(slide_text: str) -> dict:
             continue
         
         # Check for options A) B) C) D)
-        option_match = re.match(r'([A-D])\)\s*(.+)', line, re.IGNORECASE)
+        option_match = OPTION_LINE_RE.match(line)
         if option_match:
             letter, text = option_match.groups()
             options[letter.upper()] = text.strip()
@@ -122,12 +181,12 @@ def parse_answer_slide(slide_text: str) -> str:
     text = slide_text.strip()
     
     # Look for patterns like "Answer: B" or "B)" or just "B"
-    match = re.search(r'answer[:\s]*([A-D])\)?', text, re.IGNORECASE)
+    match = ANSWER_LABEL_RE.search(text)
     if match:
         return match.group(1).upper()
     
     # Look for standalone letter
-    match = re.search(r'^([A-D])\)?$', text, re.MULTILINE | re.IGNORECASE)
+    match = ANSWER_LETTER_RE.search(text)
     if match:
         return match.group(1).upper()
     
@@ -139,36 +198,37 @@ def parse_answer_slide(slide_text: str) -> str:
     return None
 
 
-def extract_quiz_from_ppt(ppt_path: Path) -> dict:
-    """Extract quiz questions from a single PPT file."""
-    print(f"  📄 Processing: {ppt_path.name}")
+def extract_quiz_from_ppt(ppt_path: Path, cache_dir: str = None, log=print) -> dict:
+    """Extract quiz questions from a single PPT file.
+
+    Progress lines go to `log` (print by default; pool workers collect them).
+    Returns None when the deck has no quiz; raises if it cannot be read.
+    """
+    log(f"  📄 Processing: {ppt_path.name}")
     
     try:
-        prs = Presentation(str(ppt_path))
+        _, slides = load_deck(str(ppt_path), cache_dir=cache_dir)
     except Exception as e:
-        print(f"     ❌ Error opening PPT: {e}")
-        return None
+        raise Exception(f"Error opening PPT: {e}")
     
-    slides = list(prs.slides)
-    
-    # Find "Lesson objectives review" slide
-    review_slide_idx = None
-    for idx, slide in enumerate(slides):
-        text = extract_slide_text(slide)
-        if is_lesson_review_slide(text):
-            review_slide_idx = idx
-            print(f"     ✅ Found review slide at position {idx + 1}")
-            break
+    try:
+        return extract_quiz_from_slides(ppt_path.stem, slides, log)
+    except Exception as e:
+        raise Exception(f"Error extracting quiz: {e}")
+
+
+def extract_quiz_from_slides(ppt_name: str, slides: list, log=print) -> dict:
+    """Extract quiz questions from a deck's (cached) slides."""
+    # Find "Lesson objectives review" slide; the slides after it are the quiz
+    review_slide_idx, quiz_slides = analyze_slides(slides)
     
     if review_slide_idx is None:
-        print(f"     ⚠️  No 'Lesson objectives review' found")
+        log(f"     ⚠️  No 'Lesson objectives review' found")
         return None
-    
-    # Extract slides after review
-    quiz_slides = slides[review_slide_idx + 1:]
+    log(f"     ✅ Found review slide at position {review_slide_idx + 1}")
     
     if not quiz_slides:
-        print(f"     ⚠️  No slides after review")
+        log(f"     ⚠️  No slides after review")
         return None
     
     # Parse question/answer pairs
@@ -176,18 +236,15 @@ def extract_quiz_from_ppt(ppt_path: Path) -> dict:
     i = 0
     while i < len(quiz_slides):
         slide = quiz_slides[i]
-        slide_text = extract_slide_text(slide)
         
-        if is_question_slide(slide_text):
-            question_data = parse_question_slide(slide_text)
+        if slide.is_question:
+            question_data = parse_question_slide(slide.text)
             
             # Look for answer in next slide
             correct_answer = None
-            if i + 1 < len(quiz_slides):
-                answer_text = extract_slide_text(quiz_slides[i + 1])
-                if is_answer_slide(answer_text):
-                    correct_answer = parse_answer_slide(answer_text)
-                    i += 1  # Skip answer slide
+            if i + 1 < len(quiz_slides) and quiz_slides[i + 1].is_answer:
+                correct_answer = parse_answer_slide(quiz_slides[i + 1].text)
+                i += 1  # Skip answer slide
             
             if question_data['question'] and question_data['options'] and correct_answer:
                 questions.append({
@@ -199,16 +256,38 @@ def extract_quiz_from_ppt(ppt_path: Path) -> dict:
         i += 1
     
     if questions:
-        print(f"     ✅ Extracted {len(questions)} questions")
+        log(f"     ✅ Extracted {len(questions)} questions")
         return {
-            'ppt_name': ppt_path.stem,
+            'ppt_name': ppt_name,
             'questions': questions
         }
     else:
-        print(f"     ⚠️  No questions extracted")
+        log(f"     ⚠️  No questions extracted")
         return None
 
 
+def extract_deck(ppt_path: Path, cache_dir: str = None) -> tuple:
+    """Pool entry point: (quiz_data or None, progress lines, error or None) for one deck.
+
+    error is set only when the deck could not be read or parsed; a deck
+    without a quiz comes back with neither quiz_data nor an error.
+    """
+    messages = []
+    try:
+        quiz_data = extract_quiz_from_ppt(ppt_path, cache_dir, log=messages.append)
+    except Exception as e:
+        messages.append(f"     ❌ {e}")
+        return None, messages, str(e)
+    return quiz_data, messages, None
+
+
+def generated_at() -> str:
+    """Timestamp for SQL headers; honours SOURCE_DATE_EPOCH for byte-stable output."""
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    moment = datetime.fromtimestamp(int(epoch), timezone.utc) if epoch else datetime.now()
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
 def map_ppt_to_topic_code(ppt_name: str) -> str:
     """Map PPT filename to topic code."""
     # Try to match patterns like "IS_Claim_01" → "cc-01-001"
@@ -245,8 +324,14 @@ def map_ppt_to_topic_code(ppt_name: str) -> str:
     return f"unknown-{ppt_name[:10]}"
 
 
-def generate_sql_for_quiz(topic_code: str, quiz_data: dict) -> list:
-    """Generate SQL statements for a single quiz."""
+def generate_sql_for_quiz(topic_code: str, quiz_data: dict, batch_size: int = None,
+                          topic_id: str = None) -> list:
+    """Generate SQL statements for a single quiz.
+
+    With batch_size, questions are inserted with multi-row INSERTs of up to
+    batch_size rows instead of one INSERT per question. With topic_id (from
+    an ID snapshot), the topic is not looked up by code.
+    """
     
     def escape_sql(text: str) -> str:
         if text is None:
@@ -256,7 +341,7 @@ def generate_sql_for_quiz(topic_code: str, quiz_data: dict) -> list:
     sql_lines = [
         f"-- Quiz for: {quiz_data['ppt_name']}",
         f"-- Topic code: {topic_code}",
-        f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"-- Generated: {generated_at()}",
         "",
         "DO $$",
         "DECLARE",
@@ -267,7 +352,7 @@ def generate_sql_for_quiz(topic_code: str, quiz_data: dict) -> list:
         "    id, topic_id, title, description, passing_score, time_limit_minutes, published",
         "  ) VALUES (",
         "    gen_random_uuid(),",
-        f"    (SELECT id FROM topics WHERE code = '{topic_code}'),",
+        f"    '{topic_id}'," if topic_id else f"    (SELECT id FROM topics WHERE code = '{topic_code}'),",
         f"    '{escape_sql(quiz_data['ppt_name'])} - Knowledge Check',",
         f"    'Quiz extracted from {escape_sql(quiz_data['ppt_name'])}',",
         "    70,",
@@ -278,7 +363,16 @@ def generate_sql_for_quiz(topic_code: str, quiz_data: dict) -> list:
         "  -- Create questions",
     ]
     
-    for idx, q in enumerate(quiz_data['questions'], 1):
+    if batch_size:
+        rows = [
+            (SqlExpr('gen_random_uuid()'), SqlExpr('v_quiz_id'), idx, q['question'],
+             SqlExpr(sql_literal(json.dumps(q['options'])) + '::jsonb'), q['correct_answer'], 1)
+            for idx, q in enumerate(quiz_data['questions'], 1)
+        ]
+        sql_lines.extend(insert_values('quiz_questions', QUESTION_COLUMNS, rows, batch_size, indent='  '))
+        sql_lines.append("")
+    
+    for idx, q in enumerate(quiz_data['questions'] if not batch_size else [], 1):
         question_text = escape_sql(q['question'])
         options_json = json.dumps(q['options']).replace("'", "''")
         
@@ -308,13 +402,184 @@ def generate_sql_for_quiz(topic_code: str, quiz_data: dict) -> list:
     return sql_lines
 
 
+def generate_copy_sql(all_quizzes: list) -> list:
+    """Generate a psql script that bulk loads all quizzes with COPY.
+
+    Quizzes and questions are copied into temp staging tables (quiz IDs are
+    assigned there), then inserted with one INSERT ... SELECT each, inside
+    a single transaction.
+    """
+    quiz_rows = []
+    question_rows = []
+    for seq, (topic_code, quiz_data) in enumerate(all_quizzes, 1):
+        quiz_rows.append((seq, topic_code, f"{quiz_data['ppt_name']} - Knowledge Check",
+                          f"Quiz extracted from {quiz_data['ppt_name']}"))
+        for idx, q in enumerate(quiz_data['questions'], 1):
+            question_rows.append((seq, idx, q['question'], q['options'], q['correct_answer'], 1))
+    
+    sql_lines = [
+        "-- COPY FROM STDIN needs psql: psql \"$DATABASE_URL\" -f <this file>",
+        "BEGIN;",
+        "",
+        "CREATE TEMP TABLE quiz_import (",
+        "  quiz_seq INTEGER PRIMARY KEY,",
+        "  quiz_id UUID NOT NULL DEFAULT gen_random_uuid(),",
+        "  topic_code TEXT,",
+        "  title TEXT,",
+        "  description TEXT",
+        ") ON COMMIT DROP;",
+        "",
+        "CREATE TEMP TABLE quiz_question_import (",
+        "  quiz_seq INTEGER NOT NULL,",
+        "  position INTEGER NOT NULL,",
+        "  question TEXT,",
+        "  options JSONB,",
+        "  correct_answer TEXT,",
+        "  points INTEGER",
+        ") ON COMMIT DROP;",
+        "",
+    ]
+    sql_lines.extend(copy_from_stdin('quiz_import', ['quiz_seq', 'topic_code', 'title', 'description'],
+                                     quiz_rows))
+    sql_lines.append("")
+    sql_lines.extend(copy_from_stdin('quiz_question_import',
+                                     ['quiz_seq', 'position', 'question', 'options', 'correct_answer', 'points'],
+                                     question_rows))
+    sql_lines.extend([
+        "",
+        "INSERT INTO quizzes (",
+        "  id, topic_id, title, description, passing_score, time_limit_minutes, published",
+        ")",
+        "SELECT i.quiz_id, t.id, i.title, i.description, 70, 15, true",
+        "FROM quiz_import i",
+        "LEFT JOIN topics t ON t.code = i.topic_code",
+        "ORDER BY i.quiz_seq;",
+        "",
+        "INSERT INTO quiz_questions (",
+        "  id, quiz_id, position, question, options, correct_answer, points",
+        ")",
+        "SELECT gen_random_uuid(), i.quiz_id, q.position, q.question, q.options, q.correct_answer, q.points",
+        "FROM quiz_question_import q",
+        "JOIN quiz_import i ON i.quiz_seq = q.quiz_seq",
+        "ORDER BY q.quiz_seq, q.position;",
+        "",
+        "COMMIT;",
+        "",
+        "",
+    ])
+    return sql_lines
+
+
+def write_quiz_sql(output_file: Path, all_quizzes: list, mode: str = 'statements',
+                   batch_size: int = 100, topic_ids: dict = None, max_bytes: int = 0) -> list:
+    """Stream the SQL for all quizzes to output_file and return the paths written.
+
+    mode is 'statements', 'batch' or 'copy' as for --mode; with max_bytes the
+    INSERT output rotates into parts (see SqlWriter). topic_ids maps topic
+    codes to IDs from a snapshot.
+    """
+    topic_ids = topic_ids or {}
+    header = [
+        "-- Bulk Quiz Import",
+        f"-- Generated: {generated_at()}",
+        f"-- Total quizzes: {len(all_quizzes)}",
+        "",
+        "-- Note: This will create quizzes for all topics that have matching codes",
+        "-- Topics without matching codes will be skipped",
+        "",
+        "",
+    ]
+    with SqlWriter(output_file, max_bytes=max_bytes, header=header) as sql:
+        if mode == 'copy':
+            # One transaction, so it is never split across parts
+            sql.write(*generate_copy_sql(all_quizzes))
+        else:
+            for topic_code, quiz_data in all_quizzes:
+                sql.write(*generate_sql_for_quiz(topic_code, quiz_data,
+                                                 batch_size if mode == 'batch' else None,
+                                                 topic_ids.get(topic_code)))
+        
+        # Add verification query
+        sql.write(
+            "-- Verification: List all quizzes created",
+            "SELECT ",
+            "  t.code,",
+            "  t.title,",
+            "  q.title as quiz_title,",
+            "  COUNT(qq.id) as question_count",
+            "FROM quizzes q",
+            "JOIN topics t ON q.topic_id = t.id",
+            "LEFT JOIN quiz_questions qq ON qq.quiz_id = q.id",
+            "GROUP BY t.code, t.title, q.title",
+            "ORDER BY t.code;",
+        )
+    return sql.paths
+
+
+def load_to_database(dsn: str, all_quizzes: list, pool_size: int, batch_size: int):
+    """Load extracted quizzes directly, with the same values as the generated SQL"""
+    print("\n🗄️  Loading quizzes into the database...")
+    quizzes = [
+        {
+            'topic_code': topic_code,
+            'title': f"{quiz_data['ppt_name']} - Knowledge Check",
+            'description': f"Quiz extracted from {quiz_data['ppt_name']}",
+            'passing_score': 70,
+            'time_limit': 15,
+            'published': True,
+            'questions': quiz_data['questions'],
+        }
+        for topic_code, quiz_data in all_quizzes
+    ]
+    with ConnectionPool(dsn, size=pool_size) as pool:
+        loaded, questions, missing = load_quizzes(pool, quizzes, batch_size)
+    
+    print(f"✅ Loaded {loaded} quizzes ({questions} questions)")
+    if missing:
+        print(f"⚠️  Skipped quizzes for {len(missing)} topic codes not in the database:")
+        for code in missing:
+            print(f"   - {code}")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Bulk extract quiz questions from PowerPoint files")
+    parser.add_argument('--pptx-cache', default=default_cache_dir(),
+                        help="Parsed-deck cache shared with extract-content.py "
+                             "(default: $PPTX_CACHE_DIR or ~/.cache/guidewire-guru/pptx)")
+    parser.add_argument('--no-pptx-cache', action='store_true',
+                        help="Parse every deck without reading or writing the cache")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of decks to extract in parallel (default: 1)")
+    parser.add_argument('--mode', choices=['statements', 'batch', 'copy'], default='statements',
+                        help="One INSERT per question, multi-row INSERT batches, or a psql "
+                             "COPY FROM STDIN bulk load (default: statements)")
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help="Rows per multi-row INSERT in batch mode, or quizzes per "
+                             "transaction with --load (default: 100)")
+    parser.add_argument('--load', metavar='DSN',
+                        help="Load the quizzes into this database instead of writing SQL "
+                             "(postgresql://... or sqlite:///file.db)")
+    parser.add_argument('--pool-size', type=int, default=4,
+                        help="Database connections used in parallel with --load (default: 4)")
+    parser.add_argument('--id-snapshot', metavar='FILE',
+                        help="Use topic IDs from this code -> id snapshot (see scripts/db_loader.py) "
+                             "instead of looking each topic up by code")
+    parser.add_argument('--split-kb', type=int, default=0,
+                        help="Rotate the SQL into parts of at most N KB, e.g. 900 for the "
+                             "Supabase SQL editor (default: 0, one file)")
+    args = parser.parse_args()
+    if args.id_snapshot and args.mode == 'copy':
+        parser.error("--id-snapshot is not needed with --mode copy (topics are resolved with one join)")
+    cache_dir = None if args.no_pptx_cache else args.pptx_cache
+    
     print("🚀 Bulk Quiz Extraction from PPT Files")
     print("=" * 60)
     
     # Find all PPT files
     data_dir = Path("data")
-    ppt_files = list(data_dir.rglob("*.pptx")) + list(data_dir.rglob("*.ppt"))
+    # Sorted so the generated SQL is byte-stable between runs
+    ppt_files = sorted(list(data_dir.rglob("*.pptx")) + list(data_dir.rglob("*.ppt")),
+                       key=lambda p: p.relative_to(data_dir).as_posix())
     
     if not ppt_files:
         print("❌ No PPT files found in data/ folder")
@@ -322,13 +587,34 @@ def main():
     
     print(f"\n📁 Found {len(ppt_files)} PPT files\n")
     
-    # Extract quizzes
+    # Extract quizzes. Results come back in file order whatever the worker
+    # count, and each deck's progress is printed as one block.
     all_quizzes = []
-    for ppt_file in ppt_files:
-        quiz_data = extract_quiz_from_ppt(ppt_file)
-        if quiz_data:
-            topic_code = map_ppt_to_topic_code(ppt_file.stem)
-            all_quizzes.append((topic_code, quiz_data))
+    failed = []
+    workers = max(1, args.workers)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if executor:
+            results = executor.map(extract_deck, ppt_files, repeat(cache_dir),
+                                   chunksize=max(1, len(ppt_files) // (workers * 4)))
+        else:
+            results = map(extract_deck, ppt_files, repeat(cache_dir))
+        for ppt_file, (quiz_data, messages, error) in zip(ppt_files, results):
+            for message in messages:
+                print(message)
+            if error is not None:
+                failed.append(ppt_file)
+            if quiz_data:
+                topic_code = map_ppt_to_topic_code(ppt_file.stem)
+                all_quizzes.append((topic_code, quiz_data))
+    finally:
+        if executor:
+            executor.shutdown()
+    
+    if failed:
+        print(f"\n⚠️  {len(failed)} PPT files could not be read:")
+        for ppt_file in failed:
+            print(f"   - {ppt_file}")
     
     if not all_quizzes:
         print("\n❌ No quizzes extracted from any PPT file")
@@ -336,47 +622,45 @@ def main():
         return
     
     print(f"\n✅ Successfully extracted {len(all_quizzes)} quizzes")
-    print("\n📝 Generating SQL...")
     
-    # Generate SQL
-    all_sql = [
-        "-- Bulk Quiz Import",
-        f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"-- Total quizzes: {len(all_quizzes)}",
-        "",
-        "-- Note: This will create quizzes for all topics that have matching codes",
-        "-- Topics without matching codes will be skipped",
-        "",
-        "",
-    ]
+    if args.load:
+        load_to_database(args.load, all_quizzes, args.pool_size, args.batch_size)
+        return
     
-    for topic_code, quiz_data in all_quizzes:
-        all_sql.extend(generate_sql_for_quiz(topic_code, quiz_data))
-    
-    # Add verification query
-    all_sql.extend([
-        "-- Verification: List all quizzes created",
-        "SELECT ",
-        "  t.code,",
-        "  t.title,",
-        "  q.title as quiz_title,",
-        "  COUNT(qq.id) as question_count",
-        "FROM quizzes q",
-        "JOIN topics t ON q.topic_id = t.id",
-        "LEFT JOIN quiz_questions qq ON qq.quiz_id = q.id",
-        "GROUP BY t.code, t.title, q.title",
-        "ORDER BY t.code;",
-    ])
+    print("\n📝 Generating SQL...")
     
-    # Write to file
-    output_file = Path("database/BULK-QUIZ-INSERTS.sql")
-    output_file.write_text('\n'.join(all_sql))
+    topic_ids = {}
+    if args.id_snapshot:
+        topic_ids = read_id_snapshot(args.id_snapshot)['topics']
+        missing = sorted({code for code, _ in all_quizzes if code not in topic_ids})
+        if missing:
+            print(f"⚠️  Skipping quizzes for {len(missing)} topic codes not in {args.id_snapshot}:")
+            for code in missing:
+                print(f"   - {code}")
+        all_quizzes = [(code, quiz_data) for code, quiz_data in all_quizzes if code in topic_ids]
+    
+    # Stream SQL to disk quiz by quiz (rotating into parts with --split-kb)
+    if args.mode == 'copy':
+        output_file = Path("database/BULK-QUIZ-COPY.sql")
+    else:
+        output_file = Path("database/BULK-QUIZ-INSERTS.sql")
+    paths = write_quiz_sql(output_file, all_quizzes, args.mode, max(1, args.batch_size), topic_ids,
+                           args.split_kb * 1024)
     
-    print(f"✅ Generated: {output_file}")
+    for path in paths:
+        print(f"✅ Generated: {path}")
     print("\n📋 Next steps:")
-    print("   1. Review the generated SQL file")
+    print("   1. Review the generated SQL file" + ("s" if len(paths) > 1 else ""))
+    if args.mode == 'copy':
+        print(f"   2. Load it with psql: psql \"$DATABASE_URL\" -f {output_file}")
+        print("   3. Check the verification query output")
+        print(f"\n🎉 {len(all_quizzes)} quizzes ready to import!")
+        return
     print("   2. Open Supabase SQL Editor")
-    print(f"   3. Copy and paste contents of {output_file}")
+    if len(paths) > 1:
+        print(f"   3. Copy and paste the contents of each part, in order")
+    else:
+        print(f"   3. Copy and paste contents of {output_file}")
     print("   4. Run the script")
     print("   5. Check verification query at the end")
     print(f"\n🎉 {len(all_quizzes)} quizzes ready to import!")
@@ -3,23 +3,68 @@
 Generate SQL INSERT statements from a filled quiz template.
 
 Usage:
-    python scripts/generate-quiz-sql.py content/my-quiz.md
+    python scripts/generate-quiz-sql.py content/my-quiz.md [--mode statements|batch|copy] [--batch-size N]
+    python scripts/generate-quiz-sql.py content/my-quiz.md --load DSN
+    python scripts/generate-quiz-sql.py content/my-quiz.md --id-snapshot database/id-snapshot.json
+    python scripts/generate-quiz-sql.py content/ [more dirs, files or globs] [--workers N]
+        [--pattern 'quiz-*.md'] [--combined FILE] [--full]
 
 This will:
 1. Parse the quiz template
 2. Generate SQL INSERT statements
 3. Output to database/INSERT-QUIZ-[topic-code].sql
+
+--mode batch inserts the questions with multi-row INSERTs; --mode copy
+loads them with a COPY ... FROM STDIN block, which needs psql. The copy
+script creates the quiz itself, so it runs as is with psql -f.
+
+--load DSN inserts the quiz straight into the database (scripts/db_loader.py),
+so there is no QUIZ_ID_HERE to fill in. Re-running replaces the quiz's
+questions instead of creating a second quiz.
+
+--id-snapshot FILE (exported by scripts/db_loader.py) writes the topic's
+ID into the SQL instead of looking it up by code.
+
+Given directories (searched for --pattern), globs or several files, all
+templates are parsed in parallel and validated before anything is
+written, and a summary lists skipped questions and invalid files. The
+output is one INSERT-QUIZ-[topic-code].sql per topic, as for a single
+template, or with --combined FILE one script with a self-contained block
+per quiz (a DO block, or with --mode copy a COPY transaction).
+database/.quiz-sql-manifest.json records each template's hash and parsed
+quiz, so unchanged templates are not parsed or rewritten again (--full
+ignores it).
 """
 
+import os
 import re
 import sys
+import glob
 import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+from sql_writer import SqlWriter, SqlExpr, sql_literal, insert_values, copy_from_stdin
+from db_loader import ConnectionPool, load_quizzes, read_id_snapshot
+
+# Bump when parsing changes; a different version in the manifest forces
+# every template to be parsed again
+GENERATOR_VERSION = 1
+MANIFEST_NAME = '.quiz-sql-manifest.json'
+OUTPUT_DIR = Path("database")
+
+QUESTION_COLUMNS = ['quiz_id', 'position', 'question', 'options', 'correct_answer', 'explanation', 'points']
+
 
 def parse_quiz_template(file_path: Path) -> dict:
-    """Parse a filled quiz template into structured data."""
+    """Parse a filled quiz template into structured data.
+
+    Questions that cannot be used are left out and described in
+    quiz_data['warnings'].
+    """
     content = file_path.read_text()
     
     quiz_data = {
@@ -31,7 +76,8 @@ def parse_quiz_template(file_path: Path) -> dict:
         'passing_score': 70,
         'time_limit': None,
         'description': '',
-        'questions': []
+        'questions': [],
+        'warnings': []
     }
     
     # Extract topic information
@@ -92,13 +138,13 @@ def parse_quiz_template(file_path: Path) -> dict:
                 options[letter] = text.strip()
         
         if not options:
-            print(f"Warning: No options found for question {idx}")
+            quiz_data['warnings'].append(f"No options found for question {idx}")
             continue
         
         # Get correct answer
         correct_letter = correct_answer.strip().upper()
         if correct_letter not in options:
-            print(f"Warning: Correct answer '{correct_letter}' not in options for question {idx}")
+            quiz_data['warnings'].append(f"Correct answer '{correct_letter}' not in options for question {idx}")
             continue
         
         quiz_data['questions'].append({
@@ -111,8 +157,15 @@ def parse_quiz_template(file_path: Path) -> dict:
     return quiz_data
 
 
-def generate_sql(quiz_data: dict) -> str:
-    """Generate SQL INSERT statements from quiz data."""
+def generate_sql(quiz_data: dict, mode: str = 'statements', batch_size: int = 100,
+                 topic_id: str = None) -> str:
+    """Generate SQL INSERT statements from quiz data.
+
+    mode is 'statements' (one INSERT per question), 'batch' (multi-row
+    INSERTs of up to batch_size questions) or 'copy' (a self-contained psql
+    script, see generate_copy_block). topic_id (from an ID snapshot)
+    replaces the topic lookup by code.
+    """
     
     # Escape single quotes for SQL
     def escape_sql(text: str) -> str:
@@ -125,10 +178,17 @@ def generate_sql(quiz_data: dict) -> str:
         f"-- Topic: {quiz_data['topic_title']}",
         f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
         "",
+    ]
+    if mode == 'copy':
+        sql_lines.extend(generate_copy_block(quiz_data, topic_id))
+        sql_lines.extend(verification_query(quiz_data, "-- Verify the quiz was created"))
+        return '\n'.join(sql_lines)
+    
+    sql_lines.extend([
         "-- Step 1: Get the topic ID",
         f"-- Topic code: {quiz_data['topic_code']}",
         "",
-    ]
+    ])
     
     # Create quiz
     quiz_title = escape_sql(quiz_data['quiz_title'] or f"{quiz_data['topic_title']} - Quiz")
@@ -147,7 +207,7 @@ def generate_sql(quiz_data: dict) -> str:
         "  published",
         ") VALUES (",
         "  gen_random_uuid(),",
-        f"  (SELECT id FROM topics WHERE code = '{quiz_data['topic_code']}'),",
+        f"  '{topic_id}'," if topic_id else f"  (SELECT id FROM topics WHERE code = '{quiz_data['topic_code']}'),",
         f"  '{quiz_title}',",
         f"  '{quiz_desc}',",
         f"  {quiz_data['passing_score']},",
@@ -165,7 +225,18 @@ def generate_sql(quiz_data: dict) -> str:
     sql_lines.append("-- Replace 'QUIZ_ID_HERE' with the actual quiz ID from Step 2")
     sql_lines.append("")
     
-    for idx, q in enumerate(quiz_data['questions'], 1):
+    columns = QUESTION_COLUMNS
+    if mode == 'batch':
+        rows = [
+            (SqlExpr('gen_random_uuid()'), 'QUIZ_ID_HERE', idx, q['question'],
+             SqlExpr(sql_literal(json.dumps(q['options'])) + '::jsonb'), q['correct_answer'],
+             q['explanation'] or None, 1)
+            for idx, q in enumerate(quiz_data['questions'], 1)
+        ]
+        sql_lines.extend(insert_values('quiz_questions', ['id'] + columns, rows, batch_size))
+        sql_lines.append("")
+    
+    for idx, q in enumerate(quiz_data['questions'] if mode == 'statements' else [], 1):
         question_text = escape_sql(q['question'])
         options_json = json.dumps(q['options']).replace("'", "''")
         explanation = escape_sql(q['explanation']) if q['explanation'] else ''
@@ -196,8 +267,15 @@ def generate_sql(quiz_data: dict) -> str:
         ])
     
     # Verification
-    sql_lines.extend([
-        "-- Step 4: Verify the quiz was created",
+    sql_lines.extend(verification_query(quiz_data, "-- Step 4: Verify the quiz was created"))
+    
+    return '\n'.join(sql_lines)
+
+
+def verification_query(quiz_data: dict, heading: str) -> list:
+    """SQL lines listing the topic's quizzes with their question counts"""
+    return [
+        heading,
         "SELECT ",
         "  q.id,",
         "  q.title,",
@@ -208,17 +286,348 @@ def generate_sql(quiz_data: dict) -> str:
         "LEFT JOIN quiz_questions qq ON qq.quiz_id = q.id",
         f"WHERE t.code = '{quiz_data['topic_code']}'",
         "GROUP BY q.id, q.title, t.title;",
-    ])
+    ]
+
+
+def quiz_record(quiz_data: dict) -> dict:
+    """The quiz row values, as used by --load and --combined"""
+    return {
+        'topic_code': quiz_data['topic_code'],
+        'title': quiz_data['quiz_title'] or f"{quiz_data['topic_title']} - Quiz",
+        'description': quiz_data['description'] or f"Knowledge check for {quiz_data['topic_title']}",
+        'passing_score': quiz_data['passing_score'],
+        'time_limit': quiz_data['time_limit'] or None,
+        'published': True,
+        'questions': quiz_data['questions'],
+    }
+
+
+def generate_quiz_block(quiz_data: dict, batch_size: int = 1, topic_id: str = None) -> list:
+    """SQL lines for one quiz as a self-contained DO block (for --combined).
+
+    The new quiz's ID is kept in a variable instead of the QUIZ_ID_HERE
+    placeholder, so any number of quizzes can run in one script.
+    """
+    quiz = quiz_record(quiz_data)
+    if topic_id:
+        topic = sql_literal(topic_id)
+    else:
+        topic = f"(SELECT id FROM topics WHERE code = {sql_literal(quiz['topic_code'])})"
+    rows = [
+        (SqlExpr('gen_random_uuid()'), SqlExpr('v_quiz_id'), idx, q['question'],
+         SqlExpr(sql_literal(json.dumps(q['options'])) + '::jsonb'), q['correct_answer'],
+         q['explanation'] or None, 1)
+        for idx, q in enumerate(quiz['questions'], 1)
+    ]
+    return [
+        f"-- Quiz: {quiz['title']}",
+        f"-- Topic code: {quiz['topic_code']}",
+        "DO $$",
+        "DECLARE",
+        "  v_quiz_id UUID;",
+        "BEGIN",
+        "  INSERT INTO quizzes (",
+        "    id, topic_id, title, description, passing_score, time_limit_minutes, published",
+        "  ) VALUES (",
+        f"    gen_random_uuid(), {topic},",
+        f"    {sql_literal(quiz['title'])},",
+        f"    {sql_literal(quiz['description'])},",
+        f"    {sql_literal(quiz['passing_score'])}, {sql_literal(quiz['time_limit'])}, true",
+        "  ) RETURNING id INTO v_quiz_id;",
+        "",
+        *insert_values('quiz_questions', ['id'] + QUESTION_COLUMNS, rows, batch_size, indent='  '),
+        "END $$;",
+        "",
+    ]
+
+
+def generate_copy_block(quiz_data: dict, topic_id: str = None) -> list:
+    """SQL lines for one quiz as a psql script that loads its questions with COPY.
+
+    The questions are copied into a temp staging table; one statement then
+    inserts the quiz and, from its RETURNING id, the questions, inside a
+    single transaction. The script runs as is with psql -f, and nothing
+    has to be filled in by hand.
+    """
+    quiz = quiz_record(quiz_data)
+    if topic_id:
+        topic = sql_literal(topic_id)
+    else:
+        topic = f"(SELECT id FROM topics WHERE code = {sql_literal(quiz['topic_code'])})"
+    rows = [
+        (idx, q['question'], q['options'], q['correct_answer'], q['explanation'] or None, 1)
+        for idx, q in enumerate(quiz['questions'], 1)
+    ]
+    return [
+        f"-- Quiz: {quiz['title']}",
+        f"-- Topic code: {quiz['topic_code']}",
+        "-- COPY FROM STDIN needs psql: psql \"$DATABASE_URL\" -f <this file>",
+        "BEGIN;",
+        "",
+        "CREATE TEMP TABLE quiz_question_import (",
+        "  position INTEGER NOT NULL,",
+        "  question TEXT,",
+        "  options JSONB,",
+        "  correct_answer TEXT,",
+        "  explanation TEXT,",
+        "  points INTEGER",
+        ") ON COMMIT DROP;",
+        "",
+        *copy_from_stdin('quiz_question_import', QUESTION_COLUMNS[1:], rows),
+        "",
+        "WITH new_quiz AS (",
+        "  INSERT INTO quizzes (",
+        "    id, topic_id, title, description, passing_score, time_limit_minutes, published",
+        "  ) VALUES (",
+        f"    gen_random_uuid(), {topic},",
+        f"    {sql_literal(quiz['title'])},",
+        f"    {sql_literal(quiz['description'])},",
+        f"    {sql_literal(quiz['passing_score'])}, {sql_literal(quiz['time_limit'])}, true",
+        "  ) RETURNING id",
+        ")",
+        "INSERT INTO quiz_questions (",
+        "  id, quiz_id, position, question, options, correct_answer, explanation, points",
+        ")",
+        "SELECT gen_random_uuid(), new_quiz.id, q.position, q.question, q.options,",
+        "       q.correct_answer, q.explanation, q.points",
+        "FROM quiz_question_import q CROSS JOIN new_quiz",
+        "ORDER BY q.position;",
+        "",
+        "COMMIT;",
+        "",
+    ]
+
+
+def expand_inputs(inputs: list, pattern: str) -> list:
+    """Template paths for the given files, directories and globs, sorted"""
+    files = set()
+    for item in inputs:
+        if glob.has_magic(item):
+            files.update(Path(p) for p in glob.glob(item, recursive=True) if Path(p).is_file())
+        elif Path(item).is_dir():
+            files.update(Path(item).rglob(pattern))
+        else:
+            files.add(Path(item))
+    return sorted(files, key=lambda p: p.as_posix())
+
+
+def parse_template_safe(path: Path) -> tuple:
+    """parse_quiz_template for worker processes: (quiz_data, error message)"""
+    try:
+        return parse_quiz_template(path), None
+    except Exception as e:
+        return None, f"parse error: {e}"
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_manifest(manifest_path: Path) -> dict:
+    """Load the template manifest (path -> sha256, parsed quiz, output)"""
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('generator_version') != GENERATOR_VERSION:
+        return {}
+    return manifest
+
+
+def save_manifest(manifest_path: Path, options: dict, entries: dict):
+    """Atomically write the template manifest"""
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    tmp_path.write_text(json.dumps({'generator_version': GENERATOR_VERSION,
+                                    'options': options,
+                                    'files': entries},
+                                   indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(tmp_path, manifest_path)
+
+
+def run_batch(args, files: list):
+    """Parse, validate and generate SQL for many templates in one run"""
+    print(f"📖 Found {len(files)} quiz templates")
     
-    return '\n'.join(sql_lines)
+    manifest_path = OUTPUT_DIR / MANIFEST_NAME
+    manifest = {} if args.full else load_manifest(manifest_path)
+    old_entries = manifest.get('files', {})
+    snapshot_sha = file_sha256(Path(args.id_snapshot)) if args.id_snapshot else None
+    options = {'mode': args.mode, 'batch_size': args.batch_size, 'id_snapshot': snapshot_sha}
+    same_options = manifest.get('options') == options
+    
+    # Hash every template; only new or changed ones are parsed
+    hashes, invalid = {}, {}
+    for path in files:
+        try:
+            hashes[path] = file_sha256(path)
+        except OSError as e:
+            invalid[path] = f"cannot read: {e}"
+    to_parse = [path for path in hashes
+                if old_entries.get(path.as_posix(), {}).get('sha256') != hashes[path]]
+    
+    parsed = {}
+    workers = max(1, args.workers)
+    if to_parse:
+        print(f"🔎 Parsing {len(to_parse)} new or changed templates ({workers} workers)...")
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(to_parse) > 1 else None
+        try:
+            if executor:
+                results = executor.map(parse_template_safe, to_parse,
+                                       chunksize=max(1, len(to_parse) // (workers * 4)))
+            else:
+                results = map(parse_template_safe, to_parse)
+            for path, (quiz_data, error) in zip(to_parse, results):
+                if error:
+                    invalid[path] = error
+                else:
+                    parsed[path] = quiz_data
+        finally:
+            if executor:
+                executor.shutdown()
+    
+    quizzes = {}  # path -> quiz_data
+    warnings = {}
+    for path in hashes:
+        if path in invalid:
+            continue
+        quiz_data = parsed[path] if path in parsed else old_entries[path.as_posix()]['quiz']
+        if quiz_data['warnings']:
+            warnings[path] = quiz_data['warnings']
+        if not quiz_data['topic_code']:
+            invalid[path] = "no **Topic Code:**"
+        elif not quiz_data['questions']:
+            invalid[path] = "no valid questions"
+        else:
+            quizzes[path] = quiz_data
+    
+    # One quiz per topic: a second template for the same topic would overwrite the first
+    owners = {}
+    for path, quiz_data in list(quizzes.items()):
+        owner = owners.setdefault(quiz_data['topic_code'], path)
+        if owner != path:
+            invalid[path] = f"topic {quiz_data['topic_code']} is already used by {owner}"
+            del quizzes[path]
+    
+    topic_ids = {}
+    if args.id_snapshot:
+        topic_ids = read_id_snapshot(args.id_snapshot)['topics']
+        for path, quiz_data in list(quizzes.items()):
+            if quiz_data['topic_code'] not in topic_ids:
+                invalid[path] = f"topic {quiz_data['topic_code']} not in {args.id_snapshot}"
+                del quizzes[path]
+    
+    # Summary of everything that will not be imported
+    print(f"\n✅ {len(quizzes)} valid templates "
+          f"({sum(len(q['questions']) for q in quizzes.values())} questions)")
+    if warnings:
+        print(f"\n⚠️  Skipped questions in {len(warnings)} templates:")
+        for path, messages in warnings.items():
+            print(f"   {path}")
+            for message in messages:
+                print(f"     - {message}")
+    if invalid:
+        print(f"\n❌ {len(invalid)} invalid templates:")
+        for path in sorted(invalid, key=lambda p: p.as_posix()):
+            print(f"   {path}: {invalid[path]}")
+    
+    batch_size = max(1, args.batch_size)
+    # Parsed quizzes are kept for every valid template, whatever the output
+    entries = {path.as_posix(): {'sha256': hashes[path], 'quiz': quiz_data}
+               for path, quiz_data in quizzes.items()}
+    if args.load:
+        records = [quiz_record(quiz_data) for quiz_data in quizzes.values()]
+        with ConnectionPool(args.load, size=args.workers) as pool:
+            loaded, questions, missing = load_quizzes(pool, records)
+        print(f"\n✅ Loaded {loaded} quizzes ({questions} questions)")
+        if missing:
+            print(f"⚠️  Topics not found in the database: {', '.join(missing)}")
+    elif args.combined:
+        header = [
+            "-- Auto-generated quiz SQL",
+            f"-- Templates: {len(quizzes)}",
+            f"-- Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            "",
+        ]
+        codes = ', '.join(sql_literal(q['topic_code']) for q in quizzes.values())
+        with SqlWriter(args.combined, header=header) as sql:
+            for path, quiz_data in quizzes.items():
+                topic_id = topic_ids.get(quiz_data['topic_code'])
+                if args.mode == 'copy':
+                    sql.write(*generate_copy_block(quiz_data, topic_id))
+                else:
+                    sql.write(*generate_quiz_block(quiz_data, batch_size if args.mode == 'batch' else 1,
+                                                   topic_id))
+            sql.write(
+                "-- Verify the quizzes were created",
+                "SELECT t.code, q.title, COUNT(qq.id) as question_count",
+                "FROM quizzes q",
+                "JOIN topics t ON q.topic_id = t.id",
+                "LEFT JOIN quiz_questions qq ON qq.quiz_id = q.id",
+                f"WHERE t.code IN ({codes})",
+                "GROUP BY t.code, q.title",
+                "ORDER BY t.code;",
+            )
+        print(f"\n✅ Generated SQL: {args.combined}")
+    else:
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for path, quiz_data in quizzes.items():
+            output_file = OUTPUT_DIR / f"INSERT-QUIZ-{quiz_data['topic_code']}.sql"
+            old = old_entries.get(path.as_posix(), {})
+            entries[path.as_posix()]['output'] = output_file.as_posix()
+            if (path not in parsed and same_options and old.get('output') == output_file.as_posix()
+                    and output_file.exists()):
+                continue
+            output_file.write_text(generate_sql(quiz_data, args.mode, batch_size,
+                                                topic_ids.get(quiz_data['topic_code'])))
+            written += 1
+        print(f"\n✅ Wrote {written} SQL files to {OUTPUT_DIR}/ "
+              f"({len(quizzes) - written} unchanged)")
+    
+    if args.load or args.combined:
+        # Per-topic files were not touched: they stay current for unchanged templates only
+        options = manifest.get('options')
+        for path in quizzes:
+            old_output = old_entries.get(path.as_posix(), {}).get('output')
+            if old_output and path not in parsed:
+                entries[path.as_posix()]['output'] = old_output
+    save_manifest(manifest_path, options, entries)
+    
+    if invalid:
+        sys.exit(1)
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/generate-quiz-sql.py content/my-quiz.md")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Generate SQL INSERT statements from filled quiz templates")
+    parser.add_argument('inputs', nargs='+',
+                        help="Filled quiz template (e.g. content/my-quiz.md), or directories, "
+                             "globs and several files to process in one run")
+    parser.add_argument('--mode', choices=['statements', 'batch', 'copy'], default='statements',
+                        help="One INSERT per question, multi-row INSERT batches, or a psql "
+                             "COPY FROM STDIN block (default: statements)")
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help="Rows per multi-row INSERT in batch mode (default: 100)")
+    parser.add_argument('--load', metavar='DSN',
+                        help="Insert the quiz into this database instead of writing SQL "
+                             "(postgresql://... or sqlite:///file.db)")
+    parser.add_argument('--id-snapshot', metavar='FILE',
+                        help="Use the topic ID from this code -> id snapshot (see scripts/db_loader.py)")
+    parser.add_argument('--pattern', default='quiz-*.md',
+                        help="Template file pattern searched in directories (default: quiz-*.md)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Templates parsed in parallel, or connections with --load (default: 1)")
+    parser.add_argument('--combined', metavar='FILE',
+                        help="Write all quizzes into one script instead of one file per topic")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignore the manifest and parse and write every template again")
+    args = parser.parse_args()
     
-    input_file = Path(sys.argv[1])
+    if len(args.inputs) > 1 or any(glob.has_magic(item) or Path(item).is_dir() for item in args.inputs):
+        run_batch(args, expand_inputs(args.inputs, args.pattern))
+        return
+    
+    input_file = Path(args.inputs[0])
     
     if not input_file.exists():
         print(f"Error: File not found: {input_file}")
@@ -232,6 +641,9 @@ def main():
         print(f"❌ Error parsing template: {e}")
         sys.exit(1)
     
+    for warning in quiz_data['warnings']:
+        print(f"Warning: {warning}")
+    
     if not quiz_data['questions']:
         print("❌ No valid questions found in template!")
         print("   Make sure you've filled in at least one question.")
@@ -242,8 +654,25 @@ def main():
     print(f"   Questions: {len(quiz_data['questions'])}")
     print(f"   Passing Score: {quiz_data['passing_score']}%")
     
+    if args.load:
+        quiz = quiz_record(quiz_data)
+        with ConnectionPool(args.load, size=1) as pool:
+            loaded, questions, missing = load_quizzes(pool, [quiz])
+        if missing:
+            print(f"❌ Topic not found in the database: {quiz_data['topic_code']}")
+            sys.exit(1)
+        print(f"\n✅ Loaded quiz '{quiz['title']}' with {questions} questions")
+        return
+    
+    topic_id = None
+    if args.id_snapshot:
+        topic_id = read_id_snapshot(args.id_snapshot)['topics'].get(quiz_data['topic_code'])
+        if not topic_id:
+            print(f"❌ Topic {quiz_data['topic_code']} not found in {args.id_snapshot}")
+            sys.exit(1)
+    
     # Generate SQL
-    sql = generate_sql(quiz_data)
+    sql = generate_sql(quiz_data, args.mode, max(1, args.batch_size), topic_id)
     
     # Write to file
     output_file = Path(f"database/INSERT-QUIZ-{quiz_data['topic_code']}.sql")
@@ -251,6 +680,11 @@ def main():
     
     print(f"\n✅ Generated SQL: {output_file}")
     print("\n📋 Next steps:")
+    if args.mode == 'copy':
+        print(f"   1. Run it with psql: psql \"$DATABASE_URL\" -f {output_file}")
+        print("      (the Supabase SQL Editor does not support COPY FROM STDIN)")
+        print("   2. Test the quiz in your app!")
+        return
     print("   1. Open Supabase SQL Editor")
     print(f"   2. Copy and paste the contents of {output_file}")
     print("   3. Run the script")
@@ -0,0 +1,118 @@
+"""
+Content-addressed media store used by reorganize-content.py --dedup.
+
+Each source file is hashed (SHA-256, streamed in 1 MiB chunks) and
+stored once under its digest:
+
+    content/.media-store/ab/ab12...ef.mp4
+
+Topic files are then placed as links to their blob: hardlinks by default,
+so the topic tree looks the same but takes no extra space. metadata.json
+lists the blob behind each file. A recording or deck that appears under
+several chapters is stored once, and the bytes that copying every
+occurrence would have taken are reported as saved.
+
+Blobs are written through copy_engine with their own journal, so an
+interrupted run resumes. They are never modified: a changed source has a
+new digest and gets a new blob. Hashes are cached (see
+reorg_planner.HashCache), so unchanged sources are not read again.
+"""
+
+import os
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from copy_engine import copy_files, format_bytes
+from reorg_planner import HashCache
+
+
+class DedupStats:
+    """What storing a set of files once per digest saved"""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes_total = 0    # every occurrence
+        self.blobs = 0
+        self.bytes_unique = 0   # each digest once
+        self.new_blobs = 0
+        self.bytes_new = 0      # written to the store by this run
+        self.failed = []        # (source, error)
+
+    @property
+    def bytes_saved(self):
+        return self.bytes_total - self.bytes_unique
+
+    def summary_lines(self):
+        return [
+            f"   {self.files} files, {self.blobs} unique blobs ({self.new_blobs} new, {format_bytes(self.bytes_new)})",
+            f"   {format_bytes(self.bytes_total)} of files stored as {format_bytes(self.bytes_unique)}: "
+            f"{format_bytes(self.bytes_saved)} saved by deduplication",
+        ]
+
+
+class MediaStore:
+    """Files stored once under their SHA-256 digest"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.hashes = HashCache(self.root / '.hashes.json')
+        self.journal_path = self.root / '.journal.jsonl'
+
+    def blob_path(self, digest, suffix=''):
+        # The suffix is kept so the blob's type is still obvious
+        return self.root / digest[:2] / f"{digest}{suffix.lower()}"
+
+    def ingest(self, sources, workers=4, link_mode='copy', dry_run=False):
+        """Store each source under its digest.
+
+        Returns ({source: blob path}, DedupStats). link_mode 'hardlink' or
+        'reflink' creates new blobs that way from data/; anything else
+        copies them. With dry_run nothing is written and only sources whose
+        blob already exists are mapped.
+        """
+        stats = DedupStats()
+        sources = list(dict.fromkeys(Path(source) for source in sources))
+        digests = {}
+        seen = set()
+
+        def digest(source):
+            try:
+                st = source.stat()
+                return source, st.st_size, self.hashes.sha256(source, st), None
+            except OSError as e:
+                return source, 0, None, e
+
+        # hashlib releases the GIL on large updates, so threads hash in parallel
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for source, size, sha, error in executor.map(digest, sources):
+                if error is not None:
+                    stats.failed.append((source, error))
+                    continue
+                stats.files += 1
+                stats.bytes_total += size
+                blob = self.blob_path(sha, source.suffix)
+                if blob not in seen:
+                    seen.add(blob)
+                    stats.blobs += 1
+                    stats.bytes_unique += size
+                digests[source] = blob
+
+        new_blobs = {}
+        for source, blob in digests.items():
+            if blob not in new_blobs and not os.path.exists(blob):
+                new_blobs[blob] = source
+        stats.new_blobs = len(new_blobs)
+        stats.bytes_new = sum(source.stat().st_size for source in new_blobs.values())
+        if dry_run:
+            return {source: blob for source, blob in digests.items() if blob not in new_blobs}, stats
+
+        for blob in new_blobs:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+        blob_mode = link_mode if link_mode in ('hardlink', 'reflink') else 'copy'
+        copy_stats = copy_files([(source, blob) for blob, source in new_blobs.items()],
+                                self.journal_path, workers=workers, link_mode=blob_mode)
+        stats.failed.extend(copy_stats.failed)
+        failed_sources = {source for source, _ in copy_stats.failed}
+        failed = {blob for blob, source in new_blobs.items() if source in failed_sources}
+        self.hashes.save()
+        return {source: blob for source, blob in digests.items() if blob not in failed}, stats
@@ -0,0 +1,122 @@
+"""
+Parsed-deck cache shared by extract-content.py and extract-quizzes-from-ppts.py.
+
+Opening a deck with python-pptx and walking its shapes is the expensive
+part of both scripts. load_deck() stores a compact slide-level view of
+each deck, keyed by the SHA-256 of its bytes:
+
+    {"version": 1, "slides": [
+        {"title": "Lesson objectives review" | null,
+         "texts": ["<shape text>", ...],       # every shape with a text frame
+         "background": [r, g, b] | null},      # solid background fill
+        ...]}
+
+Entries are gzipped JSON under <cache_dir>/<sha[:2]>/<sha>.json.gz and are
+written atomically, so parallel workers can share one cache. A changed
+deck gets a new hash, so stale entries are never read. Delete the
+directory to reclaim space.
+
+The cache directory defaults to $PPTX_CACHE_DIR, or
+~/.cache/guidewire-guru/pptx.
+"""
+
+import os
+import io
+import json
+import gzip
+import hashlib
+import tempfile
+from pathlib import Path
+
+from pptx import Presentation
+
+# Bump when the slide representation changes; old entries are ignored
+CACHE_VERSION = 1
+
+
+def default_cache_dir():
+    """Cache directory from $PPTX_CACHE_DIR, else ~/.cache/guidewire-guru/pptx"""
+    return os.environ.get('PPTX_CACHE_DIR') or str(Path.home() / '.cache' / 'guidewire-guru' / 'pptx')
+
+
+def _slide_title(slide):
+    try:
+        title = slide.shapes.title
+    except Exception:
+        return None
+    return title.text if title is not None and hasattr(title, 'text') else None
+
+
+def _slide_background(slide):
+    try:
+        if slide.background.fill.type == 1:  # Solid fill
+            color = slide.background.fill.fore_color
+            if hasattr(color, 'rgb'):
+                return [color.rgb[0], color.rgb[1], color.rgb[2]]
+    except Exception:
+        pass
+    return None
+
+
+def parse_deck(source):
+    """Parse a deck (path or file object) into the cached slide representation"""
+    prs = Presentation(source)
+    return [
+        {
+            'title': _slide_title(slide),
+            'texts': [shape.text for shape in slide.shapes if hasattr(shape, 'text')],
+            'background': _slide_background(slide)
+        }
+        for slide in prs.slides
+    ]
+
+
+def _entry_path(cache_dir, digest):
+    return os.path.join(cache_dir, digest[:2], f"{digest}.json.gz")
+
+
+def _read_entry(path):
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError, EOFError):
+        return None  # missing or torn entry: re-parse
+    return entry['slides'] if entry.get('version') == CACHE_VERSION else None
+
+
+def _write_entry(path, slides):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.', suffix='.tmp')
+    try:
+        with gzip.open(os.fdopen(fd, 'wb'), 'wt', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'slides': slides}, f, ensure_ascii=False,
+                      separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_deck(file_path, data=None, cache_dir=None):
+    """Return (sha256, slides) for a deck, parsing it only on a cache miss.
+
+    `data` is the deck's bytes if the caller already has them. With
+    cache_dir=None the deck is parsed without touching the cache.
+    """
+    if data is None:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if cache_dir is None:
+        return digest, parse_deck(io.BytesIO(data))
+
+    path = _entry_path(cache_dir, digest)
+    slides = _read_entry(path)
+    if slides is None:
+        slides = parse_deck(io.BytesIO(data))
+        try:
+            _write_entry(path, slides)
+        except OSError:
+            pass  # a read-only or full cache must not fail the extraction
+    return digest, slides
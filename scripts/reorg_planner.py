@@ -0,0 +1,261 @@
+"""
+Incremental plan for reorganize-content.py --execute.
+
+plan_changes() compares the file mappings of a freshly computed structure
+with what is already in content/ and returns the Changeset that brings
+content/ up to date:
+- adds      destinations that do not exist yet
+- updates   destinations that no longer match their source
+- renames   placed files whose destination moved (a topic was renumbered
+            or renamed); they are moved with os.replace() instead of being
+            copied again
+- deletes   files an earlier run placed that no mapping produces any more
+- topics whose metadata.json is new or different, and topic folders that
+  are gone
+apply_changes() applies only that changeset.
+
+Only files recorded in the copy journal count as placed, so files in
+content/ that the reorganizer did not create, such as the quiz templates,
+are never deleted.
+
+A destination matches its source when copy_engine.is_up_to_date() says so:
+same size and mtime, or the right link for hardlink/symlink modes. With
+use_hash, copies whose size and mtime match are also compared by SHA-256.
+Renames are then matched by content, so a file renamed in data/ is moved
+instead of copied. Hashes are cached in content/.reorganize-hashes.json by
+path, size, mtime, ctime and inode. ctime cannot be set back like mtime,
+so a rewrite that restores the mtime is still hashed again.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+from copy_engine import CopyJournal, copy_files, is_up_to_date
+from dir_scan import DirNode
+
+METADATA_FILE = 'metadata.json'
+HASH_CHUNK = 1024 * 1024
+
+
+def metadata_text(metadata):
+    """metadata.json contents, as execute_reorganization() writes them"""
+    return json.dumps(metadata, indent=2, ensure_ascii=False)
+
+
+class HashCache:
+    """SHA-256 of files, reused while their stat signature is unchanged"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.hashes = {}
+        self._used = set()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.hashes = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def sha256(self, path, st=None):
+        st = st or os.stat(path)
+        signature = [st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino]
+        self._used.add(str(path))
+        cached = self.hashes.get(str(path))
+        if cached and cached[:-1] == signature:
+            return cached[-1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while chunk := f.read(HASH_CHUNK):
+                digest.update(chunk)
+        self.hashes[str(path)] = signature + [digest.hexdigest()]
+        return digest.hexdigest()
+
+    def save(self):
+        """Write the hashes used since loading; files no longer compared drop out"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({path: self.hashes[path] for path in self._used}, f, sort_keys=True)
+
+
+class Changeset:
+    """The minimal set of changes that brings content/ up to date"""
+
+    def __init__(self):
+        self.adds = []              # (source, dest)
+        self.updates = []           # (source, dest)
+        self.renames = []           # (old_dest, new_dest, source)
+        self.deletes = []           # dest
+        self.metadata_writes = []   # (topic_dir, metadata)
+        self.removed_topics = []    # (topic_dir, topic_id)
+        self.unchanged = 0
+
+    def is_empty(self):
+        return not (self.adds or self.updates or self.renames or self.deletes
+                    or self.metadata_writes or self.removed_topics)
+
+    def changed_topic_ids(self):
+        """IDs of topics whose database row changes (metadata is what the SQL is built from)"""
+        return {metadata['id'] for _, metadata in self.metadata_writes}
+
+    def print_summary(self, verbose=False):
+        print(f"   Files to add:     {len(self.adds)}")
+        print(f"   Files to update:  {len(self.updates)}")
+        print(f"   Files to rename:  {len(self.renames)}")
+        print(f"   Files to delete:  {len(self.deletes)}")
+        print(f"   Files unchanged:  {self.unchanged}")
+        print(f"   Topics to write:  {len(self.metadata_writes)}")
+        print(f"   Topics removed:   {len(self.removed_topics)}")
+        if verbose:
+            for source, dest in self.adds:
+                print(f"    + {dest}")
+            for source, dest in self.updates:
+                print(f"    ~ {dest}")
+            for old_dest, new_dest, source in self.renames:
+                print(f"    → {old_dest} -> {new_dest}")
+            for dest in self.deletes:
+                print(f"    - {dest}")
+            for topic_dir, topic_id in self.removed_topics:
+                print(f"    - {topic_dir} ({topic_id})")
+
+
+def _existing_topic_dirs(content_dir):
+    """content/<product>/<module>/<topic> folders holding a metadata.json"""
+    root = DirNode(content_dir)
+    if not root.path.is_dir():
+        return []
+    return [topic.path
+            for product in root.subdirs()
+            for module in product.subdirs()
+            for topic in module.subdirs()
+            if any(entry.name == METADATA_FILE for entry in topic.file_entries())]
+
+
+def _read_topic_id(topic_dir):
+    try:
+        with open(topic_dir / METADATA_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('id')
+    except (OSError, ValueError):
+        return None
+
+
+def _is_regular_copy(src_stat, dest):
+    dest_stat = os.lstat(dest)
+    return not os.path.islink(dest) and not os.path.samestat(src_stat, dest_stat)
+
+
+def plan_changes(mappings, topic_metadata, content_dir, journal_path, link_mode='copy',
+                 use_hash=False, hashes=None):
+    """Work out the Changeset for (source, dest) mappings and {topic_dir: metadata}.
+
+    hashes is the HashCache to use with use_hash (one in content_dir by default).
+    """
+    content_dir = Path(content_dir)
+    journal = CopyJournal(journal_path)
+    if use_hash and hashes is None:
+        hashes = HashCache(content_dir / '.reorganize-hashes.json')
+    changes = Changeset()
+
+    wanted = {}
+    for source, dest in mappings:
+        wanted[str(dest)] = (Path(source), Path(dest))
+
+    adds = []
+    for source, dest in wanted.values():
+        if not os.path.lexists(dest):
+            adds.append((source, dest))
+            continue
+        src_stat = source.stat()
+        if not is_up_to_date(source, dest, src_stat, journal, link_mode):
+            changes.updates.append((source, dest))
+        elif (use_hash and _is_regular_copy(src_stat, dest)
+              and hashes.sha256(source, src_stat) != hashes.sha256(dest)):
+            changes.updates.append((source, dest))
+        else:
+            changes.unchanged += 1
+
+    # Placed files no mapping produces any more: deleted, or moved to a new dest
+    stale = [Path(dest) for dest in journal.entries
+             if dest not in wanted and os.path.lexists(dest)]
+    movable = {}
+    if link_mode != 'symlink':  # relative symlinks are cheaper to recreate than to fix up
+        for old_dest in stale:
+            entry = journal.entries[str(old_dest)]
+            if use_hash:
+                if not os.path.islink(old_dest):
+                    movable.setdefault(hashes.sha256(old_dest), old_dest)
+            else:
+                movable.setdefault(entry['source'], old_dest)
+    for source, dest in adds:
+        if use_hash:
+            old_dest = movable.pop(hashes.sha256(source), None)
+        else:
+            old_dest = movable.pop(str(source), None)
+            if old_dest is not None and not is_up_to_date(source, old_dest, source.stat(),
+                                                          journal, link_mode):
+                old_dest = None  # the source changed since it was placed: copy it
+        if old_dest is not None:
+            changes.renames.append((old_dest, dest, source))
+        else:
+            changes.adds.append((source, dest))
+    moved = {str(old_dest) for old_dest, _, _ in changes.renames}
+    changes.deletes = [dest for dest in stale if str(dest) not in moved]
+
+    for topic_dir, metadata in topic_metadata.items():
+        try:
+            current = (Path(topic_dir) / METADATA_FILE).read_text(encoding='utf-8')
+        except OSError:
+            current = None
+        if current != metadata_text(metadata):
+            changes.metadata_writes.append((Path(topic_dir), metadata))
+    wanted_topics = {str(topic_dir) for topic_dir in topic_metadata}
+    changes.removed_topics = [(topic_dir, _read_topic_id(topic_dir))
+                              for topic_dir in _existing_topic_dirs(content_dir)
+                              if str(topic_dir) not in wanted_topics]
+    if hashes is not None:
+        hashes.save()
+    return changes
+
+
+def _prune_empty_dirs(paths, content_dir):
+    """Remove directories left empty, bottom-up, stopping at content_dir"""
+    content_dir = Path(content_dir).resolve()
+    for path in sorted(set(paths), key=lambda p: len(p.parts), reverse=True):
+        while path.resolve() != content_dir and content_dir in path.resolve().parents:
+            try:
+                path.rmdir()
+            except OSError:
+                break  # not empty (or already gone)
+            path = path.parent
+
+
+def apply_changes(changes, content_dir, journal_path, copy_workers=4, link_mode='copy'):
+    """Apply a Changeset; returns the CopyStats of the copies"""
+    journal = CopyJournal(journal_path)
+    vacated = []
+    for old_dest, new_dest, source in changes.renames:
+        new_dest.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(old_dest, new_dest)
+        journal.move(old_dest, new_dest, source)
+        vacated.append(old_dest.parent)
+    for dest in changes.deletes:
+        os.unlink(dest)
+        journal.forget(dest)
+        vacated.append(dest.parent)
+    journal.open()  # persist the renames and deletes before copying
+    journal.close()
+
+    mappings = changes.adds + changes.updates
+    for source, dest in mappings:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+    stats = copy_files(mappings, journal_path, workers=copy_workers, link_mode=link_mode, force=True)
+
+    for topic_dir, metadata in changes.metadata_writes:
+        topic_dir.mkdir(parents=True, exist_ok=True)
+        with open(topic_dir / METADATA_FILE, 'w', encoding='utf-8') as f:
+            f.write(metadata_text(metadata))
+    for topic_dir, topic_id in changes.removed_topics:
+        (topic_dir / METADATA_FILE).unlink()
+        vacated.append(topic_dir)
+    _prune_empty_dirs(vacated, content_dir)
+    return stats
@@ -6,15 +6,26 @@ Converts current data/ structure to clean product/module/topic hierarchy
 
 import os
 import json
-import shutil
+import time
 from pathlib import Path
 from typing import Dict, List, Tuple
 import re
 
+from copy_engine import LINK_MODES, copy_files, format_bytes
+from dir_scan import DirNode
+from media_store import MediaStore
+from reorg_planner import apply_changes, plan_changes
+from sql_writer import SqlWriter
+from db_loader import ConnectionPool, load_topics, read_id_snapshot
+
 # Base paths
 CURRENT_DATA_DIR = Path("data")
 NEW_CONTENT_DIR = Path("content")
 BACKUP_DIR = Path("content-backup")
+# Completed copies, so an interrupted --execute resumes where it stopped
+COPY_JOURNAL = NEW_CONTENT_DIR / ".reorganize-journal.jsonl"
+# Content-addressed copies of every source file, for --dedup
+MEDIA_STORE_DIR = NEW_CONTENT_DIR / ".media-store"
 
 # Product and module mapping
 CHAPTER_TO_PRODUCT = {
@@ -58,11 +69,11 @@ def get_topic_title_from_pptx(filepath: Path) -> str:
     # Title case
     return name.title()
 
-def drill_down_nested_folders(folder: Path) -> Path:
+def drill_down_nested_folders(folder: DirNode) -> DirNode:
     """Recursively drill down nested single-subfolder structures"""
     # Get all non-hidden subfolders and files
-    subfolders = [f for f in folder.iterdir() if f.is_dir() and not f.name.startswith('.')]
-    files = [f for f in folder.iterdir() if f.is_file() and not f.name.startswith('.')]
+    subfolders = folder.subdirs()
+    files = folder.files()
     
     # If there's exactly one subfolder and no files (or files are all lesson folders)
     if len(subfolders) == 1 and len(files) == 0:
@@ -76,13 +87,14 @@ def drill_down_nested_folders(folder: Path) -> Path:
         return folder
 
 def scan_current_structure() -> Dict:
-    """Scan current data/ directory and build file map"""
+    """Scan current data/ directory and build file map.
+
+    Each directory is listed once (see scripts/dir_scan.py), however many
+    times the checks below look at it.
+    """
     structure = {}
     
-    for chapter_dir in CURRENT_DATA_DIR.iterdir():
-        if not chapter_dir.is_dir() or chapter_dir.name.startswith('.'):
-            continue
-            
+    for chapter_dir in DirNode(CURRENT_DATA_DIR).subdirs():
         chapter_name = chapter_dir.name
         if chapter_name not in CHAPTER_TO_PRODUCT:
             print(f"⚠️  Unknown chapter: {chapter_name}")
@@ -96,17 +108,14 @@ def scan_current_structure() -> Dict:
             structure[product][module] = []
         
         # Check if chapter has lesson subfolders or files directly
-        has_subfolders = any(item.is_dir() and not item.name.startswith('.') for item in chapter_dir.iterdir())
+        has_subfolders = bool(chapter_dir.subdirs())
         
         if has_subfolders:
             # Scan for lesson folders
-            lesson_folders = []
-            for item in chapter_dir.iterdir():
-                if item.is_dir() and not item.name.startswith('.'):
-                    lesson_folders.append(item)
+            lesson_folders = chapter_dir.subdirs()
             
             # Sort lesson folders
-            lesson_folders.sort()
+            lesson_folders.sort(key=lambda node: node.path)
             
             # Process lesson folders
             for lesson_dir in lesson_folders:
@@ -114,7 +123,7 @@ def scan_current_structure() -> Dict:
                 actual_lesson_dir = drill_down_nested_folders(lesson_dir)
                 
                 # Check if the drilled-down folder itself has lesson subfolders
-                sub_lessons = [f for f in actual_lesson_dir.iterdir() if f.is_dir() and not f.name.startswith('.')]
+                sub_lessons = actual_lesson_dir.subdirs()
                 if sub_lessons:
                     # It has subfolders - process each as a lesson
                     for sub_lesson in sub_lessons:
@@ -128,7 +137,7 @@ def scan_current_structure() -> Dict:
     
     return structure
 
-def process_lesson_folder(lesson_dir: Path, product: str, module: str, structure: Dict):
+def process_lesson_folder(lesson_dir: DirNode, product: str, module: str, structure: Dict):
     """Process a single lesson folder and add to structure"""
     if product not in structure:
         structure[product] = {}
@@ -142,10 +151,7 @@ def process_lesson_folder(lesson_dir: Path, product: str, module: str, structure
         'other': []
     }
     
-    for file in lesson_dir.iterdir():
-        if file.name.startswith('.') or not file.is_file():
-            continue
-            
+    for file in lesson_dir.files():
         ext = file.suffix.lower()
         if ext in ['.pptx', '.pdf'] and 'assignment' not in file.name.lower():
             files['slides'].append(file)
@@ -163,7 +169,7 @@ def process_lesson_folder(lesson_dir: Path, product: str, module: str, structure
     # Only add if there are actually files
     if files['slides'] or files['demos'] or files['assignments'] or files['other']:
         topic_data = {
-            'original_path': lesson_dir,
+            'original_path': lesson_dir.path,
             'original_name': lesson_dir.name,
             'clean_name': clean_topic_name(lesson_dir.name),
             'files': files,
@@ -281,6 +287,9 @@ def generate_metadata(topic: Dict) -> Dict:
         'files': files_dict,
         'keywords': [word.lower() for word in topic['title'].split() if len(word) > 3]
     }
+    if topic.get('blobs'):
+        # File name -> shared blob in the media store, relative to content/
+        metadata['blobs'] = topic['blobs']
     
     return metadata
 
@@ -317,8 +326,15 @@ def print_dry_run_report(new_structure: Dict):
     print(f"  Products:     {len(new_structure)}")
     print("="*80 + "\n")
 
-def execute_reorganization(new_structure: Dict, dry_run: bool = True):
-    """Execute the actual file reorganization"""
+def execute_reorganization(new_structure: Dict, dry_run: bool = True, copy_workers: int = 4,
+                           link_mode: str = 'copy'):
+    """Execute the actual file reorganization.
+
+    Files are copied in parallel (copy_workers threads); copies already
+    done by an earlier, interrupted run are skipped. link_mode 'hardlink',
+    'reflink' or 'symlink' places files without duplicating their data
+    (see copy_engine.py); a link that cannot be made falls back to a copy.
+    """
     if dry_run:
         print_dry_run_report(new_structure)
         return
@@ -328,7 +344,17 @@ def execute_reorganization(new_structure: Dict, dry_run: bool = True):
     # Create base directories
     NEW_CONTENT_DIR.mkdir(exist_ok=True)
     
-    files_moved = 0
+    mappings = []
+    for product, modules in new_structure.items():
+        for module, topics in modules.items():
+            for topic in topics:
+                topic['new_path'].mkdir(parents=True, exist_ok=True)
+                mappings.extend((source, dest) for file_type, source, dest in topic['file_mappings'])
+    
+    print(f"📋 Placing {len(mappings)} files ({link_mode}) with {copy_workers} threads...")
+    stats = copy_files(mappings, COPY_JOURNAL, workers=copy_workers, link_mode=link_mode)
+    _print_copy_stats(stats)
+    
     metadata_created = 0
     
     for product, modules in new_structure.items():
@@ -338,17 +364,6 @@ def execute_reorganization(new_structure: Dict, dry_run: bool = True):
             print(f"  📁 {module}")
             
             for topic in topics:
-                # Create topic directory
-                topic['new_path'].mkdir(parents=True, exist_ok=True)
-                
-                # Copy files
-                for file_type, source, dest in topic['file_mappings']:
-                    try:
-                        shutil.copy2(source, dest)
-                        files_moved += 1
-                    except Exception as e:
-                        print(f"    ⚠️  Error copying {source.name}: {e}")
-                
                 # Generate and save metadata
                 metadata = generate_metadata(topic)
                 metadata_file = topic['new_path'] / 'metadata.json'
@@ -359,17 +374,121 @@ def execute_reorganization(new_structure: Dict, dry_run: bool = True):
                 print(f"    ✅ {topic['position']:03d}. {topic['title']}")
     
     print(f"\n✨ Reorganization complete!")
-    print(f"   Files moved: {files_moved}")
+    print(f"   Files {'copied' if link_mode == 'copy' else 'placed'}: {stats.copied}")
+    print(f"   Files already up to date: {stats.skipped}")
+    if stats.failed:
+        print(f"   Files failed: {len(stats.failed)} (re-run to retry)")
     print(f"   Metadata files created: {metadata_created}")
 
-def generate_import_sql(new_structure: Dict, output_file: str = "import-topics.sql"):
-    """Generate SQL import script for database"""
-    sql_lines = [
+def deduplicate_structure(new_structure: Dict, copy_workers: int = 4, link_mode: str = 'copy',
+                          dry_run: bool = False) -> str:
+    """Store every source file once in the media store and place topics from there.
+
+    Rewrites each topic's file_mappings to copy from the blob instead of
+    data/, and records the blobs for metadata.json. Returns the link mode
+    to place topic files with: a copy of a blob would duplicate it again,
+    so copy becomes hardlink.
+    """
+    store = MediaStore(MEDIA_STORE_DIR)
+    sources = [source
+               for modules in new_structure.values()
+               for topics in modules.values()
+               for topic in topics
+               for file_type, source, dest in topic['file_mappings']]
+    print(f"\n🧮 Hashing {len(sources)} files into {MEDIA_STORE_DIR}/...")
+    blobs, stats = store.ingest(sources, workers=copy_workers, link_mode=link_mode, dry_run=dry_run)
+    for source, error in stats.failed:
+        print(f"    ⚠️  Error storing {source.name}: {error} (placed from {CURRENT_DATA_DIR}/ instead)")
+    for line in stats.summary_lines():
+        print(line)
+    
+    for modules in new_structure.values():
+        for topics in modules.values():
+            for topic in topics:
+                topic['file_mappings'] = [(file_type, blobs.get(source, source), dest)
+                                          for file_type, source, dest in topic['file_mappings']]
+                topic['blobs'] = {dest.name: source.relative_to(NEW_CONTENT_DIR).as_posix()
+                                  for file_type, source, dest in topic['file_mappings']
+                                  if MEDIA_STORE_DIR in source.parents}
+    return 'hardlink' if link_mode == 'copy' else link_mode
+
+def _print_copy_stats(stats):
+    for source, error in stats.failed:
+        print(f"    ⚠️  Error copying {source.name}: {error}")
+    elapsed = time.monotonic() - stats.started
+    print(f"   {format_bytes(stats.bytes_copied)} in {elapsed:.1f}s ({format_bytes(stats.rate())}/s)")
+    if stats.methods:
+        print("   Methods: " + ", ".join(f"{method} {count}" for method, count in stats.methods.most_common()))
+    for fallback, count in stats.fallbacks.most_common():
+        print(f"   ↪️  {fallback} unsupported, fell back for {count} files")
+
+def reorganize_incrementally(new_structure: Dict, copy_workers: int = 4, link_mode: str = 'copy',
+                             use_hash: bool = False, apply: bool = True) -> set:
+    """Apply only what changed since the last run (see reorg_planner.py).
+
+    Compares the file mappings and metadata with content/, then adds,
+    updates, renames and deletes just those files and rewrites just the
+    metadata.json files that differ. Returns the IDs of the topics whose
+    metadata changed, for the SQL import script. With apply=False only
+    prints the plan.
+    """
+    mappings = []
+    topic_metadata = {}
+    for product, modules in new_structure.items():
+        for module, topics in modules.items():
+            for topic in topics:
+                mappings.extend((source, dest) for file_type, source, dest in topic['file_mappings'])
+                topic_metadata[topic['new_path']] = generate_metadata(topic)
+    
+    print(f"\n🔎 Comparing {len(mappings)} files with {NEW_CONTENT_DIR}/{' (hashing)' if use_hash else ''}...")
+    changes = plan_changes(mappings, topic_metadata, NEW_CONTENT_DIR, COPY_JOURNAL,
+                           link_mode=link_mode, use_hash=use_hash)
+    changes.print_summary(verbose=not apply)
+    if not apply:
+        return changes.changed_topic_ids()
+    if changes.is_empty():
+        print("\n✨ Content is already up to date")
+        return set()
+    
+    stats = apply_changes(changes, NEW_CONTENT_DIR, COPY_JOURNAL, copy_workers=copy_workers,
+                          link_mode=link_mode)
+    _print_copy_stats(stats)
+    
+    current_ids = {metadata['id'] for metadata in topic_metadata.values()}
+    gone = sorted(topic_id for _, topic_id in changes.removed_topics if topic_id and topic_id not in current_ids)
+    print(f"\n✨ Incremental reorganization complete!")
+    print(f"   Files {'copied' if link_mode == 'copy' else 'placed'}: {stats.copied}")
+    print(f"   Files renamed: {len(changes.renames)}, deleted: {len(changes.deletes)}")
+    if stats.failed:
+        print(f"   Files failed: {len(stats.failed)} (re-run to retry)")
+    print(f"   Metadata files written: {len(changes.metadata_writes)}")
+    if gone:
+        print(f"⚠️  Topics no longer in {CURRENT_DATA_DIR}/ (still in the database): {', '.join(gone)}")
+    return changes.changed_topic_ids()
+
+def generate_import_sql(new_structure: Dict, output_file: str = "import-topics.sql",
+                        max_bytes: int = None, product_ids: Dict = None, topic_ids: set = None):
+    """Generate SQL import script for database.
+
+    Statements are streamed to disk; with max_bytes the script is split
+    into numbered parts that each fit in the Supabase SQL editor. With
+    product_ids (code -> id, from an ID snapshot) products are not looked
+    up by code in every statement. With topic_ids only those topics are
+    written.
+    """
+    header = [
         "-- Auto-generated topic import script",
         "-- Run this in Supabase SQL Editor after reorganization\n",
         "-- Insert topics with content\n"
     ]
+    with SqlWriter(output_file, max_bytes=max_bytes, header=header) as sql_file:
+        _write_topic_inserts(new_structure, sql_file, product_ids, topic_ids)
     
+    for path in sql_file.paths:
+        print(f"\n📄 SQL import script generated: {path}")
+
+def _iter_topic_metadata(new_structure: Dict):
+    """Yield (product_code, metadata) for every topic"""
     for product, modules in new_structure.items():
         product_code = {
             'policycenter': 'PC',
@@ -380,12 +499,49 @@ def generate_import_sql(new_structure: Dict, output_file: str = "import-topics.s
         
         for module, topics in modules.items():
             for topic in topics:
-                metadata = generate_metadata(topic)
-                
-                # Build content JSONB
-                content_json = json.dumps(metadata['files'])
-                
-                sql = f"""
+                yield product_code, generate_metadata(topic)
+
+def load_topics_to_database(new_structure: Dict, dsn: str, pool_size: int = 4):
+    """Upsert topics straight into the database (same values as the SQL script)"""
+    topics = [
+        {
+            'id': metadata['id'],
+            'product_code': product_code,
+            'position': metadata['position'],
+            'title': metadata['title'],
+            'description': metadata['description'],
+            'duration_minutes': metadata['duration_minutes'],
+            'content': metadata['files'],
+        }
+        for product_code, metadata in _iter_topic_metadata(new_structure)
+    ]
+    print(f"\n🗄️  Loading {len(topics)} topics into the database...")
+    with ConnectionPool(dsn, size=pool_size) as pool:
+        loaded, missing = load_topics(pool, topics)
+    
+    print(f"✅ Loaded {loaded} topics")
+    if missing:
+        print(f"⚠️  Skipped topics for {len(missing)} product codes not in the database: {', '.join(missing)}")
+
+def _write_topic_inserts(new_structure: Dict, sql_file: SqlWriter, product_ids: Dict = None,
+                         topic_ids: set = None):
+    """Write one upsert per topic"""
+    skipped = set()
+    for product_code, metadata in _iter_topic_metadata(new_structure):
+        if topic_ids is not None and metadata['id'] not in topic_ids:
+            continue
+        if product_ids is not None and product_code not in product_ids:
+            skipped.add(product_code)
+            continue
+        if product_ids is not None:
+            product_id = f"'{product_ids[product_code]}'"
+        else:
+            product_id = f"(SELECT id FROM products WHERE code = '{product_code}')"
+        
+        # Build content JSONB
+        content_json = json.dumps(metadata['files'])
+        
+        sql = f"""
 INSERT INTO topics (
   id,
   product_id,
@@ -398,7 +554,7 @@ INSERT INTO topics (
   published
 ) VALUES (
   '{metadata['id']}',
-  (SELECT id FROM products WHERE code = '{product_code}'),
+  {product_id},
   {metadata['position']},
   '{metadata['title'].replace("'", "''")}',
   '{metadata['description'].replace("'", "''")}',
@@ -412,13 +568,10 @@ INSERT INTO topics (
   duration_minutes = EXCLUDED.duration_minutes,
   content = EXCLUDED.content;
 """
-                sql_lines.append(sql)
+        sql_file.write(sql)
     
-    # Write to file
-    with open(output_file, 'w') as f:
-        f.write('\n'.join(sql_lines))
-    
-    print(f"\n📄 SQL import script generated: {output_file}")
+    if skipped:
+        print(f"⚠️  Skipped topics for product codes not in the ID snapshot: {', '.join(sorted(skipped))}")
 
 def main():
     print("🔍 Scanning current content structure...")
@@ -444,36 +597,91 @@ def main():
     
     print("\n" + "="*80)
     print("To execute the reorganization:")
-    print("  python scripts/reorganize-content.py --execute")
+    print("  python scripts/reorganize-content.py --execute [--copy-workers 4] [--link-mode copy] [--hash] [--dedup]")
+    print("  (--link-mode hardlink|reflink|symlink places files without duplicating them)")
+    print("  (only what changed since the last run is applied; --full redoes everything)")
+    print("  (--dedup stores each distinct file once and links topics to it)")
+    print("\nTo see what --execute would change:")
+    print("  python scripts/reorganize-content.py --plan [--hash] [--dedup]")
     print("\nTo generate SQL import script:")
-    print("  python scripts/reorganize-content.py --sql")
+    print("  python scripts/reorganize-content.py --sql [--split-kb 900] [--id-snapshot FILE]")
+    print("\nTo load topics straight into the database instead:")
+    print("  python scripts/reorganize-content.py --sql --load postgresql://...")
     print("="*80 + "\n")
 
 if __name__ == "__main__":
     import sys
     
+    # --split-kb N: rotate the SQL import script into parts of at most N KB
+    split_kb = int(sys.argv[sys.argv.index('--split-kb') + 1]) if '--split-kb' in sys.argv else 0
+    # --load DSN: upsert topics into the database instead of writing SQL
+    load_dsn = sys.argv[sys.argv.index('--load') + 1] if '--load' in sys.argv else None
+    # --copy-workers N: parallel copies (1-2 for a spinning disk, 8-16 for SSD/network storage)
+    copy_workers = int(sys.argv[sys.argv.index('--copy-workers') + 1]) if '--copy-workers' in sys.argv else 4
+    # --link-mode MODE: copy (default), hardlink, reflink or symlink
+    link_mode = sys.argv[sys.argv.index('--link-mode') + 1] if '--link-mode' in sys.argv else 'copy'
+    if link_mode not in LINK_MODES:
+        print(f"❌ Unknown --link-mode {link_mode!r} (choose from {', '.join(LINK_MODES)})")
+        sys.exit(1)
+    # --full: copy every file and rewrite every metadata.json and topic, instead
+    # of only what changed since the last run
+    full = '--full' in sys.argv
+    # --hash: also compare file contents (SHA-256), not just size and mtime
+    use_hash = '--hash' in sys.argv
+    # --dedup: place files from a content-addressed store, one copy per distinct file
+    dedup = '--dedup' in sys.argv
+    # --id-snapshot FILE: write product IDs from a snapshot (scripts/db_loader.py)
+    # instead of looking each product up by code
+    product_ids = None
+    if '--id-snapshot' in sys.argv:
+        product_ids = read_id_snapshot(sys.argv[sys.argv.index('--id-snapshot') + 1])['products']
+    
+    def run_execute():
+        structure = scan_current_structure()
+        new_structure = generate_new_structure(structure)
+        place_mode = link_mode
+        if dedup:
+            place_mode = deduplicate_structure(new_structure, copy_workers=copy_workers, link_mode=link_mode)
+        if full:
+            execute_reorganization(new_structure, dry_run=False, copy_workers=copy_workers,
+                                   link_mode=place_mode)
+            generate_import_sql(new_structure, max_bytes=split_kb * 1024, product_ids=product_ids)
+            return
+        topic_ids = reorganize_incrementally(new_structure, copy_workers=copy_workers,
+                                             link_mode=place_mode, use_hash=use_hash)
+        if topic_ids:
+            print(f"\n🗄️  SQL for the {len(topic_ids)} changed topics (--sql writes all of them)")
+            generate_import_sql(new_structure, max_bytes=split_kb * 1024, product_ids=product_ids,
+                                topic_ids=topic_ids)
+        else:
+            print("\n📄 No topic changes, SQL import script not regenerated")
+    
     if '--execute' in sys.argv:
         # Check if --yes flag is provided to skip confirmation
         if '--yes' in sys.argv:
             print("\n⚠️  Executing reorganization (--yes flag provided)...")
-            structure = scan_current_structure()
-            new_structure = generate_new_structure(structure)
-            execute_reorganization(new_structure, dry_run=False)
-            generate_import_sql(new_structure)
+            run_execute()
         else:
             print("\n⚠️  WARNING: This will reorganize all content files!")
             response = input("Are you sure? Type 'yes' to continue: ")
             if response.lower() == 'yes':
-                structure = scan_current_structure()
-                new_structure = generate_new_structure(structure)
-                execute_reorganization(new_structure, dry_run=False)
-                generate_import_sql(new_structure)
+                run_execute()
             else:
                 print("Cancelled.")
+    elif '--plan' in sys.argv:
+        structure = scan_current_structure()
+        new_structure = generate_new_structure(structure)
+        place_mode = link_mode
+        if dedup:
+            place_mode = deduplicate_structure(new_structure, link_mode=link_mode, dry_run=True)
+        reorganize_incrementally(new_structure, link_mode=place_mode, use_hash=use_hash, apply=False)
     elif '--sql' in sys.argv:
         structure = scan_current_structure()
         new_structure = generate_new_structure(structure)
-        generate_import_sql(new_structure)
+        if load_dsn:
+            load_topics_to_database(new_structure, load_dsn)
+        else:
+            generate_import_sql(new_structure, max_bytes=split_kb * 1024, product_ids=product_ids)
     else:
         main()
 
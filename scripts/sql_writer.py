@@ -0,0 +1,166 @@
+"""
+Streaming SQL file writer shared by the SQL-generating scripts
+(extract-quizzes-from-ppts.py, reorganize-content.py).
+
+Statements are written to disk as they are generated instead of being
+collected into one list and joined at the end. The output is exactly
+'\\n'.join(all chunks), as the scripts produced before.
+
+With max_bytes set, output rotates into numbered parts (import-001.sql,
+import-002.sql, ...) no larger than max_bytes, so each one can be pasted
+into the Supabase SQL editor. A statement group is never split across
+parts. Every part repeats the header, so each file can be run on its own,
+in order. If everything fits in one part, it is written to the plain path.
+
+insert_values() and copy_from_stdin() render rows as multi-row INSERT
+batches or as a psql COPY ... FROM STDIN CSV block (also used by
+generate-quiz-sql.py).
+"""
+
+import os
+import re
+import json
+from pathlib import Path
+
+
+class SqlWriter:
+    """Write SQL chunk by chunk, optionally rotating into size-capped parts.
+
+    Usage:
+        with SqlWriter("database/out.sql", max_bytes=900 * 1024, header=[...]) as sql:
+            for statement in statements:
+                sql.write(*statement_lines)
+        print(sql.paths)
+    """
+
+    def __init__(self, path, max_bytes=None, header=()):
+        self.path = Path(path)
+        self.max_bytes = max_bytes or None
+        self.header = list(header)
+        self.paths = []
+        self._fh = None
+        self._size = 0
+        self._started = False
+        self._has_body = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _part_path(self, number):
+        return self.path.with_name(f"{self.path.stem}-{number:03d}{self.path.suffix}")
+
+    def _open(self):
+        if self._fh is not None:
+            self._fh.close()
+        path = self._part_path(len(self.paths) + 1) if self.max_bytes else self.path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(path, 'w', encoding='utf-8', newline='')
+        self.paths.append(path)
+        self._size = 0
+        self._started = False
+        self._has_body = False
+        header = self.header + ([f"-- Part {len(self.paths)}", ""] if self.max_bytes else [])
+        for chunk in header:
+            self._emit(chunk)
+
+    def _emit(self, chunk):
+        data = '\n' + chunk if self._started else chunk
+        self._started = True
+        self._fh.write(data)
+        self._size += len(data.encode('utf-8'))
+
+    def write(self, *chunks):
+        """Write one statement group (kept together in a single part)"""
+        if self._fh is None:
+            self._open()
+        elif self.max_bytes and self._has_body:
+            group_size = sum(len(chunk.encode('utf-8')) + 1 for chunk in chunks)
+            if self._size + group_size > self.max_bytes:
+                self._open()
+        for chunk in chunks:
+            self._emit(chunk)
+        self._has_body = True
+
+    def close(self):
+        """Finish the last file and remove parts left over from earlier runs"""
+        if self._fh is None:
+            if not self.paths:
+                self._open()  # header-only output, as before
+            else:
+                return
+        self._fh.close()
+        self._fh = None
+        if self.max_bytes and len(self.paths) == 1:
+            os.replace(self.paths[0], self.path)
+            self.paths = [self.path]
+        # Stale parts (or a stale single file) from a previous, larger run
+        part_re = re.compile(re.escape(self.path.stem) + r'-\d{3}' + re.escape(self.path.suffix) + '$')
+        stale = [p for p in self.path.parent.iterdir() if part_re.match(p.name)]
+        if len(self.paths) > 1 and self.path.exists():
+            stale.append(self.path)
+        for path in stale:
+            if path not in self.paths:
+                path.unlink()
+
+
+class SqlExpr(str):
+    """A raw SQL expression (e.g. gen_random_uuid()), emitted as-is by sql_literal()"""
+
+
+def sql_literal(value):
+    """Render a Python value as a SQL literal"""
+    if isinstance(value, SqlExpr):
+        return str(value)
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def insert_values(table, columns, rows, batch_size=100, indent=''):
+    """Yield chunks for multi-row INSERTs of at most batch_size rows each.
+
+    rows are sequences of Python values or SqlExpr, in `columns` order.
+    """
+    rows = list(rows)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        yield f"{indent}INSERT INTO {table} ({', '.join(columns)}) VALUES"
+        for number, row in enumerate(batch, 1):
+            end = ';' if number == len(batch) else ','
+            yield f"{indent}  ({', '.join(sql_literal(value) for value in row)}){end}"
+
+
+def csv_field(value):
+    """Render a Python value as a COPY CSV field.
+
+    None is an unquoted empty field, which COPY reads as NULL; every string
+    is quoted, so '' stays an empty string. dicts/lists are JSON.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_from_stdin(table, columns, rows):
+    """Yield chunks for a psql `COPY ... FROM STDIN` CSV block.
+
+    Values are rendered by csv_field(). Omitted columns (e.g. id) take
+    their table defaults.
+    """
+    yield f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv);"
+    for row in rows:
+        yield ','.join(csv_field(value) for value in row)
+    yield "\\."
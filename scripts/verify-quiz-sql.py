@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Verify that every --mode of the quiz SQL generators loads the same rows
+into PostgreSQL: scripts/generate-quiz-sql.py and
+scripts/extract-quizzes-from-ppts.py.
+
+The quizzes are the templates (plus a built-in quiz full of quotes,
+commas, backslashes, newlines and non-ASCII text). For
+extract-quizzes-from-ppts.py they are reshaped the way decks come out of
+extract_deck(), plus one quiz whose topic code is not in the database, or
+taken from real decks with --decks DIR. Each generator's output in
+statements, batch and copy mode is run with psql against an empty scratch
+schema, the way its printed steps say to:
+- generate-quiz-sql.py statements/batch: run the quiz INSERT (Steps 1-2),
+  put the returned ID in place of QUIZ_ID_HERE, then run the questions
+  (Step 3 onwards)
+- generate-quiz-sql.py copy: run the whole file with psql -f
+- extract-quizzes-from-ppts.py: run BULK-QUIZ-INSERTS.sql or
+  BULK-QUIZ-COPY.sql, as write_quiz_sql() writes them, with psql -f
+
+The quizzes and questions each mode leaves behind (IDs aside) must match
+the same generator's statements mode exactly, with one quiz per input.
+Needs psql and a database you can create a schema in; everything happens
+in the quiz_sql_check schema, which is dropped afterwards. Exits 1 on a
+mismatch.
+
+Usage:
+    python scripts/verify-quiz-sql.py postgresql://localhost/scratch [content/quiz-*.md ...]
+        [--decks data/] [--batch-size 2] [--psql psql] [--keep]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+from pathlib import Path
+
+SCHEMA = 'quiz_sql_check'
+MODES = ['statements', 'batch', 'copy']
+QUESTIONS_MARKER = '-- Step 3: Create quiz questions'
+UNKNOWN_TOPIC = 'verify-no-such-topic'  # deck quiz loaded with a NULL topic_id
+
+# The columns the generated SQL writes, as in db_loader.SQLITE_SCHEMA
+SETUP_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TABLE {SCHEMA}.topics (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  code TEXT UNIQUE,
+  title TEXT NOT NULL
+);
+CREATE TABLE {SCHEMA}.quizzes (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  topic_id UUID REFERENCES {SCHEMA}.topics(id),
+  title TEXT NOT NULL,
+  description TEXT,
+  passing_score INTEGER,
+  time_limit_minutes INTEGER,
+  published BOOLEAN
+);
+CREATE TABLE {SCHEMA}.quiz_questions (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  quiz_id UUID NOT NULL REFERENCES {SCHEMA}.quizzes(id) ON DELETE CASCADE,
+  position INTEGER,
+  question TEXT NOT NULL,
+  options JSONB,
+  correct_answer TEXT NOT NULL,
+  explanation TEXT,
+  points INTEGER
+);
+"""
+
+SNAPSHOT_SQL = """
+SELECT coalesce(json_agg(quiz ORDER BY quiz.code, quiz.title), '[]')
+FROM (
+  SELECT t.code, q.title, q.description, q.passing_score, q.time_limit_minutes, q.published,
+         (SELECT json_agg(json_build_object(
+                   'position', qq.position, 'question', qq.question, 'options', qq.options,
+                   'correct_answer', qq.correct_answer, 'explanation', qq.explanation,
+                   'points', qq.points) ORDER BY qq.position)
+          FROM quiz_questions qq WHERE qq.quiz_id = q.id) AS questions
+  FROM quizzes q
+  LEFT JOIN topics t ON t.id = q.topic_id
+) quiz;
+"""
+
+EDGE_CASE_QUIZ = {
+    'topic_code': 'verify-edge-001',
+    'topic_title': "Quoting \"edge\" cases, O'Brien's topic",
+    'quiz_title': "It's a \"test\", with commas",
+    'passing_score': 80,
+    'time_limit': None,
+    'description': "Line one\nLine two, with a tab\tand a backslash \\ here",
+    'questions': [
+        {
+            'question': "Which path is valid: C:\\temp\\new or /tmp/it's?",
+            'options': {'A': 'C:\\temp\\new', 'B': "/tmp/it's", 'C': 'both "quoted"', 'D': 'neither, really'},
+            'correct_answer': 'C',
+            'explanation': "Both are fine; the \"quotes\" and ' must survive COPY's CSV",
+        },
+        {
+            'question': "Café — naïve résumé ✓\nOn two lines?",
+            'options': {'A': 'ja', 'B': 'nein', 'C': '\\N', 'D': ''},
+            'correct_answer': 'A',
+            'explanation': None,
+        },
+        {
+            'question': 'NULL',
+            'options': {'A': 'NULL', 'B': '', 'C': '\\.', 'D': '"'},
+            'correct_answer': 'B',
+            'explanation': '\\.',
+        },
+    ],
+    'warnings': [],
+}
+
+
+def load_script(file_name, module_name):
+    path = Path(__file__).with_name(file_name)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def deck_quiz(quiz_data):
+    """A template quiz as extract_deck() would return it for a deck"""
+    return {
+        'ppt_name': quiz_data['topic_title'],
+        'questions': [{'question': q['question'], 'options': q['options'],
+                       'correct_answer': q['correct_answer']}
+                      for q in quiz_data['questions']],
+    }
+
+
+class Psql:
+    """Runs SQL through psql in the scratch schema"""
+
+    def __init__(self, psql, dsn):
+        self.command = [psql, '-X', '-q', '-A', '-t', '-v', 'ON_ERROR_STOP=1', '-d', dsn]
+        self.env = dict(os.environ, PGOPTIONS=f"-c search_path={SCHEMA}")
+
+    def run(self, sql=None, file=None):
+        args = self.command + (['-f', str(file)] if file else ['-c', sql])
+        result = subprocess.run(args, env=self.env, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"❌ psql failed{f' on {file}' if file else ''}:\n{result.stderr.strip()}")
+            sys.exit(1)
+        return result.stdout.strip()
+
+
+def run_template_sql(psql, generator, quiz_data, mode, batch_size, work_dir):
+    """Run generate-quiz-sql.py output the way it tells the user to"""
+    sql = generator.generate_sql(quiz_data, mode, batch_size)
+    script = Path(work_dir) / f"{mode}.sql"
+    if mode == 'copy':
+        script.write_text(sql)
+        psql.run(file=script)
+        return
+    quiz_part, questions_part = sql.split(QUESTIONS_MARKER, 1)
+    script.write_text(quiz_part)
+    quiz_id = psql.run(file=script)
+    script.write_text(QUESTIONS_MARKER + questions_part.replace('QUIZ_ID_HERE', quiz_id))
+    psql.run(file=script)
+
+
+def compare_modes(psql, label, load, expected):
+    """Load each mode with load(mode) into empty tables; True if all match statements mode"""
+    print(f"📋 {label}")
+    snapshots = {}
+    for mode in MODES:
+        psql.run("TRUNCATE quizzes CASCADE;")
+        load(mode)
+        snapshots[mode] = json.loads(psql.run(SNAPSHOT_SQL))
+        questions = sum(len(quiz['questions'] or []) for quiz in snapshots[mode])
+        print(f"   {mode:<11} {len(snapshots[mode])} quizzes, {questions} questions")
+
+    reference = snapshots['statements']
+    matched = True
+    if len(reference) != expected:
+        print(f"❌ statements mode created {len(reference)} quizzes, expected {expected}")
+        matched = False
+    for mode in MODES[1:]:
+        if snapshots[mode] != reference:
+            print(f"❌ {mode} mode rows differ from statements mode")
+            matched = False
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that all quiz SQL modes load the same rows")
+    parser.add_argument('dsn', help="PostgreSQL database to create the scratch schema in")
+    parser.add_argument('templates', nargs='*',
+                        help="Quiz templates (default: content/quiz-*.md)")
+    parser.add_argument('--decks', metavar='DIR',
+                        help="Extract the .pptx decks under DIR for extract-quizzes-from-ppts.py "
+                             "(default: use the templates)")
+    parser.add_argument('--batch-size', type=int, default=2,
+                        help="Rows per INSERT in batch mode; small, so quizzes span batches (default: 2)")
+    parser.add_argument('--psql', default='psql', help="psql executable (default: psql)")
+    parser.add_argument('--keep', action='store_true', help=f"Keep the {SCHEMA} schema for inspection")
+    args = parser.parse_args()
+
+    generator = load_script('generate-quiz-sql.py', 'generate_quiz_sql')
+    extractor = load_script('extract-quizzes-from-ppts.py', 'extract_quizzes_from_ppts')
+
+    templates = [Path(p) for p in args.templates] or \
+        sorted((Path(__file__).resolve().parent.parent / 'content').glob('quiz-*.md'))
+    quizzes = [EDGE_CASE_QUIZ]
+    for template in templates:
+        quiz_data = generator.parse_quiz_template(template)
+        if not quiz_data['questions']:
+            print(f"⚠️  Skipping {template}: no questions")
+            continue
+        quizzes.append(quiz_data)
+    print(f"📖 {len(quizzes)} quizzes ({len(quizzes) - 1} templates + built-in edge cases), "
+          f"{sum(len(q['questions']) for q in quizzes)} questions")
+
+    if args.decks:
+        # Same decks, order and parsed-deck cache as extract-quizzes-from-ppts.py
+        decks = sorted(list(Path(args.decks).rglob('*.pptx')) + list(Path(args.decks).rglob('*.ppt')),
+                       key=lambda p: p.relative_to(args.decks).as_posix())
+        deck_quizzes = []
+        for ppt_path in decks:
+            quiz_data, _, error = extractor.extract_deck(ppt_path, extractor.default_cache_dir())
+            if quiz_data:
+                deck_quizzes.append((extractor.map_ppt_to_topic_code(ppt_path.stem), quiz_data))
+        print(f"📖 {len(deck_quizzes)} quizzes from {len(decks)} decks in {args.decks}")
+        if not deck_quizzes:
+            print(f"❌ No quizzes found in the decks under {args.decks}")
+            sys.exit(1)
+    else:
+        deck_quizzes = [(q['topic_code'], deck_quiz(q)) for q in quizzes]
+        deck_quizzes.append((UNKNOWN_TOPIC, deck_quiz(EDGE_CASE_QUIZ)))
+
+    psql = Psql(args.psql, args.dsn)
+    psql.run(SETUP_SQL)
+    topics = {q['topic_code']: q['topic_title'] for q in quizzes}
+    for code, _ in deck_quizzes:
+        if code != UNKNOWN_TOPIC:
+            topics.setdefault(code, code)
+    psql.run("INSERT INTO topics (code, title) VALUES "
+             + ', '.join(f"({generator.sql_literal(code)}, {generator.sql_literal(title)})"
+                         for code, title in topics.items()) + ";")
+
+    with tempfile.TemporaryDirectory(prefix='quiz-sql-') as work_dir:
+        def load_templates(mode):
+            for quiz_data in quizzes:
+                run_template_sql(psql, generator, quiz_data, mode, args.batch_size, work_dir)
+
+        def load_decks(mode):
+            output_file = Path(work_dir) / ('BULK-QUIZ-COPY.sql' if mode == 'copy' else 'BULK-QUIZ-INSERTS.sql')
+            for path in extractor.write_quiz_sql(output_file, deck_quizzes, mode, args.batch_size):
+                psql.run(file=path)
+
+        matched = compare_modes(psql, 'generate-quiz-sql.py', load_templates, len(quizzes))
+        matched = compare_modes(psql, 'extract-quizzes-from-ppts.py', load_decks, len(deck_quizzes)) and matched
+
+    if not args.keep:
+        psql.run(f"DROP SCHEMA {SCHEMA} CASCADE;")
+    if not matched:
+        sys.exit(1)
+    print("✅ All modes load the same quizzes and questions")
+
+
+if __name__ == '__main__':
+    main()